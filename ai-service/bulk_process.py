@@ -0,0 +1,323 @@
+# ai-service/bulk_process.py
+"""
+Traitement hors ligne d'une archive de documents texte
+
+    python bulk_process.py ./archive --output-dir ./entities --processes 8 --format jsonl
+
+Les fichiers du dossier sont lus au fil de l'eau et analysés par nlp.pipe sur
+plusieurs processus, avec les mêmes étapes que /analyze (normalisation,
+langue, NER, propagation des mentions, regex, déduplication, confiance).
+Les documents d'une autre langue que la langue principale passent par le
+modèle de leur langue, un par un. Pas d'échéance ni de filtre par type
+d'entité. Les entités sont écrites par lots de `--shard-size` documents
+(JSONL ou Parquet, une ligne par document).
+
+Chaque lot terminé est inscrit dans manifest.jsonl: en cas d'interruption,
+relancer la même commande reprend après le dernier lot écrit.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from dataclasses import replace
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterator, List, Set, Tuple
+
+from src.config.settings import settings
+from src.config.models import ModelManager
+from src.processors.ner_processor import NERProcessor
+from src.processors.entity_classifier import EntityClassifier
+from src.processors.confidence_calculator import ConfidenceCalculator
+from src.utils.text_processing import NormalizedText, normalize_text, resolve_language, split_into_chunks
+from src.utils.logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optionnel: requis uniquement pour --format parquet
+    pa = None
+    pq = None
+
+
+MANIFEST_FILE = "manifest.jsonl"
+
+# Schéma des lots Parquet (une ligne par document)
+PARQUET_ENTITY_FIELDS = [
+    ("text", "string"),
+    ("label", "string"),
+    ("start", "int64"),
+    ("end", "int64"),
+    ("confidence", "float64"),
+    ("source", "string"),
+]
+
+
+def iter_documents(input_dir: str, extensions: List[str], done: Set[str]) -> Iterator[str]:
+    """Chemins relatifs des documents à traiter, dans un ordre stable"""
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.lower().endswith(tuple(extensions)):
+                continue
+            path = os.path.relpath(os.path.join(root, name), input_dir)
+            if path not in done:
+                yield path
+
+
+def load_manifest(output_dir: str) -> Tuple[Set[str], int]:
+    """Documents déjà écrits et numéro du prochain lot"""
+    done, next_shard = set(), 0
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return done, next_shard
+
+    with open(manifest_path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    valid = []
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # Ligne tronquée par une interruption: lot à refaire
+            continue
+        valid.append(line)
+        done.update(entry["paths"])
+        next_shard = max(next_shard, entry["index"] + 1)
+
+    if len(valid) != len(lines):
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            f.writelines(line + "\n" for line in valid)
+    return done, next_shard
+
+
+class ShardWriter:
+    """Écriture atomique des lots (fichier temporaire puis renommage) et du manifeste"""
+
+    def __init__(self, output_dir: str, output_format: str):
+        self.output_dir = output_dir
+        self.output_format = output_format
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, index: int, records: List[Dict]) -> str:
+        extension = "parquet" if self.output_format == "parquet" else "jsonl"
+        name = f"entities-{index:05d}.{extension}"
+        path = os.path.join(self.output_dir, name)
+        tmp_path = f"{path}.tmp"
+
+        if self.output_format == "parquet":
+            self._write_parquet(tmp_path, records)
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+
+        # Le lot n'est considéré comme fait qu'une fois inscrit au manifeste
+        entry = {
+            "index": index,
+            "shard": name,
+            "documents": len(records),
+            "entities": sum(len(record["entities"]) for record in records),
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+            "paths": [record["path"] for record in records],
+        }
+        with open(os.path.join(self.output_dir, MANIFEST_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return name
+
+    @staticmethod
+    def _write_parquet(path: str, records: List[Dict]):
+        entity_type = pa.struct([(name, getattr(pa, kind)()) for name, kind in PARQUET_ENTITY_FIELDS])
+        schema = pa.schema([
+            ("path", pa.string()),
+            ("chars", pa.int64()),
+            ("entities", pa.list_(entity_type)),
+        ])
+        pq.write_table(pa.Table.from_pylist(records, schema=schema), path, compression="zstd")
+
+
+class BulkProcessor:
+    """Pipeline d'analyse de /analyze appliqué à des lots de documents"""
+
+    def __init__(self, model_manager: ModelManager, args: argparse.Namespace):
+        self.model_manager = model_manager
+        self.args = args
+        self.ner_processor = NERProcessor(model_manager)
+        self.entity_classifier = EntityClassifier()
+        self.confidence_calculator = ConfidenceCalculator()
+
+    async def process_shard(self, input_dir: str, paths: List[str]) -> List[Dict]:
+        """
+        Analyser un lot de documents
+
+        Les documents longs sont découpés comme dans NERProcessor; les morceaux
+        d'un même document sortent consécutivement de nlp.pipe (ordre conservé)
+        et sont regroupés avant le post-traitement. Les documents d'une autre
+        langue sont analysés ensuite par NERProcessor.extract_entities.
+        """
+        nlp = self.model_manager.get_spacy_model()
+        documents: Dict[int, Tuple[str, NormalizedText]] = {}
+        other_languages: Dict[int, Tuple[str, NormalizedText, str]] = {}
+
+        def chunks() -> Iterator[Tuple[str, Tuple[int, int, int]]]:
+            for doc_index, path in enumerate(paths):
+                with open(os.path.join(input_dir, path), encoding="utf-8", errors="replace") as f:
+                    normalized = normalize_text(f.read())
+                text = normalized.text
+                language = resolve_language(self.args.language, text)
+                if language != settings.default_language:
+                    other_languages[doc_index] = (path, normalized, language)
+                    continue
+                documents[doc_index] = (path, normalized)
+                spans = split_into_chunks(text, settings.ner_chunk_size) if len(text) > settings.ner_chunk_size else [(0, len(text))]
+                for chunk_index, (start, end) in enumerate(spans):
+                    yield text[start:end], (doc_index, start, len(spans) - chunk_index - 1)
+
+        records: Dict[int, Dict] = {}
+        entities = []
+        pipe = nlp.pipe(
+            chunks(),
+            as_tuples=True,
+            batch_size=self.args.batch_size,
+            n_process=self.args.processes
+        )
+        for doc, (doc_index, offset, chunks_left) in pipe:
+            path, normalized = documents[doc_index]
+            entities += self.ner_processor.doc_to_entities(doc, normalized.text, offset=offset)
+            if chunks_left:
+                continue
+
+            records[doc_index] = await self._finish_document(path, normalized, entities, settings.default_language)
+            entities = []
+            del documents[doc_index]
+
+        for doc_index, (path, normalized, language) in other_languages.items():
+            entities = await self.ner_processor.extract_entities(normalized.text, language=language)
+            records[doc_index] = await self._finish_document(path, normalized, entities, language)
+
+        return [records[doc_index] for doc_index in sorted(records)]
+
+    async def _finish_document(self, path: str, normalized: NormalizedText, ner_entities: list, language: str) -> Dict:
+        """Propagation, regex, déduplication, confiance et filtre, puis offsets du texte d'origine"""
+        text = normalized.text
+        if ner_entities and self.args.propagate_mentions and settings.enable_mention_propagation:
+            ner_entities = ner_entities + await self.ner_processor.propagate_entities(
+                text, ner_entities, self.confidence_calculator, language
+            )
+
+        regex_entities = []
+        if self.args.include_regex:
+            regex_entities = await self.ner_processor.extract_regex_entities(text)
+
+        deduplicated = self.entity_classifier.deduplicate_entities(ner_entities + regex_entities)
+        scored = self.confidence_calculator.calculate_confidence(deduplicated, text)
+
+        entities = []
+        for entity in scored:
+            if entity.confidence < self.args.confidence_threshold:
+                continue
+            if normalized.changed:
+                start, end = normalized.to_original(entity.start, entity.end)
+                entity = replace(entity, start=start, end=end, text=normalized.original[start:end])
+            entities.append({
+                "text": entity.text,
+                "label": entity.label,
+                "start": entity.start,
+                "end": entity.end,
+                "confidence": round(entity.confidence, 4),
+                "source": entity.source,
+            })
+        return {"path": path, "chars": len(normalized.original), "entities": entities}
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+
+async def run(args: argparse.Namespace):
+    done, shard_index = load_manifest(args.output_dir)
+    if done:
+        logger.info(f"Resuming: {len(done)} documents already processed, next shard {shard_index}")
+
+    extensions = [ext if ext.startswith(".") else f".{ext}" for ext in args.extensions]
+    # Dénombrement préalable pour l'estimation du temps restant (les chemins ne sont pas conservés)
+    total = sum(1 for _ in iter_documents(args.input_dir, extensions, done))
+    if not total:
+        logger.info("Nothing to process")
+        return
+
+    model_manager = ModelManager()
+    await model_manager.initialize(load_optional=False)
+    processor = BulkProcessor(model_manager, args)
+    writer = ShardWriter(args.output_dir, args.format)
+
+    logger.info(f"Processing {total} documents with {args.processes} processes")
+    start_time = time.monotonic()
+    documents = characters = entity_count = 0
+    paths = iter_documents(args.input_dir, extensions, done)
+
+    while True:
+        batch = list(islice(paths, args.shard_size))
+        if not batch:
+            break
+
+        records = await processor.process_shard(args.input_dir, batch)
+        name = writer.write(shard_index, records)
+        shard_index += 1
+
+        documents += len(records)
+        characters += sum(record["chars"] for record in records)
+        entity_count += sum(len(record["entities"]) for record in records)
+        elapsed = time.monotonic() - start_time
+        rate = documents / elapsed if elapsed else 0.0
+        eta = (total - documents) / rate if rate else 0.0
+        logger.info(
+            f"{name}: {documents}/{total} documents, {rate:.1f} docs/s, "
+            f"{characters / elapsed / 1e6:.2f}M chars/s, ETA {_format_duration(eta)}"
+        )
+
+        # Vocabulaire du processus principal (les Doc y sont désérialisés): rechargement entre deux lots
+        if model_manager.get_vocab_stats()["growth"] > settings.vocab_growth_threshold:
+            await model_manager.reload_spacy_model(reason="bulk_vocab_growth")
+
+    elapsed = time.monotonic() - start_time
+    logger.info(
+        f"Done: {documents} documents, {entity_count} entities in {_format_duration(elapsed)} "
+        f"({documents / elapsed:.1f} docs/s)"
+    )
+    await model_manager.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extraire les entités d'une archive de documents texte")
+    parser.add_argument("input_dir", help="Dossier des documents (parcours récursif)")
+    parser.add_argument("--output-dir", required=True, help="Dossier des lots et du manifeste")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl", help="Format des lots")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Processus nlp.pipe")
+    parser.add_argument("--batch-size", type=int, default=16, help="Documents par lot nlp.pipe et par processus")
+    parser.add_argument("--shard-size", type=int, default=1000, help="Documents par fichier de sortie")
+    parser.add_argument("--extensions", nargs="*", default=[".txt"], help="Extensions des fichiers à traiter")
+    parser.add_argument("--language", default="fr", help="Langue des documents ('auto' pour la détecter)")
+    parser.add_argument("--confidence-threshold", type=float, default=0.5, help="Seuil de confiance")
+    parser.add_argument("--no-regex", dest="include_regex", action="store_false", help="NER uniquement")
+    parser.add_argument("--no-propagation", dest="propagate_mentions", action="store_false", help="Sans propagation des mentions")
+    args = parser.parse_args()
+
+    if args.format == "parquet" and pa is None:
+        sys.exit("Parquet output requires pyarrow (pip install pyarrow)")
+    if not os.path.isdir(args.input_dir):
+        sys.exit(f"Input directory not found: {args.input_dir}")
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
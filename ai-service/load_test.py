@@ -0,0 +1,341 @@
+# ai-service/load_test.py
+"""
+Générateur de charge pour le service IA
+
+Boucle fermée (N clients, chaque client renvoie une requête dès la réponse
+précédente reçue):
+
+    python load_test.py --concurrency 16 --duration 60
+
+Boucle ouverte (arrivées de Poisson à débit fixe, indépendantes des temps de
+réponse: fait apparaître la saturation et le délestage 429/503):
+
+    python load_test.py --rate 20 --duration 60 --max-inflight 200
+
+Corpus: fichiers .txt d'un dossier (--corpus-dir) ou textes synthétiques
+dont la taille suit --sizes (ex: "2000:0.7,20000:0.25,200000:0.05").
+Le rapport donne le débit, les latences p50/p95/p99 par route, les taux
+d'erreur et de délestage, et les durées moyennes des étapes côté serveur
+(statistics.timings_ms de /analyze).
+"""
+import os
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+
+# Statuts de délestage (contrôle d'admission, file pleine)
+SHED_STATUSES = {429, 503}
+
+FIRST_NAMES = ["Jean", "Marie", "Pierre", "Sophie", "Luc", "Camille", "Antoine", "Claire", "Julien", "Isabelle"]
+LAST_NAMES = ["Martin", "Bernard", "Dubois", "Durand", "Lefebvre", "Moreau", "Laurent", "Simon", "Michel", "Garcia"]
+CITIES = ["Paris", "Lyon", "Marseille", "Toulouse", "Nantes", "Bordeaux", "Lille", "Strasbourg"]
+COMPANIES = ["SARL Dupont Conseil", "SAS Horizon", "Société Générale des Eaux", "EURL Martin Bâtiment"]
+
+
+@dataclass
+class Sample:
+    """Résultat d'une requête"""
+    target: str
+    status: int
+    latency: float
+    chars: int
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def synthetic_paragraph(rng: random.Random) -> str:
+    """Paragraphe de style juridique avec des entités à détecter"""
+    person = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    other = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    siret = " ".join(str(rng.randint(100, 999)) for _ in range(3)) + f" {rng.randint(10000, 99999)}"
+    phone = "0" + str(rng.randint(1, 9)) + "".join(f" {rng.randint(0, 99):02d}" for _ in range(4))
+    return (
+        f"Entre les soussignés, Monsieur {person}, demeurant à {rng.choice(CITIES)}, "
+        f"joignable au {phone} ou à l'adresse {person.split()[0].lower()}.{person.split()[1].lower()}@exemple.fr, "
+        f"et la société {rng.choice(COMPANIES)}, SIRET {siret}, représentée par Madame {other}, "
+        f"il a été convenu ce qui suit le {rng.randint(1, 28)} mars {rng.randint(2015, 2024)}. "
+        f"Le présent contrat est régi par le droit français et tout litige relèvera du tribunal de {rng.choice(CITIES)}.\n\n"
+    )
+
+
+def synthetic_text(rng: random.Random, size: int) -> str:
+    """Texte synthétique d'environ `size` caractères"""
+    paragraphs = []
+    length = 0
+    while length < size:
+        paragraph = synthetic_paragraph(rng)
+        paragraphs.append(paragraph)
+        length += len(paragraph)
+    return "".join(paragraphs)[:size]
+
+
+def parse_weights(spec: str) -> List[Tuple[str, float]]:
+    """Analyser une spécification "clé:poids,clé:poids" """
+    weights = []
+    for item in spec.split(","):
+        key, _, weight = item.strip().partition(":")
+        weights.append((key, float(weight or 1)))
+    return weights
+
+
+def load_corpus(args, rng: random.Random) -> List[str]:
+    """Charger le corpus du dossier ou générer des textes synthétiques"""
+    if args.corpus_dir:
+        texts = []
+        for name in sorted(os.listdir(args.corpus_dir)):
+            if name.endswith(".txt"):
+                with open(os.path.join(args.corpus_dir, name), encoding="utf-8", errors="replace") as f:
+                    texts.append(f.read())
+        if not texts:
+            raise SystemExit(f"No .txt files found in {args.corpus_dir}")
+        return texts
+
+    sizes = parse_weights(args.sizes)
+    population = [int(size) for size, _ in sizes]
+    weights = [weight for _, weight in sizes]
+    return [
+        synthetic_text(rng, size)
+        for size in rng.choices(population, weights=weights, k=args.corpus_size)
+    ]
+
+
+class LoadTest:
+    """Exécution d'un test de charge et collecte des mesures"""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.corpus = load_corpus(args, self.rng)
+        targets = parse_weights(args.mix)
+        self.targets = [name for name, _ in targets]
+        self.target_weights = [weight for _, weight in targets]
+        self.samples: List[Sample] = []
+        self.measuring = False
+        self.measure_start = 0.0
+        self.measure_end = 0.0
+        self.client_dropped = 0
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def run(self) -> Dict[str, object]:
+        limits = httpx.Limits(max_connections=self.args.max_inflight, max_keepalive_connections=self.args.max_inflight)
+        async with httpx.AsyncClient(base_url=self.args.url, timeout=self.args.timeout, limits=limits) as client:
+            self.client = client
+
+            stop_at = time.monotonic() + self.args.warmup + self.args.duration
+            measure_task = asyncio.create_task(self._start_measuring_after(self.args.warmup))
+
+            if self.args.rate:
+                await self._open_loop(stop_at)
+            else:
+                await self._closed_loop(stop_at)
+            await measure_task
+
+        return self.report()
+
+    async def _start_measuring_after(self, delay: float):
+        await asyncio.sleep(delay)
+        self.measuring = True
+        self.measure_start = time.monotonic()
+
+    async def _closed_loop(self, stop_at: float):
+        """N clients: chaque client envoie la requête suivante à réception de la réponse"""
+        async def client_loop():
+            while time.monotonic() < stop_at:
+                await self._send()
+
+        await asyncio.gather(*(client_loop() for _ in range(self.args.concurrency)))
+        self.measure_end = time.monotonic()
+
+    async def _open_loop(self, stop_at: float):
+        """Arrivées de Poisson au débit demandé, plafonnées à max_inflight requêtes en cours"""
+        inflight = asyncio.Semaphore(self.args.max_inflight)
+        tasks = set()
+        dropped = 0
+
+        async def send_one():
+            try:
+                await self._send()
+            finally:
+                inflight.release()
+
+        while time.monotonic() < stop_at:
+            await asyncio.sleep(self.rng.expovariate(self.args.rate))
+            if inflight.locked():
+                # Le générateur lui-même est saturé: la requête est comptée comme perdue
+                if self.measuring:
+                    dropped += 1
+                continue
+            await inflight.acquire()
+            task = asyncio.create_task(send_one())
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        # Fin de mesure après les dernières réponses: elles sont comptées dans les échantillons
+        await asyncio.gather(*tasks)
+        self.measure_end = time.monotonic()
+        self.client_dropped = dropped
+
+    async def _send(self):
+        target = self.rng.choices(self.targets, weights=self.target_weights)[0]
+        text = self.rng.choice(self.corpus)
+        start = time.perf_counter()
+        chars = 0
+        timings: Dict[str, float] = {}
+
+        try:
+            if target == "analyze":
+                chars = len(text)
+                response = await self.client.post("/api/v1/analyze/", json=self._analyze_payload(text))
+                if response.status_code == 200:
+                    timings = response.json().get("statistics", {}).get("timings_ms", {})
+            elif target == "batch":
+                texts = [self.rng.choice(self.corpus) for _ in range(self.args.batch_size)]
+                chars = sum(len(t) for t in texts)
+                response = await self.client.post(
+                    "/api/v1/analyze/batch",
+                    params={"mode": self.args.mode, "confidence_threshold": self.args.threshold},
+                    json=texts
+                )
+            elif target == "health":
+                response = await self.client.get("/health")
+            else:
+                raise SystemExit(f"Unknown target: {target}")
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0  # Erreur réseau ou délai dépassé
+
+        if self.measuring:
+            self.samples.append(Sample(
+                target=target,
+                status=status,
+                latency=time.perf_counter() - start,
+                chars=chars,
+                timings=timings
+            ))
+
+    def _analyze_payload(self, text: str) -> Dict[str, object]:
+        return {
+            "text": text,
+            "mode": self.args.mode,
+            "language": self.args.language,
+            "confidence_threshold": self.args.threshold,
+        }
+
+    def report(self) -> Dict[str, object]:
+        elapsed = max(1e-9, self.measure_end - self.measure_start)
+        by_target: Dict[str, List[Sample]] = defaultdict(list)
+        for sample in self.samples:
+            by_target[sample.target].append(sample)
+
+        report = {
+            "mode": "open" if self.args.rate else "closed",
+            "concurrency": None if self.args.rate else self.args.concurrency,
+            "arrival_rate": self.args.rate or None,
+            "duration": round(elapsed, 1),
+            "requests": len(self.samples),
+            "throughput_rps": round(len(self.samples) / elapsed, 2),
+            "throughput_chars_per_s": round(
+                sum(s.chars for s in self.samples if s.status == 200) / elapsed
+            ),
+            "targets": {target: summarize(samples) for target, samples in sorted(by_target.items())},
+            "server_timings_ms": average_timings(by_target.get("analyze", [])),
+        }
+        if self.args.rate:
+            report["client_dropped"] = self.client_dropped
+        return report
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentile par rang le plus proche"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples: List[Sample]) -> Dict[str, object]:
+    """Latences (ms) des requêtes réussies, taux d'erreur et de délestage"""
+    latencies = sorted(s.latency * 1000 for s in samples if s.status == 200)
+    shed = sum(1 for s in samples if s.status in SHED_STATUSES)
+    errors = sum(1 for s in samples if s.status != 200 and s.status not in SHED_STATUSES)
+    return {
+        "requests": len(samples),
+        "ok": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "max_ms": round(latencies[-1], 1) if latencies else 0.0,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "shed_rate": round(shed / len(samples), 4) if samples else 0.0,
+    }
+
+
+def average_timings(samples: List[Sample]) -> Dict[str, float]:
+    """Durée moyenne de chaque étape du pipeline côté serveur"""
+    totals: Dict[str, float] = defaultdict(float)
+    counts: Dict[str, int] = defaultdict(int)
+    for sample in samples:
+        for stage, duration in sample.timings.items():
+            totals[stage] += duration
+            counts[stage] += 1
+    return {stage: round(totals[stage] / counts[stage], 2) for stage in totals}
+
+
+def print_report(report: Dict[str, object]):
+    """Affichage lisible du rapport"""
+    print(f"\nMode: {report['mode']}  duration: {report['duration']}s  requests: {report['requests']}")
+    print(f"Throughput: {report['throughput_rps']} req/s, {report['throughput_chars_per_s']} chars/s")
+    print(f"\n{'target':<10}{'req':>8}{'ok':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'err%':>8}{'shed%':>8}")
+    for target, stats in report["targets"].items():
+        print(
+            f"{target:<10}{stats['requests']:>8}{stats['ok']:>8}"
+            f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}"
+            f"{stats['error_rate'] * 100:>8.2f}{stats['shed_rate'] * 100:>8.2f}"
+        )
+    if report["server_timings_ms"]:
+        print("\nServer stage timings (mean ms):")
+        for stage, duration in report["server_timings_ms"].items():
+            print(f"  {stage:<15}{duration:>10}")
+    if report.get("client_dropped"):
+        print(f"\nClient-side dropped arrivals (max in-flight reached): {report['client_dropped']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du service IA")
+    parser.add_argument("--url", default="http://localhost:8000", help="URL du service")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clients en boucle fermée")
+    parser.add_argument("--rate", type=float, default=0.0, help="Débit d'arrivée (req/s): active la boucle ouverte")
+    parser.add_argument("--max-inflight", type=int, default=256, help="Requêtes simultanées max (boucle ouverte)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Durée de mesure (s)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Durée de chauffe non mesurée (s)")
+    parser.add_argument("--mix", default="analyze:8,batch:1,health:1", help="Répartition des routes")
+    parser.add_argument("--sizes", default="2000:0.7,20000:0.25,200000:0.05", help="Tailles des textes synthétiques")
+    parser.add_argument("--corpus-dir", default=None, help="Dossier de textes .txt à rejouer")
+    parser.add_argument("--corpus-size", type=int, default=200, help="Nombre de textes synthétiques")
+    parser.add_argument("--batch-size", type=int, default=5, help="Textes par requête /analyze/batch")
+    parser.add_argument("--mode", default="hybrid", help="Mode d'analyse")
+    parser.add_argument("--language", default="fr", help="Langue des textes")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Seuil de confiance")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Délai max par requête (s)")
+    parser.add_argument("--seed", type=int, default=0, help="Graine du générateur")
+    parser.add_argument("--json", default=None, help="Écrire le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+
+    report = asyncio.run(LoadTest(args).run())
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,24 @@ import asyncio
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import make_asgi_app
 from contextlib import asynccontextmanager
 
 from src.config.settings import settings
 from src.config.models import ModelManager
+from src.services.job_manager import JobManager
+from src.services.admission_controller import AdmissionController
+from src.services.micro_batcher import MicroBatcher
+from src.services.memory_guard import MemoryGuard
+from src.services.coordinator import ChunkCoordinator
+from src.services.shadow_evaluator import ShadowEvaluator
+from src.services.model_swapper import ModelSwapper
+from src.processors.document_extractor import DocumentExtractor
+from src.processors.search_index import SearchIndexCache
+from src.processors.doc_cache import DocCache
 from src.api.main import api_router
 from src.utils.logger import logger
+from src.utils.gc_tuning import configure_gc
 
 
 
@@ -21,17 +33,78 @@ async def lifespan(app: FastAPI):
     logger.info(f"Environment: {settings.environment}")
     logger.info(f"Models cache: {settings.model_cache_dir}")
     
+    # Seuils du ramasse-miettes et métriques de pauses (tas gelé après le chargement des modèles)
+    configure_gc()
+    
     # Initialiser les modèles
     model_manager = ModelManager()
     await model_manager.initialize()
     app.state.model_manager = model_manager
     
+    # Contrôle d'admission des routes d'analyse
+    app.state.admission_controller = AdmissionController()
+    
+    # Micro-batching optionnel des petites requêtes
+    if settings.enable_micro_batching:
+        micro_batcher = MicroBatcher(model_manager)
+        await micro_batcher.start()
+        app.state.micro_batcher = micro_batcher
+    
+    # Surveillance de la croissance mémoire (vocabulaire spaCy, RSS)
+    memory_guard = MemoryGuard(model_manager)
+    await memory_guard.start()
+    app.state.memory_guard = memory_guard
+    
+    # Index de recherche des documents récemment interrogés
+    app.state.search_index_cache = SearchIndexCache()
+    
+    # Documents analysés (DocBin) réutilisés par les routes de suivi
+    if settings.enable_doc_cache:
+        app.state.doc_cache = DocCache()
+    
+    # Pool de processus pour l'extraction des documents
+    app.state.document_extractor = DocumentExtractor()
+    
+    # Évaluation du modèle candidat sur un échantillon du trafic
+    if settings.shadow_model and settings.shadow_sample_rate > 0:
+        shadow_evaluator = ShadowEvaluator(model_manager)
+        if await shadow_evaluator.start():
+            app.state.shadow_evaluator = shadow_evaluator
+    
+    # Mode coordinateur: répartition des très gros textes sur les pairs
+    if settings.coordinator_peers:
+        coordinator = ChunkCoordinator()
+        await coordinator.start()
+        app.state.coordinator = coordinator
+    
+    # Démarrer le pool de workers des jobs asynchrones
+    job_manager = JobManager()
+    await job_manager.start()
+    app.state.job_manager = job_manager
+    
+    # Changement de modèle à chaud (POST /api/v1/models/reload)
+    app.state.model_swapper = ModelSwapper(app)
+    
     logger.info("✅ AI Service started successfully")
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down AI Service...")
+    if hasattr(app.state, 'model_swapper'):
+        await app.state.model_swapper.stop()
+    if hasattr(app.state, 'job_manager'):
+        await app.state.job_manager.stop()
+    if hasattr(app.state, 'shadow_evaluator'):
+        await app.state.shadow_evaluator.stop()
+    if hasattr(app.state, 'coordinator'):
+        await app.state.coordinator.stop()
+    if hasattr(app.state, 'micro_batcher'):
+        await app.state.micro_batcher.stop()
+    if hasattr(app.state, 'document_extractor'):
+        app.state.document_extractor.shutdown()
+    if hasattr(app.state, 'memory_guard'):
+        await app.state.memory_guard.stop()
     if hasattr(app.state, 'model_manager'):
         await app.state.model_manager.cleanup()
     logger.info("✅ AI Service shutdown complete")
@@ -59,6 +132,9 @@ app.add_middleware(
 # Routes API
 app.include_router(api_router, prefix="/api/v1")
 
+# Métriques Prometheus
+app.mount("/metrics", make_asgi_app())
+
 # Route de santé simple
 @app.get("/health")
 async def health_check():
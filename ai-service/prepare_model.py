@@ -0,0 +1,62 @@
+# ai-service/prepare_model.py
+"""
+Préparation d'un snapshot allégé du modèle spaCy
+
+    python prepare_model.py --vectors 50000 --eval-dir ./samples
+
+Le snapshot (NER et senter, vecteurs réduits) est écrit dans
+MODEL_CACHE_DIR/spacy/<modèle>-trimmed et chargé automatiquement par le
+ModelManager (USE_MODEL_SNAPSHOT), vecteurs mappés en mémoire partagée.
+"""
+import os
+import json
+import argparse
+
+from src.config.settings import settings
+from src.config.model_snapshot import (
+    DEFAULT_EVAL_TEXTS,
+    SNAPSHOT_COMPONENTS,
+    build_report,
+    export_snapshot,
+    get_snapshot_path,
+)
+from src.utils.logger import logger
+
+
+def load_eval_texts(eval_dir: str, limit: int):
+    """Charger les textes d'évaluation (.txt) d'un dossier"""
+    texts = []
+    for name in sorted(os.listdir(eval_dir)):
+        if name.endswith(".txt"):
+            with open(os.path.join(eval_dir, name), encoding="utf-8", errors="replace") as f:
+                texts.append(f.read())
+        if len(texts) >= limit:
+            break
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporter un snapshot allégé du modèle spaCy")
+    parser.add_argument("--model", default=settings.spacy_model, help="Modèle spaCy d'origine")
+    parser.add_argument("--output", default=None, help="Dossier du snapshot")
+    parser.add_argument("--vectors", type=int, default=settings.snapshot_vectors, help="Nombre de vecteurs conservés")
+    parser.add_argument("--keep", nargs="*", default=list(SNAPSHOT_COMPONENTS),
+                        help="Composants à conserver (sans senter, pas de phrases pour les documents en cache)")
+    parser.add_argument("--eval-dir", default=None, help="Dossier de textes pour mesurer l'écart de précision")
+    parser.add_argument("--eval-limit", type=int, default=200, help="Nombre maximum de textes d'évaluation")
+    parser.add_argument("--no-report", action="store_true", help="Ne pas comparer au modèle d'origine")
+    args = parser.parse_args()
+
+    output_dir = args.output or get_snapshot_path(args.model)
+    export_snapshot(args.model, output_dir, args.vectors, keep_components=args.keep)
+
+    if args.no_report:
+        return
+
+    eval_texts = load_eval_texts(args.eval_dir, args.eval_limit) if args.eval_dir else DEFAULT_EVAL_TEXTS
+    report = build_report(args.model, output_dir, eval_texts)
+    logger.info(f"Snapshot report:\n{json.dumps(report, indent=2, ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
 # ai-service/src/api/main.py
-from fastapi import APIRouter
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from pydantic import BaseModel
+from ..config.settings import settings
+from ..services.model_swapper import SwapInProgressError, UnknownModelError
 from .routes.analyze import router as analyze_router
 from .routes.search import router as search_router
 from .routes.validate import router as validate_router
+from .routes.groups import router as groups_router
+from .routes.jobs import router as jobs_router
+from .routes.anonymize import router as anonymize_router
 
 # Router principal de l'API
 api_router = APIRouter()
@@ -11,10 +19,53 @@ api_router = APIRouter()
 api_router.include_router(analyze_router, prefix="/analyze", tags=["analyze"])
 api_router.include_router(search_router, prefix="/search", tags=["search"])
 api_router.include_router(validate_router, prefix="/validate", tags=["validate"])
+api_router.include_router(groups_router, prefix="/suggest-groups", tags=["groups"])
+api_router.include_router(jobs_router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(anonymize_router, prefix="/anonymize", tags=["anonymize"])
 
 # Route d'information sur les modèles
 @api_router.get("/models")
-async def get_models_info(request):
+async def get_models_info(request: Request):
     """Obtenir les informations sur les modèles chargés"""
     model_manager = request.app.state.model_manager
     return model_manager.get_model_info()
+
+# Évaluation du modèle candidat (shadow)
+@api_router.get("/models/shadow")
+async def get_shadow_summary(request: Request):
+    """Comparer le modèle candidat au modèle principal sur le trafic échantillonné"""
+    shadow_evaluator = getattr(request.app.state, "shadow_evaluator", None)
+    if shadow_evaluator is None:
+        raise HTTPException(status_code=404, detail="Shadow evaluation not enabled")
+    return shadow_evaluator.get_summary()
+
+# Changement de modèle à chaud
+class ModelReloadRequest(BaseModel):
+    spacy_model: Optional[str] = None  # Modèle spaCy cible (défaut: modèle en service, rechargé)
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Dependency: jeton d'administration (routes désactivées si ADMIN_TOKEN n'est pas défini)"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints disabled (ADMIN_TOKEN not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@api_router.post("/models/reload", status_code=202, dependencies=[Depends(require_admin)])
+async def reload_models(request: Request, body: Optional[ModelReloadRequest] = None):
+    """
+    Charger un modèle en arrière-plan puis basculer sans interruption
+
+    Le modèle en service répond jusqu'à la bascule; les requêtes en cours se
+    terminent sur l'ancien modèle avant sa libération. Suivi via GET.
+    """
+    try:
+        return request.app.state.model_swapper.start(body.spacy_model if body else None)
+    except SwapInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.get("/models/reload", dependencies=[Depends(require_admin)])
+async def get_reload_status(request: Request):
+    """État du dernier changement de modèle"""
+    return request.app.state.model_swapper.get_status()
@@ -1,26 +1,61 @@
 # ai-service/src/api/routes/analyze.py
+import os
+import json
+import math
 import time
 import asyncio
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Request
-from pydantic import BaseModel, Field
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from typing import Awaitable, Callable, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Request, UploadFile, File, Form
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, Field, ValidationError, model_validator
 
+from ..uploads import UploadRoute, remove_upload, upload_too_large
 from ...processors.ner_processor import NERProcessor
 from ...processors.entity_classifier import EntityClassifier
 from ...processors.confidence_calculator import ConfidenceCalculator
+from ...processors.document_extractor import detect_document_type
+from ...processors.doc_cache import ParsedDocument
+from ...services.admission_controller import OverloadedError
+from ...services.coordinator import HOP_HEADER
+from ...utils.compression import BodyTooLargeError, CorruptBodyError, UnsupportedEncodingError, read_body
 from ...utils.logger import logger
+from ...utils.text_processing import NormalizedText, merge_ranges, normalize_text, resolve_language
 from ...config.settings import settings
 
 router = APIRouter()
 
 # Modèles de données
+class TextRange(BaseModel):
+    start: int = Field(..., ge=0)
+    end: int = Field(..., ge=0)
+
 class AnalyzeRequest(BaseModel):
     text: str = Field(..., max_length=settings.max_text_length)
     mode: str = Field(default="ner", description="Mode d'analyse: 'ner' ou 'hybrid'")
-    language: str = Field(default="fr", description="Langue du texte")
+    language: str = Field(default="fr", description="Langue du texte ('auto' pour la détecter)")
     confidence_threshold: float = Field(default=0.5, ge=0.0, le=1.0)
     include_regex: bool = Field(default=True, description="Inclure les patterns regex")
     entity_types: Optional[List[str]] = Field(default=None, description="Types d'entités à extraire")
+    propagate_mentions: bool = Field(default=True, description="Propager les entités détectées à toutes leurs occurrences")
+    deadline_ms: Optional[int] = Field(default=None, ge=1, description="Budget de temps: réponse partielle à l'échéance")
+    ranges: Optional[List[TextRange]] = Field(default=None, description="Intervalles à analyser (reprise d'une réponse partielle)")
+    
+    @model_validator(mode="after")
+    def check_ranges(self) -> "AnalyzeRequest":
+        """Intervalles non vides et compris dans le texte (aucun n'est ignoré)"""
+        if self.ranges is None:
+            return self
+        if not self.ranges:
+            raise ValueError("ranges must not be empty (omit it to analyze the whole text)")
+        for r in self.ranges:
+            if not r.start < r.end <= len(self.text):
+                raise ValueError(f"Invalid range [{r.start}, {r.end}): expected start < end <= {len(self.text)}")
+        return self
 
 class EntityResult(BaseModel):
     text: str
@@ -29,120 +64,486 @@ class EntityResult(BaseModel):
     end: int
     confidence: float
     source: str  # 'ner' ou 'regex'
+    page: Optional[int] = None  # Numéro de page (analyse de documents)
 
 class AnalyzeResponse(BaseModel):
     entities: List[EntityResult]
     processing_time: float
     model_info: dict
     statistics: dict
+    partial: bool = False  # Échéance atteinte avant la fin du NER
+    coverage: List[TextRange] = []  # Intervalles entièrement analysés
+    remaining: List[TextRange] = []  # Intervalles à soumettre à nouveau (champ `ranges`)
+    document_handle: Optional[str] = None  # Identifiant du document analysé (routes de suivi)
 
-def get_processors(request: Request):
-    """Dependency pour obtenir les processeurs"""
+async def get_processors(request: Request):
+    """
+    Dependency pour obtenir les processeurs
+    
+    L'instance du modèle est réservée jusqu'à la fin de la requête: un
+    changement de modèle à chaud attend sa fin avant de la libérer.
+    """
     model_manager = request.app.state.model_manager
     
     if not model_manager.is_ready():
         raise HTTPException(status_code=503, detail="AI models not ready")
     
+    async with model_manager.lease():
+        yield build_processors(request.app.state, model_manager)
+
+def build_processors(state, model_manager) -> dict:
+    """Processeurs d'analyse liés à une instance du modèle"""
     return {
-        'ner_processor': NERProcessor(model_manager),
+        'ner_processor': NERProcessor(
+            model_manager,
+            micro_batcher=getattr(state, "micro_batcher", None)
+        ),
         'entity_classifier': EntityClassifier(),
-        'confidence_calculator': ConfidenceCalculator()
+        'confidence_calculator': ConfidenceCalculator(),
+        'shadow_evaluator': getattr(state, "shadow_evaluator", None),
+        'doc_cache': getattr(state, "doc_cache", None)
     }
 
-@router.post("/", response_model=AnalyzeResponse)
-async def analyze_text(
+async def load_parsed_document(request: Request, handle: str) -> ParsedDocument:
+    """Document analysé par /analyze, retrouvé à partir de son identifiant"""
+    doc_cache = getattr(request.app.state, "doc_cache", None)
+    document = await doc_cache.load(handle, request.app.state.model_manager) if doc_cache else None
+    if document is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired document handle")
+    return document
+
+class StageTimer:
+    """Durées des étapes du pipeline (ms), renvoyées dans les statistiques"""
+    
+    def __init__(self):
+        self.timings = {}
+        self._last = time.perf_counter()
+    
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.timings[stage] = round((now - self._last) * 1000, 2)
+        self._last = now
+
+async def run_analysis(
     request: AnalyzeRequest,
-    req: Request,
-    processors: dict = Depends(get_processors)
-):
+    processors: dict,
+    model_manager,
+    on_partial: Optional[Callable[[str, List[EntityResult]], Awaitable[None]]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    cache_document: bool = False
+) -> AnalyzeResponse:
     """
-    Analyser un texte pour extraire les entités nommées
+    Exécuter le pipeline d'analyse complet (NER, regex, déduplication, confiance)
+    
+    `on_partial` est appelé après chaque étape d'extraction avec les entités
+    brutes déjà trouvées, pour les traitements asynchrones (jobs);
+    `cancel_event` interrompt le NER en cours dans son thread (job annulé).
+    `cache_document` conserve les Doc pour les routes de suivi: réservé aux
+    analyses demandées par un client (pas aux pages ni aux morceaux).
     """
     start_time = time.time()
+    timer = StageTimer()
     
-    try:
-        logger.info(f"Analyzing text: {len(request.text)} characters, mode: {request.mode}")
-        
-        # Validation de la langue
-        if request.language != "fr":
-            logger.warning(f"Unsupported language: {request.language}, using French models")
-        
-        # Initialiser les processeurs
-        ner_processor = processors['ner_processor']
-        entity_classifier = processors['entity_classifier']
-        confidence_calculator = processors['confidence_calculator']
+    # Échéance, avec une marge pour la déduplication et le calcul de confiance
+    deadline = None
+    if request.deadline_ms:
+        deadline = time.monotonic() + (request.deadline_ms - settings.deadline_reserve_ms) / 1000
+    
+    logger.info(f"Analyzing text: {len(request.text)} characters, mode: {request.mode}")
+    
+    # Langue du texte (détection automatique si demandée)
+    language = resolve_language(request.language, request.text)
+    timer.lap("language")
+    
+    # Texte nettoyé pour les extracteurs (césures, ligatures, espaces insécables);
+    # les offsets sont ramenés au texte d'origine avant d'être renvoyés
+    normalized = normalize_text(request.text) if settings.enable_text_normalization else None
+    text = normalized.text if normalized else request.text
+    timer.lap("normalize")
+    
+    # Intervalles demandés (offsets d'origine), ramenés sur le texte normalisé
+    ranges = [(0, len(text))]
+    if request.ranges is not None:
+        ranges = merge_ranges([
+            normalized.from_original(r.start, r.end) if normalized else (r.start, r.end)
+            for r in request.ranges
+        ])
+    coverage, remaining = ranges, []
+    
+    # Initialiser les processeurs
+    ner_processor = processors['ner_processor']
+    entity_classifier = processors['entity_classifier']
+    confidence_calculator = processors['confidence_calculator']
+    
+    # 1. Extraction avec patterns regex (rapide, disponible en premier)
+    regex_entities = []
+    if request.include_regex:
+        regex_entities = await ner_processor.extract_regex_entities(text)
+        if request.ranges:
+            regex_entities = [e for e in regex_entities if _in_ranges(e.start, e.end, ranges)]
+        timer.lap("regex")
+        if on_partial:
+            await on_partial("regex", _to_results(_restore_offsets(regex_entities, normalized)))
+    
+    # 2. Extraction NER avec spaCy
+    ner_entities = []
+    document_handle = None
+    if request.mode in ["ner", "hybrid"]:
+        # Doc conservés pour les routes de suivi (texte entièrement analysé uniquement)
+        doc_cache = processors.get('doc_cache') if cache_document else None
+        parsed_docs = [] if doc_cache is not None and not request.ranges else None
         
-        # 1. Extraction NER avec spaCy
-        ner_entities = []
-        if request.mode in ["ner", "hybrid"]:
+        # L'échéance ne peut borner le NER que sur un texte découpé en plusieurs morceaux
+        if request.ranges or (deadline is not None and len(text) > settings.deadline_chunk_size):
+            # Morceaux dans l'ordre du texte (premières pages d'abord) jusqu'à l'échéance
+            ner_entities, coverage, remaining = await ner_processor.extract_entities_until(
+                text=text,
+                deadline=deadline if deadline is not None else math.inf,
+                entity_types=request.entity_types,
+                language=language,
+                ranges=ranges,
+                parsed_docs=parsed_docs,
+                cancel_event=cancel_event
+            )
+            chunk_size = settings.deadline_chunk_size
+        else:
             ner_entities = await ner_processor.extract_entities(
-                text=request.text,
-                entity_types=request.entity_types
+                text=text,
+                entity_types=request.entity_types,
+                language=language,
+                parsed_docs=parsed_docs,
+                cancel_event=cancel_event
             )
+            chunk_size = settings.ner_chunk_size
+        timer.lap("ner")
         
-        # 2. Extraction avec patterns regex
-        regex_entities = []
-        if request.include_regex:
-            regex_entities = await ner_processor.extract_regex_entities(request.text)
-        
-        # 3. Combiner et déduplicater
-        all_entities = ner_entities + regex_entities
-        deduplicated_entities = entity_classifier.deduplicate_entities(all_entities)
-        
-        # 4. Calculer les scores de confiance
-        entities_with_confidence = confidence_calculator.calculate_confidence(
-            deduplicated_entities, 
-            request.text
-        )
-        
-        # 5. Filtrer par seuil de confiance
-        filtered_entities = [
-            entity for entity in entities_with_confidence
-            if entity.confidence >= request.confidence_threshold
-        ]
-        
-        # 6. Formatter la réponse
-        result_entities = [
-            EntityResult(
-                text=entity.text,
-                label=entity.label,
-                start=entity.start,
-                end=entity.end,
-                confidence=entity.confidence,
-                source=entity.source
+        # Jamais de document pour une réponse partielle (Doc incomplets)
+        if parsed_docs and not remaining:
+            document_handle = doc_cache.store(
+                request.text, normalized, parsed_docs, language, ner_processor.model_manager.instance_id
             )
-            for entity in filtered_entities
-        ]
-        
-        processing_time = time.time() - start_time
-        
-        # Statistiques
-        statistics = {
-            "total_entities": len(all_entities),
-            "after_deduplication": len(deduplicated_entities),
-            "after_filtering": len(filtered_entities),
-            "entities_by_type": {},
-            "entities_by_source": {"ner": 0, "regex": 0}
-        }
         
-        for entity in filtered_entities:
-            # Par type
-            statistics["entities_by_type"][entity.label] = \
-                statistics["entities_by_type"].get(entity.label, 0) + 1
-            # Par source
-            statistics["entities_by_source"][entity.source] += 1
+        # Échantillon rejoué en arrière-plan sur le modèle candidat (texte complet, langue principale)
+        shadow_evaluator = processors.get('shadow_evaluator')
+        if shadow_evaluator and not request.ranges and not remaining and language == settings.default_language:
+            shadow_evaluator.maybe_submit(
+                text, ner_entities, ner_processor.compute_seconds, request.entity_types, chunk_size
+            )
+    
+        # 2b. Propager les mentions fiables à tout le document (si le budget le permet)
+        if (
+            ner_entities and request.propagate_mentions and settings.enable_mention_propagation
+            and (deadline is None or time.monotonic() < deadline)
+            and (cancel_event is None or not cancel_event.is_set())
+        ):
+            ner_entities += await ner_processor.propagate_entities(
+                text, ner_entities, confidence_calculator, language
+            )
+            timer.lap("propagation")
         
-        model_manager = req.app.state.model_manager
+        if on_partial:
+            await on_partial("ner", _to_results(_restore_offsets(ner_entities, normalized)))
+    
+    # 3. Combiner et déduplicater
+    all_entities = ner_entities + regex_entities
+    deduplicated_entities = entity_classifier.deduplicate_entities(all_entities)
+    timer.lap("deduplication")
+    
+    # 4. Calculer les scores de confiance
+    entities_with_confidence = confidence_calculator.calculate_confidence(
+        deduplicated_entities, 
+        text
+    )
+    timer.lap("confidence")
+    
+    # 5. Filtrer par seuil de confiance
+    filtered_entities = [
+        entity for entity in entities_with_confidence
+        if entity.confidence >= request.confidence_threshold
+    ]
+    
+    # 6. Formatter la réponse (offsets du texte d'origine)
+    result_entities = _to_results(_restore_offsets(filtered_entities, normalized))
+    timer.lap("formatting")
+    
+    processing_time = time.time() - start_time
+    
+    # Statistiques
+    statistics = {
+        "total_entities": len(all_entities),
+        "after_deduplication": len(deduplicated_entities),
+        "after_filtering": len(filtered_entities),
+        "language": language,
+        "entities_by_type": {},
+        "entities_by_source": {"ner": 0, "regex": 0},
+        "timings_ms": timer.timings
+    }
+    
+    for entity in filtered_entities:
+        # Par type
+        statistics["entities_by_type"][entity.label] = \
+            statistics["entities_by_type"].get(entity.label, 0) + 1
+        # Par source
+        statistics["entities_by_source"][entity.source] += 1
+    
+    logger.info(f"Analysis complete: {len(result_entities)} entities found in {processing_time:.2f}s")
+    if remaining:
+        logger.info(f"Deadline reached: {sum(end - start for start, end in remaining)} characters left for NER")
+    
+    return AnalyzeResponse(
+        entities=result_entities,
+        processing_time=processing_time,
+        model_info=model_manager.get_model_info(),
+        statistics=statistics,
+        partial=bool(remaining),
+        coverage=_ranges_to_original(coverage, normalized),
+        remaining=_ranges_to_original(remaining, normalized),
+        document_handle=document_handle
+    )
+
+def _in_ranges(start: int, end: int, ranges: List[Tuple[int, int]]) -> bool:
+    """Vérifier qu'un intervalle est contenu dans l'un des intervalles donnés"""
+    return any(range_start <= start and end <= range_end for range_start, range_end in ranges)
+
+def _ranges_to_original(ranges: List[Tuple[int, int]], normalized: Optional[NormalizedText]) -> List[TextRange]:
+    """Intervalles du texte normalisé exprimés en offsets du texte d'origine"""
+    return [
+        TextRange(start=start, end=end)
+        for start, end in (normalized.to_original(s, e) if normalized else (s, e) for s, e in ranges)
+    ]
+
+def _restore_offsets(entities: list, normalized: Optional[NormalizedText]) -> list:
+    """Ramener les entités extraites du texte normalisé sur le texte d'origine"""
+    if normalized is None or not normalized.changed:
+        return entities
+    
+    restored = []
+    for entity in entities:
+        start, end = normalized.to_original(entity.start, entity.end)
+        restored.append(replace(entity, start=start, end=end, text=normalized.original[start:end]))
+    return restored
+
+def _to_results(entities: list) -> List[EntityResult]:
+    """Convertir les entités internes au format de réponse"""
+    return [
+        EntityResult(
+            text=entity.text,
+            label=entity.label,
+            start=entity.start,
+            end=entity.end,
+            confidence=entity.confidence,
+            source=entity.source
+        )
+        for entity in entities
+    ]
+
+async def run_coordinated_analysis(
+    request: AnalyzeRequest,
+    req: Request,
+    processors: dict,
+    coordinator
+) -> AnalyzeResponse:
+    """
+    Analyser un très gros texte en répartissant ses morceaux sur les pairs
+    
+    Les morceaux que les pairs n'ont pas pu traiter sont analysés localement.
+    Les morceaux se chevauchent: les entités rebasées sur le texte complet
+    sont dédupliquées (mentions vues par deux morceaux, fragments d'entités
+    coupées à une frontière). La propagation des mentions reste limitée à
+    chaque morceau.
+    """
+    start_time = time.time()
+    model_manager = req.app.state.model_manager
+    
+    # Même langue pour tous les morceaux
+    language = resolve_language(request.language, request.text)
+    payload = request.model_dump(exclude={"text"})
+    payload["language"] = language
+    
+    logger.info(f"Coordinated analysis: {len(request.text)} characters")
+    outcome = await coordinator.fan_out(request.text, payload)
+    
+    chunk_responses = [
+        (result.start, AnalyzeResponse.model_validate(result.response))
+        for result in outcome.results
+    ]
+    
+    # Morceaux en échec chez les pairs: traitement local
+    for start, end in outcome.failed:
+        chunk_request = request.model_copy(update={"text": request.text[start:end], "language": language})
+        async with admission(req, end - start):
+            chunk_responses.append((start, await run_analysis(chunk_request, processors, model_manager)))
+    
+    rebased = [
+        entity.model_copy(update={"start": entity.start + offset, "end": entity.end + offset})
+        for offset, response in chunk_responses
+        for entity in response.entities
+    ]
+    entities = sorted(
+        processors['entity_classifier'].deduplicate_entities(rebased),
+        key=lambda entity: entity.start
+    )
+    
+    # Couverture de chaque morceau (échéance éventuelle), rebasée sur le texte complet
+    coverage = merge_ranges([
+        (text_range.start + offset, text_range.end + offset)
+        for offset, response in chunk_responses
+        for text_range in response.coverage
+    ])
+    remaining = merge_ranges([
+        (text_range.start + offset, text_range.end + offset)
+        for offset, response in chunk_responses
+        for text_range in response.remaining
+    ])
+    
+    processing_time = time.time() - start_time
+    
+    statistics = {
+        "total_entities": sum(r.statistics.get("total_entities", 0) for _, r in chunk_responses),
+        "after_deduplication": len(entities),
+        "after_filtering": len(entities),
+        "language": language,
+        "entities_by_type": {},
+        "entities_by_source": {"ner": 0, "regex": 0},
+        "chunks": outcome.chunks,
+        "chunks_local": len(outcome.failed),
+        "peers_used": outcome.peers_used
+    }
+    
+    for entity in entities:
+        statistics["entities_by_type"][entity.label] = \
+            statistics["entities_by_type"].get(entity.label, 0) + 1
+        statistics["entities_by_source"][entity.source] = \
+            statistics["entities_by_source"].get(entity.source, 0) + 1
+    
+    logger.info(
+        f"Coordinated analysis complete: {len(entities)} entities, {outcome.chunks} chunks "
+        f"({len(outcome.failed)} local) in {processing_time:.2f}s"
+    )
+    
+    return AnalyzeResponse(
+        entities=entities,
+        processing_time=processing_time,
+        model_info=model_manager.get_model_info(),
+        statistics=statistics,
+        partial=bool(remaining),
+        coverage=[TextRange(start=start, end=end) for start, end in coverage],
+        remaining=[TextRange(start=start, end=end) for start, end in remaining]
+    )
+
+@asynccontextmanager
+async def admission(req: Request, cost: int):
+    """Passer par le contrôle d'admission (s'il est configuré)"""
+    controller = getattr(req.app.state, "admission_controller", None)
+    if controller is None:
+        yield
+        return
+    
+    try:
+        async with controller.admit(cost):
+            yield
+    except OverloadedError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+# Options de la requête en paramètres d'URL (corps text/plain)
+QUERY_OPTIONS = ["mode", "language", "confidence_threshold", "include_regex", "propagate_mentions", "deadline_ms"]
+
+ANALYZE_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": AnalyzeRequest.model_json_schema()},
+            "text/plain": {"schema": {"type": "string"}},
+        },
+        "description": (
+            "JSON (AnalyzeRequest) ou texte brut avec les options en paramètres d'URL. "
+            "Content-Encoding gzip, deflate ou zstd accepté."
+        ),
+    }
+}
+
+async def parse_analyze_request(req: Request) -> AnalyzeRequest:
+    """
+    Lire le corps de /analyze: JSON ou texte brut, éventuellement compressé
+    
+    Le corps est décompressé en flux avec une limite de taille contrôlée
+    pendant le décodage. Le JSON est validé directement depuis les octets
+    (sans passer par json.loads); un corps text/plain évite l'échappement
+    JSON, ses options sont lues dans les paramètres d'URL.
+    """
+    content_length = req.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.max_request_body_size:
+        raise HTTPException(status_code=413, detail=f"Request body too large (max {settings.max_request_body_size} bytes)")
+    
+    try:
+        body = await read_body(req.stream(), req.headers.get("content-encoding"), settings.max_request_body_size)
+    except BodyTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedEncodingError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except CorruptBodyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    content_type, _, params = req.headers.get("content-type", "application/json").partition(";")
+    content_type = content_type.strip().lower()
+    
+    try:
+        if content_type == "application/json":
+            return AnalyzeRequest.model_validate_json(body)
         
-        logger.info(f"Analysis complete: {len(result_entities)} entities found in {processing_time:.2f}s")
+        if content_type == "text/plain":
+            charset = params.partition("charset=")[2].strip().strip('"') or "utf-8"
+            options = {key: req.query_params[key] for key in QUERY_OPTIONS if key in req.query_params}
+            entity_types = [
+                entity_type.strip()
+                for value in req.query_params.getlist("entity_types")
+                for entity_type in value.split(",")
+                if entity_type.strip()
+            ]
+            if entity_types:
+                options["entity_types"] = entity_types
+            return AnalyzeRequest.model_validate({**options, "text": body.decode(charset)})
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    except (UnicodeDecodeError, LookupError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid text encoding: {e}")
+    
+    raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type}")
+
+@router.post("/", response_model=AnalyzeResponse, openapi_extra=ANALYZE_OPENAPI)
+async def analyze_text(
+    req: Request,
+    processors: dict = Depends(get_processors)
+):
+    """
+    Analyser un texte pour extraire les entités nommées
+    """
+    parse_start = time.perf_counter()
+    request = await parse_analyze_request(req)
+    parse_time = round((time.perf_counter() - parse_start) * 1000, 2)
+    
+    try:
+        # Très gros texte: répartition des morceaux sur les instances pairs
+        coordinator = getattr(req.app.state, "coordinator", None)
+        if coordinator and not request.ranges and coordinator.should_fan_out(request.text, req.headers):
+            response = await run_coordinated_analysis(request, req, processors, coordinator)
+        else:
+            async with admission(req, len(request.text)):
+                # Pas de document pour un morceau demandé par un coordinateur
+                response = await run_analysis(
+                    request, processors, req.app.state.model_manager,
+                    cache_document=HOP_HEADER not in req.headers
+                )
         
-        return AnalyzeResponse(
-            entities=result_entities,
-            processing_time=processing_time,
-            model_info=model_manager.get_model_info(),
-            statistics=statistics
-        )
+        response.statistics.setdefault("timings_ms", {})["parse"] = parse_time
+        return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Analysis error: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
@@ -166,18 +567,20 @@ async def analyze_batch(
         if len(texts) > 10:  # Limite de sécurité
             raise HTTPException(status_code=400, detail="Maximum 10 texts per batch")
         
-        # Traiter en parallèle
-        tasks = []
-        for i, text in enumerate(texts):
-            request = AnalyzeRequest(
-                text=text,
-                mode=mode,
-                confidence_threshold=confidence_threshold
-            )
-            task = analyze_text(request, req, processors)
-            tasks.append(task)
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Traiter en parallèle (admission unique pour le coût total du lot)
+        model_manager = req.app.state.model_manager
+        async with admission(req, sum(len(text) for text in texts)):
+            tasks = []
+            for i, text in enumerate(texts):
+                request = AnalyzeRequest(
+                    text=text,
+                    mode=mode,
+                    confidence_threshold=confidence_threshold
+                )
+                task = run_analysis(request, processors, model_manager, cache_document=True)
+                tasks.append(task)
+            
+            results = await asyncio.gather(*tasks, return_exceptions=True)
         
         # Séparer les succès des erreurs
         successful_results = []
@@ -200,10 +603,117 @@ async def analyze_batch(
             "failed": len(errors)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Batch analysis error: {e}")
         raise HTTPException(status_code=500, detail=f"Batch analysis failed: {str(e)}")
 
+async def analyze_document(
+    req: Request,
+    file: UploadFile = File(...),
+    mode: str = Form(default="ner"),
+    confidence_threshold: float = Form(default=0.5, ge=0.0, le=1.0),
+    include_regex: bool = Form(default=True),
+    propagate_mentions: bool = Form(default=True),
+    entity_types: Optional[str] = Form(default=None, description="Types d'entités séparés par des virgules"),
+    processors: dict = Depends(get_processors)
+):
+    """
+    Analyser un document (PDF, DOCX, TXT) page par page
+    
+    Le fichier est écrit sur disque pendant la réception (UploadRoute, taille
+    limitée avant la lecture du formulaire), ses pages sont extraites dans un pool de
+    processus et les résultats sont renvoyés en NDJSON au fil de l'analyse,
+    avec les vrais numéros de page. Les offsets sont relatifs au texte complet
+    (pages séparées par un caractère \\f).
+    """
+    if file.size is not None and file.size > settings.max_upload_size:
+        raise upload_too_large()
+    
+    document_type = detect_document_type(file.filename, file.content_type)
+    if not document_type:
+        raise HTTPException(status_code=415, detail=f"Unsupported document type: {file.content_type}")
+    
+    extractor = getattr(req.app.state, "document_extractor", None)
+    if extractor is None:
+        raise HTTPException(status_code=503, detail="Document extraction not available")
+    
+    model_manager = req.app.state.model_manager
+    types = [t.strip() for t in entity_types.split(",") if t.strip()] if entity_types else None
+    
+    # Fichier déjà sur disque: supprimé par le flux ou après la réponse (par la route en cas d'erreur)
+    path = file.file.name
+    logger.info(f"Analyzing document: {file.filename} ({document_type})")
+    
+    async def stream_pages():
+        start_time = time.time()
+        offset = 0
+        page_count = 0
+        total_entities = 0
+        
+        try:
+            async for page_number, page_text in extractor.iter_pages(path, document_type):
+                entities = []
+                if page_text.strip():
+                    page_request = AnalyzeRequest(
+                        text=page_text,
+                        mode=mode,
+                        confidence_threshold=confidence_threshold,
+                        include_regex=include_regex,
+                        propagate_mentions=propagate_mentions,
+                        entity_types=types
+                    )
+                    async with admission(req, len(page_text)):
+                        response = await run_analysis(page_request, processors, model_manager)
+                    
+                    # Rebaser les offsets sur le document complet
+                    entities = [
+                        entity.model_copy(update={
+                            "start": entity.start + offset,
+                            "end": entity.end + offset,
+                            "page": page_number
+                        })
+                        for entity in response.entities
+                    ]
+                
+                yield json.dumps({
+                    "type": "page",
+                    "page": page_number,
+                    "offset": offset,
+                    "length": len(page_text),
+                    "entities": [entity.model_dump() for entity in entities]
+                }) + "\n"
+                
+                offset += len(page_text) + 1  # Séparateur \f entre les pages
+                page_count += 1
+                total_entities += len(entities)
+            
+            yield json.dumps({
+                "type": "summary",
+                "pages": page_count,
+                "total_entities": total_entities,
+                "processing_time": time.time() - start_time
+            }) + "\n"
+            
+        except HTTPException as e:
+            yield json.dumps({"type": "error", "status": e.status_code, "detail": e.detail}) + "\n"
+        except Exception as e:
+            logger.error(f"Document analysis error: {e}")
+            yield json.dumps({"type": "error", "status": 500, "detail": f"Document analysis failed: {str(e)}"}) + "\n"
+        finally:
+            remove_upload(path)
+    
+    # Suppression aussi après la réponse: le générateur n'est jamais démarré
+    # si le client se déconnecte avant le début du flux
+    return StreamingResponse(
+        stream_pages(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(remove_upload, path)
+    )
+
+router.add_api_route("/document", analyze_document, methods=["POST"], route_class_override=UploadRoute)
+
 @router.get("/supported-entities")
 async def get_supported_entities():
     """
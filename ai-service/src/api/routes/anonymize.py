@@ -0,0 +1,71 @@
+# ai-service/src/api/routes/anonymize.py
+import json
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from ...processors.anonymizer import Anonymizer, PseudonymMapper, ReplacementSpan
+from ...utils.logger import logger
+from ...config.settings import settings
+
+router = APIRouter()
+
+# Modèles de données
+class AnonymizeEntity(BaseModel):
+    start: int = Field(..., ge=0)
+    end: int = Field(..., ge=0)
+    label: str
+    replacement: Optional[str] = Field(default=None, description="Remplacement imposé (sinon pseudonyme cohérent)")
+
+class AnonymizeRequest(BaseModel):
+    text: str = Field(..., max_length=settings.max_text_length)
+    entities: List[AnonymizeEntity]
+    mapping: Optional[Dict[str, str]] = Field(default=None, description="Mapping des pseudonymes des tours précédents")
+    stream: Optional[bool] = Field(default=None, description="Réponse en flux NDJSON (automatique pour les gros textes)")
+
+class AnonymizeResponse(BaseModel):
+    text: str
+    mapping: Dict[str, str]
+    replacements: int
+
+@router.post("/")
+async def anonymize_text(request: AnonymizeRequest):
+    """
+    Appliquer les remplacements en une seule passe, avec des pseudonymes cohérents
+    """
+    anonymizer = Anonymizer(PseudonymMapper(request.mapping))
+    spans = [
+        ReplacementSpan(start=e.start, end=e.end, label=e.label, replacement=e.replacement)
+        for e in request.entities
+    ]
+
+    try:
+        spans = anonymizer.validate_spans(request.text, spans)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"Anonymizing text: {len(request.text)} characters, {len(spans)} entities")
+
+    stream = request.stream
+    if stream is None:
+        stream = len(request.text) > settings.anonymize_stream_threshold
+
+    if not stream:
+        return AnonymizeResponse(
+            text="".join(anonymizer.iter_chunks(request.text, spans)),
+            mapping=anonymizer.mapper.mapping,
+            replacements=len(spans)
+        )
+
+    def stream_chunks():
+        for chunk in anonymizer.iter_chunks(request.text, spans):
+            yield json.dumps({"type": "chunk", "text": chunk}) + "\n"
+        # Le mapping est complet une fois tout le texte parcouru
+        yield json.dumps({
+            "type": "summary",
+            "mapping": anonymizer.mapper.mapping,
+            "replacements": len(spans)
+        }) + "\n"
+
+    return StreamingResponse(stream_chunks(), media_type="application/x-ndjson")
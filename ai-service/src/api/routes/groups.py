@@ -0,0 +1,69 @@
+# ai-service/src/api/routes/groups.py
+import time
+from collections import Counter
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Request
+from pydantic import BaseModel, Field
+
+from ...processors.entity_grouper import EntityGrouper, Mention, mention_key
+from ...utils.logger import logger
+from .analyze import get_processors, load_parsed_document
+
+router = APIRouter()
+
+# Modèles de données
+class GroupEntity(BaseModel):
+    id: str
+    text: str = Field(..., min_length=1, max_length=500)
+    type: str
+
+class SuggestGroupsRequest(BaseModel):
+    entities: List[GroupEntity] = Field(..., max_length=5000)
+    document_handle: Optional[str] = Field(default=None, description="Identifiant renvoyé par /analyze")
+
+class GroupSuggestion(BaseModel):
+    name: str
+    type: str
+    entities: List[str]  # Identifiants des entités du groupe
+    confidence: float
+
+class SuggestGroupsResponse(BaseModel):
+    groups: List[GroupSuggestion]
+    processing_time: float
+
+@router.post("/", response_model=SuggestGroupsResponse)
+async def suggest_groups(
+    request: SuggestGroupsRequest,
+    req: Request,
+    processors: dict = Depends(get_processors)
+):
+    """
+    Suggérer des groupes d'entités désignant la même personne, organisation, etc.
+
+    Avec `document_handle`, les entités du modèle sur le document analysé
+    par /analyze donnent la fréquence de chaque forme: la plus fréquente
+    nomme le groupe, les groupes les plus présents viennent en premier.
+    """
+    start_time = time.time()
+
+    mention_counts = Counter()
+    if request.document_handle:
+        document = await load_parsed_document(req, request.document_handle)
+        ner_processor = processors['ner_processor']
+        for _, _, ent_text, spacy_label in document.entity_spans():
+            if ner_processor._map_spacy_label(spacy_label):
+                mention_counts[" ".join(mention_key(ent_text))] += 1
+
+    groups = EntityGrouper().suggest_groups(
+        [Mention(id=entity.id, text=entity.text, type=entity.type) for entity in request.entities],
+        mention_counts
+    )
+
+    logger.info(f"Suggested {len(groups)} groups for {len(request.entities)} entities")
+    return SuggestGroupsResponse(
+        groups=[
+            GroupSuggestion(name=group.name, type=group.type, entities=group.ids, confidence=group.confidence)
+            for group in groups
+        ],
+        processing_time=time.time() - start_time
+    )
@@ -0,0 +1,104 @@
+# ai-service/src/api/routes/jobs.py
+import json
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from pydantic import Field
+
+from .analyze import AnalyzeRequest, build_processors, get_processors, run_analysis
+from ...services.job_manager import JOB_PRIORITIES, JobQueueFullError
+from ...utils.logger import logger
+
+router = APIRouter()
+
+# Modèles de données
+class JobSubmitRequest(AnalyzeRequest):
+    priority: str = Field(default="interactive", description="Classe de priorité: 'interactive' ou 'bulk'")
+
+def get_job_manager(request: Request):
+    """Dependency pour obtenir le gestionnaire de jobs"""
+    job_manager = getattr(request.app.state, "job_manager", None)
+    if job_manager is None:
+        raise HTTPException(status_code=503, detail="Job manager not available")
+    return job_manager
+
+@router.post("/", status_code=202)
+async def submit_job(
+    request: JobSubmitRequest,
+    req: Request,
+    processors: dict = Depends(get_processors),
+    job_manager = Depends(get_job_manager)
+):
+    """
+    Soumettre une analyse asynchrone, retourne l'identifiant du job
+    """
+    if request.priority not in JOB_PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"Unknown priority: {request.priority}")
+
+    analyze_request = AnalyzeRequest(**request.model_dump(exclude={"priority"}))
+    state = req.app.state
+
+    async def runner(report_partial, cancel_event):
+        # Modèle en service au démarrage du job (il a pu changer depuis la soumission)
+        model_manager = state.model_manager
+        async with model_manager.lease():
+            processors = build_processors(state, model_manager)
+            response = await run_analysis(
+                analyze_request, processors, model_manager,
+                on_partial=report_partial, cancel_event=cancel_event,
+                cache_document=True
+            )
+        return response.model_dump()
+
+    try:
+        job = await job_manager.submit(
+            runner,
+            priority=request.priority,
+            metadata={"characters": len(request.text), "mode": request.mode}
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+    logger.info(f"Job {job['id']} submitted ({request.priority}, {len(request.text)} characters)")
+
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "queue_depth": job_manager.queue_depth()
+    }
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, job_manager = Depends(get_job_manager)):
+    """
+    Obtenir l'état, les entités partielles et le résultat d'un job
+    """
+    job = await job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+@router.get("/{job_id}/stream")
+async def stream_job(job_id: str, job_manager = Depends(get_job_manager)):
+    """
+    Suivre un job en Server-Sent Events jusqu'à sa fin
+    
+    Le premier événement contient les entités partielles déjà trouvées, les
+    suivants uniquement les nouvelles (`partial_entities`).
+    """
+    if not await job_manager.get(job_id):
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+
+    async def events():
+        async for job in job_manager.watch(job_id):
+            yield f"event: {job['status']}\ndata: {json.dumps(job)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str, job_manager = Depends(get_job_manager)):
+    """
+    Annuler un job en attente ou en cours
+    """
+    job = await job_manager.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return {"job_id": job_id, "status": job["status"]}
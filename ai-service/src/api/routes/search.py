@@ -0,0 +1,114 @@
+# ai-service/src/api/routes/search.py
+import time
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from ...processors.search_index import SEARCH_MODES, DocumentIndex, SearchIndexCache, extract_context
+from ...utils.logger import logger
+from ...config.settings import settings
+
+router = APIRouter()
+
+# Modèles de données
+class SearchRequest(BaseModel):
+    text: Optional[str] = Field(default=None, max_length=settings.max_text_length)
+    document_handle: Optional[str] = Field(default=None, description="Identifiant renvoyé par /analyze (à la place du texte)")
+    query: str = Field(..., min_length=1, max_length=500)
+    mode: str = Field(default="exact", description="Mode: 'exact', 'prefix', 'accent_insensitive' ou 'fuzzy'")
+    case_sensitive: bool = Field(default=False, description="Respecter la casse (modes exact et prefix)")
+    max_results: int = Field(default=20, ge=1, le=1000)
+    max_edits: Optional[int] = Field(default=None, ge=0, le=2, description="Modifications tolérées par mot (fuzzy)")
+
+class SearchResult(BaseModel):
+    text: str
+    start: int
+    end: int
+    context: str
+    similarity: float
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult]
+    total: int
+    processing_time: float
+    index: dict
+
+def get_search_cache(req: Request) -> SearchIndexCache:
+    """Cache des index partagé par l'application"""
+    cache = getattr(req.app.state, "search_index_cache", None)
+    if cache is None:
+        cache = req.app.state.search_index_cache = SearchIndexCache()
+    return cache
+
+async def get_document_index(cache: SearchIndexCache, text: str) -> DocumentIndex:
+    """Index du document, construit (dans un thread) au premier usage"""
+    key = cache.key(text)
+    index = cache.get(key)
+    if index is None:
+        start_time = time.time()
+        index = await asyncio.to_thread(DocumentIndex, text)
+        cache.put(key, index)
+        logger.info(f"Search index built: {index.token_count} tokens in {time.time() - start_time:.2f}s")
+    return index
+
+async def get_request_text(req: Request, text: Optional[str], document_handle: Optional[str]) -> str:
+    """Texte de la requête, ou texte d'origine du document mis en cache par /analyze"""
+    if document_handle:
+        doc_cache = getattr(req.app.state, "doc_cache", None)
+        cached = await doc_cache.get_text(document_handle) if doc_cache else None
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired document handle")
+        return cached
+    if text is None:
+        raise HTTPException(status_code=400, detail="Either text or document_handle is required")
+    return text
+
+@router.post("/", response_model=SearchResponse)
+async def search_text(request: SearchRequest, req: Request):
+    """
+    Rechercher une expression dans un document à partir de son index
+    
+    L'index est construit une fois par contenu puis réutilisé par les
+    recherches suivantes sur le même texte. Le texte peut être remplacé par
+    le `document_handle` renvoyé par /analyze. Le mode 'semantic' (client
+    existant) est traité comme une recherche approchée.
+    """
+    mode = "fuzzy" if request.mode == "semantic" else request.mode
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Unsupported search mode: {request.mode}")
+    
+    start_time = time.time()
+    cache = get_search_cache(req)
+    text = await get_request_text(req, request.text, request.document_handle)
+    
+    try:
+        index = await get_document_index(cache, text)
+        matches = index.search(
+            request.query,
+            mode=mode,
+            case_sensitive=request.case_sensitive,
+            max_results=request.max_results,
+            max_edits=request.max_edits
+        )
+    except Exception as e:
+        logger.error(f"Search error: {e}")
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+    
+    results = [
+        SearchResult(
+            text=text[match.start:match.end],
+            start=match.start,
+            end=match.end,
+            context=extract_context(text, match.start, match.end, settings.search_context_chars),
+            similarity=match.similarity
+        )
+        for match in matches
+    ]
+    
+    return SearchResponse(
+        results=results,
+        total=len(results),
+        processing_time=time.time() - start_time,
+        index={"tokens": index.token_count, "terms": len(index.terms), **cache.get_stats()}
+    )
@@ -0,0 +1,129 @@
+# ai-service/src/api/routes/validate.py
+import time
+from collections import Counter
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from ...processors.ner_processor import Entity
+from ...processors.entity_grouper import mention_key
+from ...utils.logger import logger
+from ...config.settings import settings
+from .analyze import get_processors, load_parsed_document
+from .search import get_document_index, get_search_cache
+
+router = APIRouter()
+
+# Ajustements du score selon le document
+DETECTED_BONUS = 0.1    # Le modèle a trouvé la même mention avec le même type
+ABSENT_PENALTY = 0.3    # La mention n'apparaît pas dans le document
+
+# Occurrences recherchées par entité
+MAX_OCCURRENCES = 50
+
+# Modèles de données
+class ValidateEntity(BaseModel):
+    text: str = Field(..., min_length=1, max_length=500)
+    type: str
+    confidence: Optional[float] = None
+
+class ValidateRequest(BaseModel):
+    entities: List[ValidateEntity] = Field(..., max_length=5000)
+    document_handle: Optional[str] = Field(default=None, description="Identifiant renvoyé par /analyze")
+    text: Optional[str] = Field(default=None, max_length=settings.max_text_length, description="Texte du document (sans identifiant)")
+
+class ValidatedEntity(BaseModel):
+    text: str
+    type: str
+    confidence: float
+    occurrences: Optional[int] = None  # Occurrences dans le document (si connu)
+    detected: bool = False  # Trouvée par le modèle avec le même type
+
+class ValidateResponse(BaseModel):
+    entities: List[ValidatedEntity]
+    processing_time: float
+
+@router.post("/", response_model=ValidateResponse)
+async def validate_entities(
+    request: ValidateRequest,
+    req: Request,
+    processors: dict = Depends(get_processors)
+):
+    """
+    Recalculer la confiance d'entités (ajoutées ou modifiées côté client)
+
+    Avec `document_handle`, le document analysé par /analyze est réutilisé:
+    occurrences (index de recherche), phrase de chaque mention pour le
+    contexte, et accord avec les entités du modèle. Avec `text`, seules les
+    occurrences et le contexte sont pris en compte; sans document, le score
+    ne dépend que de la mention.
+    """
+    start_time = time.time()
+    ner_processor = processors['ner_processor']
+    confidence_calculator = processors['confidence_calculator']
+
+    document = None
+    text = request.text
+    detected = Counter()
+    if request.document_handle:
+        document = await load_parsed_document(req, request.document_handle)
+        text = document.original
+        for _, _, ent_text, spacy_label in document.entity_spans():
+            label = ner_processor._map_spacy_label(spacy_label)
+            if label:
+                detected[(mention_key(ent_text), label)] += 1
+
+    index = await get_document_index(get_search_cache(req), text) if text is not None else None
+
+    try:
+        scored = []
+        occurrences = []
+        for item in request.entities:
+            start, end, context, found = 0, len(item.text), None, None
+            if index is not None:
+                matches = index.search(item.text, mode="exact", max_results=MAX_OCCURRENCES)
+                found = len(matches)
+                if matches:
+                    start, end = matches[0].start, matches[0].end
+                    context = _mention_context(document, text, start, end, ner_processor)
+            occurrences.append(found)
+            scored.append(Entity(
+                text=item.text,
+                label=item.type,
+                start=start,
+                end=end,
+                confidence=0.0,
+                source="ner",
+                context=context
+            ))
+        scores = confidence_calculator.score_batch(scored).tolist() if scored else []
+    except Exception as e:
+        logger.error(f"Validation error: {e}")
+        raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
+
+    results = []
+    for item, score, found in zip(request.entities, scores, occurrences):
+        is_detected = detected[(mention_key(item.text), item.type)] > 0
+        if is_detected:
+            score += DETECTED_BONUS
+        if found == 0:
+            score -= ABSENT_PENALTY
+        results.append(ValidatedEntity(
+            text=item.text,
+            type=item.type,
+            confidence=round(min(1.0, max(0.1, score)), 3),
+            occurrences=found,
+            detected=is_detected
+        ))
+
+    logger.info(f"Validated {len(results)} entities in {time.time() - start_time:.2f}s")
+    return ValidateResponse(entities=results, processing_time=time.time() - start_time)
+
+def _mention_context(document, text: str, start: int, end: int, ner_processor) -> str:
+    """Phrase de la mention (document analysé), sinon fenêtre de caractères"""
+    if document is not None:
+        norm_start, norm_end = document.normalized.from_original(start, end)
+        sentence = document.sentence(norm_start, norm_end)
+        if sentence:
+            return document.text[sentence[0]:sentence[1]]
+    return ner_processor._extract_context(text, start, end)
@@ -0,0 +1,102 @@
+# ai-service/src/api/uploads.py
+import os
+import tempfile
+from typing import AsyncIterator, Callable, List
+
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from starlette.datastructures import FormData
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from ..config.settings import settings
+
+
+# Marge pour les autres champs du formulaire et les délimiteurs multipart
+FORM_OVERHEAD = 64 * 1024
+
+
+def upload_too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File too large (max {settings.max_upload_size} bytes)")
+
+
+def remove_upload(path: str):
+    """Supprimer le fichier temporaire d'un document (déjà supprimé: ignoré)"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def _limited_stream(stream: AsyncIterator[bytes], limit: int) -> AsyncIterator[bytes]:
+    """Relayer le corps de la requête, interrompu dès que `limit` octets sont dépassés"""
+    size = 0
+    async for chunk in stream:
+        size += len(chunk)
+        if size > limit:
+            raise upload_too_large()
+        yield chunk
+
+
+class DiskMultiPartParser(MultiPartParser):
+    """Parser multipart qui écrit chaque fichier reçu dans un fichier nommé de UPLOAD_TMP_DIR"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.paths: List[str] = []
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        upload = self._current_part.file
+        if upload is not None:
+            suffix = os.path.splitext(upload.filename or "")[1]
+            upload.file = tempfile.NamedTemporaryFile(suffix=suffix, dir=settings.upload_tmp_dir, delete=False)
+            self.paths.append(upload.file.name)
+
+
+class UploadRequest(Request):
+    """
+    Requête d'envoi de document
+
+    Starlette lit tout le formulaire avant d'appeler la route: la taille est
+    donc contrôlée ici, sur Content-Length puis pendant la lecture du flux.
+    Les fichiers sont écrits une seule fois, directement sur disque;
+    `file.file.name` est le chemin transmis aux extracteurs.
+    """
+
+    upload_paths: List[str] = []
+
+    async def form(self, **kwargs) -> FormData:
+        limit = settings.max_upload_size + FORM_OVERHEAD
+        content_length = self.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            raise upload_too_large()
+
+        content_type = self.headers.get("content-type", "")
+        if self._form is not None or not content_type.startswith("multipart/form-data"):
+            return await super().form(**kwargs)
+
+        parser = DiskMultiPartParser(self.headers, _limited_stream(self.stream(), limit))
+        self.upload_paths = parser.paths
+        try:
+            self._form = await parser.parse()
+        except MultiPartException as e:
+            raise HTTPException(status_code=400, detail=e.message)
+        return self._form
+
+
+class UploadRoute(APIRoute):
+    """Route recevant un document: les fichiers reçus sont supprimés si la requête échoue"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def upload_handler(request: Request) -> Response:
+            request = UploadRequest(request.scope, request.receive)
+            try:
+                return await handler(request)
+            except BaseException:
+                for path in request.upload_paths:
+                    remove_upload(path)
+                raise
+
+        return upload_handler
@@ -0,0 +1,210 @@
+# ai-service/src/config/model_pool.py
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+import spacy
+
+from .settings import settings
+from .model_snapshot import get_snapshot_path, load_snapshot
+from ..utils.logger import logger
+from ..utils.memory import get_rss_bytes
+from ..utils.gc_tuning import freeze_new_objects, schedule_refreeze
+
+
+@dataclass
+class PoolEntry:
+    """Modèle chargé dans le pool"""
+    language: str
+    model_name: str
+    nlp: spacy.Language
+    size_bytes: int
+    last_used: float
+    in_use: int = 0
+    pinned: bool = False
+    vocab_baseline: int = 0
+
+
+class ModelPool:
+    """
+    Pool de modèles spaCy par langue, chargés à la demande
+
+    Les modèles sont chargés au premier usage. Quand le budget mémoire est
+    dépassé, ou qu'un modèle reste inutilisé plus de `idle_ttl` secondes,
+    les modèles inactifs les moins récemment utilisés sont libérés.
+    """
+
+    def __init__(
+        self,
+        language_models: Optional[Dict[str, str]] = None,
+        memory_budget_mb: Optional[int] = None,
+        idle_ttl: Optional[int] = None
+    ):
+        self.language_models = language_models or settings.language_models
+        self.memory_budget = (memory_budget_mb or settings.model_memory_budget_mb) * 1024 * 1024
+        self.idle_ttl = idle_ttl if idle_ttl is not None else settings.model_idle_ttl
+        self._entries: "OrderedDict[str, PoolEntry]" = OrderedDict()
+        # Un seul chargement à la fois: la mesure de mémoire par différence de RSS reste fiable
+        self._load_lock = asyncio.Lock()
+
+    def supports(self, language: str) -> bool:
+        """Vérifier si un modèle est configuré pour la langue"""
+        return language in self.language_models
+
+    def register(self, language: str, model_name: str, nlp: spacy.Language, size_bytes: int):
+        """Ajouter un modèle déjà chargé (modèle principal), jamais évincé"""
+        self._entries[language] = PoolEntry(
+            language=language,
+            model_name=model_name,
+            nlp=nlp,
+            size_bytes=size_bytes,
+            last_used=time.monotonic(),
+            pinned=True,
+            vocab_baseline=len(nlp.vocab.strings)
+        )
+
+    @asynccontextmanager
+    async def acquire(self, language: str) -> AsyncIterator[spacy.Language]:
+        """Obtenir le modèle d'une langue, protégé de l'éviction pendant l'usage"""
+        entry = await self._get_entry(language)
+        entry.in_use += 1
+        try:
+            yield entry.nlp
+        finally:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+
+    async def preload(self, languages: Iterable[str]):
+        """Précharger les langues les plus demandées"""
+        for language in languages:
+            if not self.supports(language):
+                logger.warning(f"No model configured for preload language: {language}")
+                continue
+            try:
+                await self._get_entry(language)
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to preload model for {language}: {e}")
+
+    def evict(self, language: str) -> bool:
+        """Libérer le modèle d'une langue s'il est inactif"""
+        entry = self._entries.get(language)
+        if not entry or entry.pinned or entry.in_use:
+            return False
+        del self._entries[language]
+        schedule_refreeze()
+        logger.info(f"🧹 Evicted {entry.model_name} ({language}, {entry.size_bytes / 1024 / 1024:.0f}MB)")
+        return True
+
+    def evict_inactive(self) -> int:
+        """Libérer tous les modèles inactifs non épinglés, retourne la mémoire estimée libérée"""
+        freed = 0
+        for language, entry in list(self._entries.items()):
+            if self.evict(language):
+                freed += entry.size_bytes
+        return freed
+
+    def get_model_size(self, language: str) -> int:
+        """Mémoire estimée du modèle chargé pour une langue (0 si absent)"""
+        entry = self._entries.get(language)
+        return entry.size_bytes if entry else 0
+
+    def evict_grown(self, max_growth: int) -> int:
+        """Évincer les modèles inactifs dont le vocabulaire a trop grossi (rechargés au prochain usage)"""
+        evicted = 0
+        for language, entry in list(self._entries.items()):
+            if len(entry.nlp.vocab.strings) - entry.vocab_baseline > max_growth:
+                evicted += self.evict(language)
+        return evicted
+
+    def evict_idle(self) -> int:
+        """Évincer les modèles inutilisés depuis plus de idle_ttl secondes (appelé aussi par le MemoryGuard)"""
+        if not self.idle_ttl:
+            return 0
+        evicted = 0
+        now = time.monotonic()
+        for language, entry in list(self._entries.items()):
+            if now - entry.last_used > self.idle_ttl:
+                evicted += self.evict(language)
+        return evicted
+
+    def clear(self):
+        """Libérer tous les modèles"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, object]:
+        """Obtenir l'état du pool"""
+        now = time.monotonic()
+        return {
+            "memory_budget_mb": self.memory_budget // (1024 * 1024),
+            "memory_used_mb": round(self._total_size() / 1024 / 1024, 1),
+            "configured": self.language_models,
+            "loaded": {
+                language: {
+                    "model": entry.model_name,
+                    "size_mb": round(entry.size_bytes / 1024 / 1024, 1),
+                    "in_use": entry.in_use,
+                    "idle_seconds": round(now - entry.last_used, 1),
+                    "pinned": entry.pinned,
+                }
+                for language, entry in self._entries.items()
+            },
+        }
+
+    async def _get_entry(self, language: str) -> PoolEntry:
+        """Obtenir (ou charger) l'entrée d'une langue et la marquer récente"""
+        self.evict_idle()
+
+        entry = self._entries.get(language)
+        if entry is None:
+            async with self._load_lock:
+                entry = self._entries.get(language)
+                if entry is None:
+                    entry = await self._load(language)
+                    self._entries[language] = entry
+                    self._enforce_budget(keep=language)
+
+        self._entries.move_to_end(language)
+        entry.last_used = time.monotonic()
+        return entry
+
+    async def _load(self, language: str) -> PoolEntry:
+        """Charger le modèle d'une langue dans un thread"""
+        model_name = self.language_models[language]
+        snapshot_path = get_snapshot_path(model_name)
+        logger.info(f"Loading spaCy model for {language}: {model_name}")
+
+        rss_before = get_rss_bytes()
+        if settings.use_model_snapshot and os.path.isdir(snapshot_path):
+            nlp = await asyncio.to_thread(load_snapshot, snapshot_path)
+        else:
+            nlp = await asyncio.to_thread(spacy.load, model_name)
+        size_bytes = max(0, get_rss_bytes() - rss_before)
+        freeze_new_objects()
+
+        logger.info(f"✅ spaCy model loaded for {language}: {model_name} (~{size_bytes / 1024 / 1024:.0f}MB)")
+        return PoolEntry(
+            language=language,
+            model_name=model_name,
+            nlp=nlp,
+            size_bytes=size_bytes,
+            last_used=time.monotonic(),
+            vocab_baseline=len(nlp.vocab.strings)
+        )
+
+    def _enforce_budget(self, keep: str):
+        """Évincer les modèles inactifs les moins récents tant que le budget est dépassé"""
+        for language in list(self._entries):
+            if self._total_size() <= self.memory_budget:
+                break
+            if language != keep:
+                self.evict(language)
+
+        if self._total_size() > self.memory_budget:
+            logger.warning(f"Model pool over budget: {self._total_size() / 1024 / 1024:.0f}MB used")
+
+    def _total_size(self) -> int:
+        return sum(entry.size_bytes for entry in self._entries.values())
@@ -0,0 +1,163 @@
+# ai-service/src/config/model_snapshot.py
+import os
+import sys
+import json
+import shutil
+import subprocess
+from typing import Dict, Iterable, List, Optional
+
+import numpy
+import spacy
+
+from .settings import settings
+from ..utils.logger import logger
+
+
+# Fichier des vecteurs, stocké hors du dossier vocab pour être chargé en mmap
+SNAPSHOT_VECTORS_FILE = "vectors.npy"
+SNAPSHOT_REPORT_FILE = "snapshot_report.json"
+
+# Composants conservés par défaut: NER, et senter pour les phrases des documents en cache
+SNAPSHOT_COMPONENTS = ("ner", "senter")
+
+# Phrases utilisées pour comparer les modèles quand aucun corpus n'est fourni
+DEFAULT_EVAL_TEXTS = [
+    "Maître Dupont, avocat au barreau de Paris, représente la société Durand SARL.",
+    "Le Tribunal judiciaire de Lyon a rendu son jugement le 12 mars 2021.",
+    "Madame Sophie Martin demeurant 12 rue de la République à Marseille.",
+    "La Cour de cassation a rejeté le pourvoi formé par la société Alpha Conseil.",
+    "Monsieur Jean-Pierre Lefèvre a été entendu par le juge d'instruction de Bordeaux.",
+]
+
+
+def get_snapshot_path(model_name: Optional[str] = None) -> str:
+    """Chemin du snapshot allégé d'un modèle spaCy"""
+    return os.path.join(settings.model_cache_dir, "spacy", f"{model_name or settings.spacy_model}-trimmed")
+
+
+def load_snapshot(path: str, exclude: Iterable[str] = ()) -> spacy.Language:
+    """
+    Charger un snapshot allégé, vecteurs en mémoire partagée (mmap)
+
+    Les pages des vecteurs sont partagées par tous les processus qui
+    chargent le même snapshot, au lieu d'être copiées dans chacun.
+    `exclude`: composants à ne pas charger.
+    """
+    nlp = spacy.load(path, exclude=list(exclude))
+    vectors_path = os.path.join(path, SNAPSHOT_VECTORS_FILE)
+    if os.path.exists(vectors_path):
+        nlp.vocab.vectors.data = numpy.load(vectors_path, mmap_mode="r")
+    return nlp
+
+
+def export_snapshot(
+    model_name: str,
+    output_dir: str,
+    n_vectors: int,
+    keep_components: Iterable[str] = SNAPSHOT_COMPONENTS
+) -> spacy.Language:
+    """Exporter un snapshot limité aux composants utiles et aux vecteurs les plus fréquents"""
+    nlp = spacy.load(model_name)
+    keep = set(keep_components)
+
+    # Garder les tok2vec partagés écoutés par les composants conservés
+    for name, component in nlp.components:
+        listeners = getattr(component, "listening_components", [])
+        if keep.intersection(listeners):
+            keep.add(name)
+
+    for name in list(nlp.component_names):
+        if name not in keep:
+            nlp.remove_pipe(name)
+
+    # senter est désactivé par défaut dans les modèles fr_core_news (le parser segmente)
+    for name in list(nlp.disabled):
+        nlp.enable_pipe(name)
+
+    # Réduire les vecteurs: les mots rares sont rattachés au vecteur conservé le plus proche
+    original_rows = nlp.vocab.vectors.shape[0]
+    if n_vectors and original_rows > n_vectors:
+        nlp.vocab.prune_vectors(n_vectors, batch_size=4096)
+    logger.info(f"Vectors pruned: {original_rows} -> {nlp.vocab.vectors.shape[0]} rows")
+
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    nlp.to_disk(output_dir)
+
+    # Sortir la matrice du dossier vocab: spaCy ne la lit plus, load_snapshot la mappe
+    vectors_data = numpy.ascontiguousarray(nlp.vocab.vectors.data, dtype=numpy.float32)
+    numpy.save(os.path.join(output_dir, SNAPSHOT_VECTORS_FILE), vectors_data)
+    vocab_vectors = os.path.join(output_dir, "vocab", "vectors")
+    if os.path.exists(vocab_vectors):
+        os.remove(vocab_vectors)
+
+    logger.info(f"✅ Snapshot exported to {output_dir}: components {nlp.pipe_names}")
+    return nlp
+
+
+def compare_entities(reference: spacy.Language, candidate: spacy.Language, texts: List[str]) -> Dict[str, float]:
+    """Accord des entités du candidat par rapport au modèle de référence"""
+    matched = predicted = expected = 0
+    for ref_doc, cand_doc in zip(reference.pipe(texts), candidate.pipe(texts)):
+        ref_ents = {(e.start_char, e.end_char, e.label_) for e in ref_doc.ents}
+        cand_ents = {(e.start_char, e.end_char, e.label_) for e in cand_doc.ents}
+        matched += len(ref_ents & cand_ents)
+        predicted += len(cand_ents)
+        expected += len(ref_ents)
+
+    precision = matched / predicted if predicted else 1.0
+    recall = matched / expected if expected else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+        "reference_entities": expected,
+        "candidate_entities": predicted,
+    }
+
+
+def measure_memory(model_path: str, snapshot: bool) -> Dict[str, int]:
+    """Mesurer la mémoire d'un modèle chargé seul dans un processus neuf (Linux)"""
+    loader = "load_snapshot" if snapshot else "spacy.load"
+    code = (
+        "import json, spacy\n"
+        "from src.config.model_snapshot import load_snapshot\n"
+        f"nlp = {loader}({model_path!r})\n"
+        "nlp('Maître Dupont plaide à Paris.')\n"
+        "status = dict(line.split(':', 1) for line in open('/proc/self/status'))\n"
+        "print(json.dumps({k: int(status[k].split()[0]) for k in ('VmRSS', 'RssAnon', 'RssFile') if k in status}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def build_report(model_name: str, output_dir: str, eval_texts: List[str]) -> Dict[str, object]:
+    """Comparer le snapshot au modèle d'origine (accord des entités et mémoire)"""
+    reference = spacy.load(model_name)
+    candidate = load_snapshot(output_dir)
+
+    stock_memory = measure_memory(model_name, snapshot=False)
+    snapshot_memory = measure_memory(output_dir, snapshot=True)
+
+    report = {
+        "model": model_name,
+        "snapshot": output_dir,
+        "components": candidate.pipe_names,
+        "vectors": list(candidate.vocab.vectors.shape),
+        "eval_texts": len(eval_texts),
+        "entity_agreement": compare_entities(reference, candidate, eval_texts),
+        "memory_kb": {
+            "stock": stock_memory,
+            "snapshot": snapshot_memory,
+            "private_savings": stock_memory.get("RssAnon", 0) - snapshot_memory.get("RssAnon", 0),
+        },
+    }
+
+    with open(os.path.join(output_dir, SNAPSHOT_REPORT_FILE), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
@@ -1,40 +1,94 @@
 # ai-service/src/config/models.py
+import os
+import time
+import uuid
 import asyncio
 import spacy
-from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Dict, Any
 from transformers import AutoTokenizer, AutoModelForTokenClassification
 from sentence_transformers import SentenceTransformer
 
 from .settings import settings
+from .model_snapshot import get_snapshot_path, load_snapshot
+from .model_pool import ModelPool
 from ..utils.logger import logger
+from ..utils.memory import get_rss_bytes
+from ..utils.gc_tuning import freeze_heap, freeze_new_objects, get_gc_stats, schedule_refreeze
 
 
 class ModelManager:
     """Gestionnaire des modèles NLP"""
     
-    def __init__(self):
+    def __init__(self, spacy_model: Optional[str] = None, allow_fallback: bool = True):
+        # Nom du modèle principal (SPACY_MODEL par défaut, autre valeur lors d'un changement à chaud)
+        self.spacy_model_name = spacy_model or settings.spacy_model
+        # Téléchargement et modèle de repli si le modèle est absent (jamais lors d'un changement à chaud)
+        self.allow_fallback = allow_fallback
+        # Identité de l'instance (documents analysés liés au modèle qui les a produits)
+        self.instance_id = uuid.uuid4().hex
         self.spacy_model: Optional[spacy.Language] = None
         self.transformer_tokenizer = None
         self.transformer_model = None
         self.sentence_transformer: Optional[SentenceTransformer] = None
+        self.spacy_snapshot: Optional[str] = None
+        self.model_pool = ModelPool()
+        # Taille du vocabulaire au chargement, pour mesurer sa croissance
+        self.vocab_baseline = 0
+        self.reload_count = 0
+        self.last_reload: Optional[float] = None
+        self._reload_lock = asyncio.Lock()
         self._initialized = False
+        # Requêtes en cours sur cette instance (attendues avant de la libérer)
+        self._leases = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
         
-    async def initialize(self):
-        """Initialiser tous les modèles"""
+    async def initialize(self, load_optional: bool = True, shared: Optional["ModelManager"] = None):
+        """
+        Initialiser tous les modèles (`load_optional`: Transformers en production)
+        
+        `shared`: instance en service dont les modèles secondaires
+        (Transformers) sont repris au lieu d'être rechargés (changement à chaud).
+        """
         try:
             logger.info("🔄 Initializing AI models...")
             
             # Charger spaCy en priorité (plus rapide)
+            rss_before = get_rss_bytes()
             await self._load_spacy_model()
+            self.model_pool.register(
+                settings.default_language,
+                self.spacy_model_name,
+                self.spacy_model,
+                max(0, get_rss_bytes() - rss_before)
+            )
+            self.vocab_baseline = len(self.spacy_model.vocab.strings)
+            
+            # Précharger les modèles des autres langues les plus demandées
+            await self.model_pool.preload(
+                language for language in settings.preload_languages
+                if language != settings.default_language
+            )
+            
+            if shared is not None:
+                self._share_secondary_models(shared)
             
             # Charger les autres modèles en parallèle si nécessaire
-            if settings.environment == "production":
+            if shared is None and load_optional and settings.environment == "production":
                 await asyncio.gather(
                     self._load_transformer_model(),
                     self._load_sentence_transformer(),
                     return_exceptions=True
                 )
             
+            # Objets des modèles exclus des collections suivantes (sans collection
+            # complète lors d'un changement à chaud: le service répond pendant ce temps)
+            if shared is None:
+                freeze_heap()
+            else:
+                freeze_new_objects()
+            
             self._initialized = True
             logger.info("✅ All AI models loaded successfully")
             
@@ -42,21 +96,41 @@ class ModelManager:
             logger.error(f"❌ Failed to initialize models: {e}")
             raise
     
+    def _share_secondary_models(self, other: "ModelManager"):
+        """Reprendre les modèles secondaires d'une autre instance (indépendants du modèle principal)"""
+        self.transformer_tokenizer = getattr(other, "transformer_tokenizer", None)
+        self.transformer_model = getattr(other, "transformer_model", None)
+        self.sentence_transformer = getattr(other, "sentence_transformer", None)
+    
     async def _load_spacy_model(self):
+        """Charger le modèle spaCy principal (dans un thread: la boucle d'événements reste libre)"""
+        await asyncio.to_thread(self._load_spacy_model_sync)
+    
+    def _load_spacy_model_sync(self):
         """Charger le modèle spaCy français"""
         try:
-            logger.info(f"Loading spaCy model: {settings.spacy_model}")
+            logger.info(f"Loading spaCy model: {self.spacy_model_name}")
+            
+            # Snapshot allégé (prepare_model.py), vecteurs mappés en mémoire partagée
+            snapshot_path = get_snapshot_path(self.spacy_model_name)
+            if settings.use_model_snapshot and os.path.isdir(snapshot_path):
+                self.spacy_model = load_snapshot(snapshot_path)
+                self.spacy_snapshot = snapshot_path
+                logger.info(f"✅ spaCy snapshot loaded from {snapshot_path}: {self.spacy_model.pipe_names}")
+                return
             
             # Vérifier si le modèle est installé
             try:
-                self.spacy_model = spacy.load(settings.spacy_model)
+                self.spacy_model = spacy.load(self.spacy_model_name)
             except OSError:
-                logger.warning(f"Model {settings.spacy_model} not found, trying to download...")
+                if not self.allow_fallback:
+                    raise
+                logger.warning(f"Model {self.spacy_model_name} not found, trying to download...")
                 import subprocess
                 subprocess.run([
-                    "python", "-m", "spacy", "download", settings.spacy_model
+                    "python", "-m", "spacy", "download", self.spacy_model_name
                 ], check=True)
-                self.spacy_model = spacy.load(settings.spacy_model)
+                self.spacy_model = spacy.load(self.spacy_model_name)
             
             # Configurer le pipeline
             if "ner" not in self.spacy_model.pipe_names:
@@ -66,10 +140,13 @@ class ModelManager:
             
         except Exception as e:
             logger.error(f"❌ Failed to load spaCy model: {e}")
+            if not self.allow_fallback:
+                raise
             # Fallback vers un modèle plus petit
             try:
                 logger.info("Trying fallback model: fr_core_news_sm")
                 self.spacy_model = spacy.load("fr_core_news_sm")
+                self.spacy_model_name = "fr_core_news_sm"
                 logger.info("✅ Fallback spaCy model loaded")
             except:
                 raise Exception("No compatible spaCy model available")
@@ -111,6 +188,57 @@ class ModelManager:
             logger.warning(f"⚠️ Failed to load Sentence Transformer: {e}")
             # Non-critique pour la recherche sémantique
     
+    async def reload_spacy_model(self, reason: str = "manual"):
+        """
+        Recharger le modèle spaCy principal sans interruption de service
+        
+        Le vocabulaire (StringStore) grossit à chaque document traité. Une
+        instance neuve est chargée en arrière-plan pendant que l'ancienne
+        continue de servir, puis substituée: les requêtes en cours gardent
+        leur référence et l'ancienne instance est libérée à leur fin.
+        """
+        async with self._reload_lock:
+            logger.info(f"🔄 Reloading spaCy model ({reason})...")
+            start = time.monotonic()
+            
+            rss_before = get_rss_bytes()
+            new_model = await asyncio.to_thread(self._load_spacy_pipeline)
+            new_size = max(0, get_rss_bytes() - rss_before)
+            
+            # Substitution atomique (une seule affectation dans la boucle d'événements)
+            self.spacy_model = new_model
+            self.model_pool.register(settings.default_language, self.spacy_model_name, new_model, new_size)
+            self.vocab_baseline = len(new_model.vocab.strings)
+            self.reload_count += 1
+            self.last_reload = time.time()
+            
+            # Nouvelle instance gelée sans collection; l'ancienne (gelée) sera
+            # collectée hors trafic, une fois les requêtes en cours terminées
+            freeze_new_objects()
+            schedule_refreeze()
+            logger.info(f"✅ spaCy model reloaded in {time.monotonic() - start:.1f}s")
+    
+    def _load_spacy_pipeline(self) -> spacy.Language:
+        """Charger une nouvelle instance du pipeline spaCy principal"""
+        if self.spacy_snapshot:
+            return load_snapshot(self.spacy_snapshot)
+        return spacy.load(self.spacy_model_name)
+    
+    def get_vocab_stats(self) -> Dict[str, int]:
+        """Taille actuelle du vocabulaire du modèle principal"""
+        if not self.spacy_model:
+            return {"strings": 0, "lexemes": 0, "growth": 0}
+        strings = len(self.spacy_model.vocab.strings)
+        return {
+            "strings": strings,
+            "lexemes": len(self.spacy_model.vocab),
+            "growth": strings - self.vocab_baseline,
+        }
+    
+    def is_idle(self) -> bool:
+        """Aucune requête en cours sur cette instance"""
+        return self._leases == 0
+    
     def is_ready(self) -> bool:
         """Vérifier si les modèles sont prêts"""
         return self._initialized and self.spacy_model is not None
@@ -121,13 +249,49 @@ class ModelManager:
             raise RuntimeError("spaCy model not loaded")
         return self.spacy_model
     
+    @asynccontextmanager
+    async def acquire_spacy_model(self, language: Optional[str] = None) -> AsyncIterator[spacy.Language]:
+        """Obtenir le modèle spaCy d'une langue (modèle principal par défaut)"""
+        if not language or language == settings.default_language:
+            yield self.get_spacy_model()
+            return
+        
+        if not self.model_pool.supports(language):
+            logger.warning(f"Unsupported language: {language}, using {settings.default_language} model")
+            yield self.get_spacy_model()
+            return
+        
+        async with self.model_pool.acquire(language) as nlp:
+            yield nlp
+    
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator["ModelManager"]:
+        """Marquer une requête en cours sur cette instance (attendue par drain())"""
+        self._leases += 1
+        self._drained.clear()
+        try:
+            yield self
+        finally:
+            self._leases -= 1
+            if self._leases == 0:
+                self._drained.set()
+    
+    async def drain(self, timeout: Optional[float]) -> bool:
+        """Attendre la fin des requêtes en cours (False si le délai est dépassé, sans limite si None)"""
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Obtenir les informations sur les modèles chargés"""
         return {
             "spacy": {
-                "model": settings.spacy_model,
+                "model": self.spacy_model_name,
                 "loaded": self.spacy_model is not None,
                 "components": list(self.spacy_model.pipe_names) if self.spacy_model else [],
+                "snapshot": self.spacy_snapshot,
                 "version": spacy.__version__
             },
             "transformer": {
@@ -138,6 +302,11 @@ class ModelManager:
                 "model": settings.sentence_transformer_model,
                 "loaded": self.sentence_transformer is not None,
             },
+            "languages": self.model_pool.get_stats(),
+            "vocab": self.get_vocab_stats(),
+            "gc": get_gc_stats(),
+            "reloads": self.reload_count,
+            "active_requests": self._leases,
             "cache_dir": settings.model_cache_dir,
             "initialized": self._initialized
         }
@@ -148,6 +317,7 @@ class ModelManager:
         
         # spaCy se nettoie automatiquement
         self.spacy_model = None
+        self.model_pool.clear()
         
         # Nettoyer les modèles Transformer si chargés
         if hasattr(self, 'transformer_model'):
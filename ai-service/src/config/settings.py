@@ -1,6 +1,6 @@
 # ai-service/src/config/settings.py
 import os
-from typing import List
+from typing import List, Optional
 from pydantic import BaseSettings, Field
 
 
@@ -33,14 +33,59 @@ class Settings(BaseSettings):
         env="SENTENCE_TRANSFORMER_MODEL"
     )
     
+    # Modèles par langue (chargés à la demande, évincés en LRU)
+    default_language: str = Field(default="fr", env="DEFAULT_LANGUAGE")
+    language_models: dict = Field(
+        default={
+            "fr": "fr_core_news_lg",
+            "nl": "nl_core_news_lg",
+            "en": "en_core_web_lg",
+        },
+        env="LANGUAGE_MODELS"
+    )
+    preload_languages: List[str] = Field(default=["fr"], env="PRELOAD_LANGUAGES")
+    model_memory_budget_mb: int = Field(default=3072, env="MODEL_MEMORY_BUDGET_MB")
+    model_idle_ttl: int = Field(default=1800, env="MODEL_IDLE_TTL")  # 30 minutes
+    enable_language_detection: bool = Field(default=True, env="ENABLE_LANGUAGE_DETECTION")
+    
+    # Croissance mémoire: rechargement du modèle quand le vocabulaire ou la RSS dérivent
+    memory_check_interval: int = Field(default=60, env="MEMORY_CHECK_INTERVAL")  # secondes
+    vocab_growth_threshold: int = Field(default=1000000, env="VOCAB_GROWTH_THRESHOLD")  # nouvelles chaînes
+    rss_reload_threshold_mb: int = Field(default=3500, env="RSS_RELOAD_THRESHOLD_MB")  # Plafonné à MEMORY_LIMIT_MB moins la taille du modèle
+    memory_limit_mb: int = Field(default=4096, env="MEMORY_LIMIT_MB")  # Limite du conteneur (deux pipelines pendant un rechargement)
+    memory_reload_cooldown: int = Field(default=900, env="MEMORY_RELOAD_COOLDOWN")  # secondes
+    
+    # Ramasse-miettes: tas gelé après chargement des modèles, seuils de collection
+    enable_gc_freeze: bool = Field(default=True, env="ENABLE_GC_FREEZE")
+    gc_thresholds: List[int] = Field(default=[10000, 20, 20], env="GC_THRESHOLDS")  # Défaut Python: 700, 10, 10
+    gc_slow_pause_ms: int = Field(default=100, env="GC_SLOW_PAUSE_MS")
+    gc_refreeze_max_delay: int = Field(default=300, env="GC_REFREEZE_MAX_DELAY")  # secondes avant une collection différée forcée
+    
+    # Changement de modèle à chaud (POST /api/v1/models/reload)
+    admin_token: Optional[str] = Field(default=None, env="ADMIN_TOKEN")  # En-tête X-Admin-Token (routes désactivées si absent)
+    model_swap_allowed_models: List[str] = Field(default=[], env="MODEL_SWAP_ALLOWED_MODELS")  # Vide: modèles installés ou snapshots
+    model_swap_drain_timeout: float = Field(default=60.0, env="MODEL_SWAP_DRAIN_TIMEOUT")  # secondes
+    
     # Cache et stockage
     model_cache_dir: str = Field(default="./models", env="MODEL_CACHE_DIR")
     redis_url: str = Field(default="redis://localhost:6379", env="REDIS_URL")
     
+    # Snapshot allégé du modèle spaCy (voir prepare_model.py)
+    use_model_snapshot: bool = Field(default=True, env="USE_MODEL_SNAPSHOT")
+    snapshot_vectors: int = Field(default=50000, env="SNAPSHOT_VECTORS")
+    
     # Paramètres NER
     confidence_threshold: float = Field(default=0.7, env="CONFIDENCE_THRESHOLD")
+    confidence_model_path: Optional[str] = Field(default=None, env="CONFIDENCE_MODEL_PATH")  # Modèle calibré (JSON)
     max_text_length: int = Field(default=1000000, env="MAX_TEXT_LENGTH")  # 1MB de texte
     batch_size: int = Field(default=32, env="BATCH_SIZE")
+    max_request_body_size: int = Field(default=8388608, env="MAX_REQUEST_BODY_SIZE")  # 8MB décompressés
+    
+    # Propagation des mentions (PhraseMatcher sur les entités de haute confiance)
+    enable_mention_propagation: bool = Field(default=True, env="ENABLE_MENTION_PROPAGATION")
+    propagation_min_confidence: float = Field(default=0.85, env="PROPAGATION_MIN_CONFIDENCE")  # Score calculé (ConfidenceCalculator)
+    propagation_min_detections: int = Field(default=2, env="PROPAGATION_MIN_DETECTIONS")  # Ou détections indépendantes de la même forme
+    propagation_min_length: int = Field(default=3, env="PROPAGATION_MIN_LENGTH")
     
     # Performance
     enable_gpu: bool = Field(default=False, env="ENABLE_GPU")
@@ -48,6 +93,69 @@ class Settings(BaseSettings):
     cache_predictions: bool = Field(default=True, env="CACHE_PREDICTIONS")
     cache_ttl: int = Field(default=3600, env="CACHE_TTL")  # 1 heure
     
+    # Jobs asynchrones
+    job_store: str = Field(default="memory", env="JOB_STORE")  # 'memory' ou 'redis'
+    job_workers: int = Field(default=2, env="JOB_WORKERS")
+    job_queue_max_size: int = Field(default=100, env="JOB_QUEUE_MAX_SIZE")
+    job_result_ttl: int = Field(default=3600, env="JOB_RESULT_TTL")  # 1 heure
+    
+    # Contrôle d'admission (budget en caractères analysés simultanément)
+    admission_max_inflight_chars: int = Field(default=2000000, env="ADMISSION_MAX_INFLIGHT_CHARS")
+    admission_max_queue_size: int = Field(default=50, env="ADMISSION_MAX_QUEUE_SIZE")
+    admission_max_wait: float = Field(default=10.0, env="ADMISSION_MAX_WAIT")  # secondes
+    admission_default_retry_after: int = Field(default=5, env="ADMISSION_DEFAULT_RETRY_AFTER")
+    admission_throughput_window: float = Field(default=2.0, env="ADMISSION_THROUGHPUT_WINDOW")  # secondes d'activité par mesure du débit
+    
+    # Micro-batching des petites requêtes concurrentes (nlp.pipe, lots de batch_size max)
+    enable_micro_batching: bool = Field(default=False, env="ENABLE_MICRO_BATCHING")
+    micro_batch_window_ms: float = Field(default=5.0, env="MICRO_BATCH_WINDOW_MS")
+    micro_batch_max_chars: int = Field(default=10000, env="MICRO_BATCH_MAX_CHARS")
+    
+    # Normalisation des textes extraits (césures, ligatures, espaces), offsets conservés
+    enable_text_normalization: bool = Field(default=True, env="ENABLE_TEXT_NORMALIZATION")
+    
+    # Évaluation en parallèle d'un modèle candidat (nom spaCy ou dossier de snapshot)
+    shadow_model: Optional[str] = Field(default=None, env="SHADOW_MODEL")
+    shadow_exclude: List[str] = Field(default=[], env="SHADOW_EXCLUDE")  # Composants désactivés du candidat
+    shadow_sample_rate: float = Field(default=0.05, env="SHADOW_SAMPLE_RATE")
+    shadow_max_pending: int = Field(default=8, env="SHADOW_MAX_PENDING")
+    shadow_workers: int = Field(default=1, env="SHADOW_WORKERS")
+    
+    # Découpage des textes longs pour le NER (frontières de paragraphes/phrases)
+    ner_chunk_size: int = Field(default=100000, env="NER_CHUNK_SIZE")
+    
+    # Analyse avec échéance (deadline_ms): granularité du NER et marge pour la fin du pipeline
+    deadline_chunk_size: int = Field(default=20000, env="DEADLINE_CHUNK_SIZE")
+    deadline_reserve_ms: int = Field(default=50, env="DEADLINE_RESERVE_MS")
+    
+    # Mode coordinateur: répartition des très gros textes sur des instances pairs
+    coordinator_peers: List[str] = Field(default=[], env="COORDINATOR_PEERS")  # ex: ["http://ai-2:8001"]
+    coordinator_min_chars: int = Field(default=200000, env="COORDINATOR_MIN_CHARS")
+    coordinator_chunk_overlap: int = Field(default=200, env="COORDINATOR_CHUNK_OVERLAP")  # caractères repris du morceau précédent
+    coordinator_max_inflight_per_peer: int = Field(default=2, env="COORDINATOR_MAX_INFLIGHT_PER_PEER")
+    coordinator_max_attempts: int = Field(default=3, env="COORDINATOR_MAX_ATTEMPTS")
+    coordinator_timeout: float = Field(default=120.0, env="COORDINATOR_TIMEOUT")  # secondes par morceau
+    
+    # Ingestion de documents (PDF, DOCX, TXT)
+    upload_tmp_dir: str = Field(default="./tmp/uploads", env="UPLOAD_TMP_DIR")
+    max_upload_size: int = Field(default=26214400, env="MAX_UPLOAD_SIZE")  # 25MB
+    document_extraction_workers: int = Field(default=2, env="DOCUMENT_EXTRACTION_WORKERS")
+    document_pages_per_task: int = Field(default=8, env="DOCUMENT_PAGES_PER_TASK")
+    
+    # Recherche dans les documents (index inversé + trigrammes, LRU par contenu)
+    search_index_cache_size: int = Field(default=32, env="SEARCH_INDEX_CACHE_SIZE")
+    search_context_chars: int = Field(default=100, env="SEARCH_CONTEXT_CHARS")
+    search_fuzzy_max_edits: int = Field(default=2, env="SEARCH_FUZZY_MAX_EDITS")
+    
+    # Cache des documents analysés (DocBin) pour /search, /validate et /suggest-groups
+    enable_doc_cache: bool = Field(default=True, env="ENABLE_DOC_CACHE")
+    doc_cache_max_bytes: int = Field(default=268435456, env="DOC_CACHE_MAX_BYTES")  # 256MB sérialisés
+    doc_cache_ttl: int = Field(default=1800, env="DOC_CACHE_TTL")  # Secondes depuis le dernier accès
+
+    # Anonymisation
+    anonymize_chunk_size: int = Field(default=65536, env="ANONYMIZE_CHUNK_SIZE")
+    anonymize_stream_threshold: int = Field(default=500000, env="ANONYMIZE_STREAM_THRESHOLD")
+    
     # Entités supportées
     supported_entities: List[str] = Field(
         default=[
@@ -97,6 +205,7 @@ def create_directories():
         f"{settings.model_cache_dir}/transformers",
         f"{settings.model_cache_dir}/sentence_transformers",
         "./logs",
+        settings.upload_tmp_dir,
     ]
     
     for directory in directories:
@@ -0,0 +1,119 @@
+# ai-service/src/processors/anonymizer.py
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from ..config.settings import settings
+
+
+# Préfixes des pseudonymes par type d'entité
+PSEUDONYM_PREFIXES = {
+    "PERSON": "PERSONNE",
+    "ORG": "ORGANISATION",
+    "LOC": "LIEU",
+    "ADDRESS": "ADRESSE",
+    "DATE": "DATE",
+    "MONEY": "MONTANT",
+    "EMAIL": "EMAIL",
+    "PHONE": "TELEPHONE",
+    "IBAN": "IBAN",
+    "SIREN": "SIREN",
+    "SIRET": "SIRET",
+}
+
+
+@dataclass
+class ReplacementSpan:
+    """Span à remplacer dans le texte"""
+    start: int
+    end: int
+    label: str
+    replacement: Optional[str] = None
+
+
+class PseudonymMapper:
+    """Mapping cohérent entité -> pseudonyme pour un document"""
+
+    def __init__(self, mapping: Optional[Dict[str, str]] = None):
+        # Reprendre le mapping des tours d'édition précédents
+        self.mapping: Dict[str, str] = dict(mapping or {})
+        self._counters: Dict[str, int] = {}
+        for pseudonym in self.mapping.values():
+            prefix, _, number = pseudonym.strip("[]").rpartition("_")
+            if number.isdigit():
+                self._counters[prefix] = max(self._counters.get(prefix, 0), int(number))
+
+    def get(self, label: str, text: str) -> str:
+        """Obtenir le pseudonyme d'une entité (le même pour toutes ses occurrences)"""
+        key = self.make_key(label, text)
+        pseudonym = self.mapping.get(key)
+        if pseudonym is None:
+            prefix = PSEUDONYM_PREFIXES.get(label, label.upper())
+            self._counters[prefix] = self._counters.get(prefix, 0) + 1
+            pseudonym = f"[{prefix}_{self._counters[prefix]}]"
+            self.mapping[key] = pseudonym
+        return pseudonym
+
+    @staticmethod
+    def make_key(label: str, text: str) -> str:
+        """Clé normalisée (casse et espaces) d'une entité"""
+        return f"{label}:{' '.join(text.split()).lower()}"
+
+
+class Anonymizer:
+    """Application des remplacements en une seule passe linéaire"""
+
+    def __init__(self, mapper: Optional[PseudonymMapper] = None):
+        self.mapper = mapper or PseudonymMapper()
+
+    def validate_spans(self, text: str, spans: List[ReplacementSpan]) -> List[ReplacementSpan]:
+        """Trier les spans et vérifier qu'ils sont valides et sans chevauchement"""
+        sorted_spans = sorted(spans, key=lambda span: span.start)
+        previous_end = 0
+        for span in sorted_spans:
+            if span.start < 0 or span.end > len(text) or span.start >= span.end:
+                raise ValueError(f"Invalid span [{span.start}, {span.end}) for text of length {len(text)}")
+            if span.start < previous_end:
+                raise ValueError(f"Overlapping span [{span.start}, {span.end}) starts before {previous_end}")
+            previous_end = span.end
+        return sorted_spans
+
+    def iter_chunks(self, text: str, spans: List[ReplacementSpan], chunk_size: Optional[int] = None) -> Iterator[str]:
+        """
+        Produire le texte anonymisé par blocs d'environ `chunk_size` caractères
+
+        Les spans doivent être triés et sans chevauchement (voir validate_spans).
+        """
+        chunk_size = chunk_size or settings.anonymize_chunk_size
+        parts: List[str] = []
+        buffered = 0
+        position = 0
+
+        for span in spans:
+            replacement = span.replacement
+            if replacement is None:
+                replacement = self.mapper.get(span.label, text[span.start:span.end])
+            parts.append(text[position:span.start])
+            parts.append(replacement)
+            buffered += span.start - position + len(replacement)
+            position = span.end
+
+            if buffered >= chunk_size:
+                yield "".join(parts)
+                parts = []
+                buffered = 0
+
+        # Reste du texte après la dernière entité, découpé à la taille des blocs
+        while position < len(text):
+            remaining = chunk_size - buffered
+            parts.append(text[position:position + remaining])
+            position += remaining
+            yield "".join(parts)
+            parts = []
+            buffered = 0
+
+        if parts:
+            yield "".join(parts)
+
+    def anonymize(self, text: str, spans: List[ReplacementSpan]) -> str:
+        """Anonymiser le texte complet"""
+        return "".join(self.iter_chunks(text, self.validate_spans(text, spans), chunk_size=len(text) + 1))
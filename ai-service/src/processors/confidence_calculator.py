@@ -0,0 +1,279 @@
+# ai-service/src/processors/confidence_calculator.py
+import re
+import json
+from dataclasses import replace
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config.settings import settings
+from ..utils.logger import logger
+from .ner_processor import Entity
+
+
+# Colonnes de la matrice de caractéristiques (ordre des coefficients)
+FEATURE_NAMES = [
+    "source_regex",
+    "source_ner",
+    "source_manual",
+    "quality_high",
+    "quality_low",
+    "too_short",
+    "special_chars",
+    "context_boost",
+    "length_optimal",
+    "length_short",
+    "length_long",
+]
+
+# Coefficients reproduisant les règles heuristiques historiques
+# (score de base 0.5 pour une source inconnue, +0.05 par indice de contexte, etc.)
+DEFAULT_INTERCEPT = 0.5
+DEFAULT_WEIGHTS = {
+    "source_regex": 0.35,   # Regex très fiables pour les patterns structurés -> 0.85
+    "source_ner": 0.25,     # spaCy généralement bon mais parfois des faux positifs -> 0.75
+    "source_manual": 0.45,  # Ajouts manuels très fiables -> 0.95
+    "quality_high": 0.1,
+    "quality_low": -0.2,
+    "too_short": -0.1,
+    "special_chars": -0.1,
+    "context_boost": 0.05,
+    "length_optimal": 0.05,
+    "length_short": -0.1,
+    "length_long": -0.1,
+}
+
+SOURCES = ["regex", "ner", "manual"]
+
+# Longueurs optimales par type d'entité
+OPTIMAL_RANGES = {
+    "PERSON": (5, 30),
+    "ORG": (3, 50),
+    "LOC": (3, 25),
+    "EMAIL": (5, 50),
+    "PHONE": (10, 15),
+    "IBAN": (15, 34),
+    "SIREN": (9, 11),  # Avec espaces
+    "SIRET": (14, 17), # Avec espaces
+}
+
+# Types pour lesquels une valeur courte n'est pas pénalisée (codes)
+SHORT_CODE_TYPES = {"IBAN", "SIREN", "SIRET"}
+
+SPECIAL_CHARS = re.compile(r'[^\w\s]')
+
+
+class ConfidenceCalculator:
+    """Calculateur de scores de confiance pour les entités"""
+
+    def __init__(self, model_path: Optional[str] = None):
+        # Patterns pour ajuster la confiance
+        self.quality_patterns = {
+            "PERSON": {
+                "high": [
+                    r'^[A-Z][a-z]+ [A-Z][a-z]+$',  # Prénom Nom
+                    r'^[A-Z][a-z]+-[A-Z][a-z]+ [A-Z][a-z]+$',  # Jean-Pierre Martin
+                ],
+                "low": [
+                    r'^[A-Z]+$',  # Tout en majuscules
+                    r'^\d',  # Commence par un chiffre
+                ]
+            },
+            "ORG": {
+                "high": [
+                    r'(SARL|SAS|SA|EURL|SCI|SASU)',  # Types de sociétés
+                    r'(Société|Entreprise|Compagnie)',
+                ],
+                "low": [
+                    r'^[a-z]+$',  # Tout en minuscules
+                ]
+            },
+            "EMAIL": {
+                "high": [r'@.*\.(com|fr|org|net|edu)$'],
+                "low": [r'@.*\.(test|example|localhost)$']
+            }
+        }
+
+        # Mots de contexte qui renforcent la confiance
+        self.context_boosters = {
+            "PERSON": ["monsieur", "madame", "docteur", "professeur", "maître"],
+            "ORG": ["société", "entreprise", "compagnie", "association", "fondation"],
+            "LOC": ["ville", "commune", "département", "région", "pays"],
+        }
+
+        # Mots de contexte spécifiques (un seul bonus, quel que soit le nombre trouvé)
+        self.context_keywords = {
+            "EMAIL": ["contact", "mail", "courriel", "@"],
+            "PHONE": ["téléphone", "tel", "mobile", "portable"],
+        }
+
+        # Une seule regex par type et par niveau: un seul passage par entité
+        self._quality_regexes = {
+            (label, level): re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+            for label, levels in self.quality_patterns.items()
+            for level, patterns in levels.items()
+        }
+        self._booster_regexes = {
+            label: re.compile("|".join(re.escape(word) for word in words))
+            for label, words in self.context_boosters.items()
+        }
+        self._keyword_regexes = {
+            label: re.compile("|".join(re.escape(word) for word in words))
+            for label, words in self.context_keywords.items()
+        }
+
+        self.weights = np.array([DEFAULT_WEIGHTS[name] for name in FEATURE_NAMES])
+        self.intercept = DEFAULT_INTERCEPT
+        self.calibrated = False
+
+        model_path = model_path or settings.confidence_model_path
+        if model_path:
+            self.load_model(model_path)
+
+    def load_model(self, path: str):
+        """
+        Charger un modèle linéaire calibré (voir fit_calibrated_model)
+        """
+        with open(path, encoding="utf-8") as f:
+            model = json.load(f)
+
+        if model.get("features") != FEATURE_NAMES:
+            raise ValueError(f"Confidence model features do not match: {model.get('features')}")
+
+        self.weights = np.asarray(model["coef"], dtype=np.float64)
+        self.intercept = float(model["intercept"])
+        self.calibrated = True
+        logger.info(f"Calibrated confidence model loaded from {path}")
+
+    def calculate_confidence(self, entities: List[Entity], full_text: str) -> List[Entity]:
+        """
+        Calculer les scores de confiance pour toutes les entités
+        """
+        scores = self.score_batch(entities)
+
+        # Créer de nouvelles entités avec le score mis à jour
+        updated_entities = [
+            replace(entity, confidence=score)
+            for entity, score in zip(entities, scores.tolist())
+        ]
+
+        logger.info(f"Confidence calculated for {len(updated_entities)} entities")
+        return updated_entities
+
+    def score_batch(self, entities: Sequence[Entity]) -> np.ndarray:
+        """
+        Scorer un lot d'entités en une seule opération vectorisée
+        """
+        if not entities:
+            return np.empty(0)
+
+        raw_scores = self.compute_features(entities) @ self.weights + self.intercept
+
+        if self.calibrated:
+            # Régression logistique calibrée: probabilité que l'entité soit correcte
+            scores = 1.0 / (1.0 + np.exp(-raw_scores))
+        else:
+            scores = np.clip(raw_scores, 0.1, 1.0)
+
+        return np.round(scores, 3)
+
+    def compute_features(self, entities: Sequence[Entity]) -> np.ndarray:
+        """
+        Construire la matrice de caractéristiques (entités x FEATURE_NAMES)
+        """
+        count = len(entities)
+        texts = [entity.text for entity in entities]
+        labels = [entity.label for entity in entities]
+        features = np.zeros((count, len(FEATURE_NAMES)))
+        column = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+        # Source (one-hot)
+        sources = np.array([entity.source for entity in entities])
+        for source in SOURCES:
+            features[:, column[f"source_{source}"]] = sources == source
+
+        # Qualité du texte: une recherche par entité avec la regex combinée de son type
+        for level in ("high", "low"):
+            features[:, column[f"quality_{level}"]] = [
+                bool(regex.search(text)) if (regex := self._quality_regexes.get((label, level))) else False
+                for text, label in zip(texts, labels)
+            ]
+
+        # Longueur et caractères spéciaux
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=count)
+        special_counts = np.fromiter(
+            (len(SPECIAL_CHARS.findall(text)) for text in texts), dtype=np.int64, count=count
+        )
+        is_code = np.array([label in SHORT_CODE_TYPES for label in labels])
+        features[:, column["too_short"]] = (lengths < 3) & ~is_code
+        features[:, column["special_chars"]] = special_counts > 0.3 * lengths
+
+        # Contexte: nombre d'indices distincts, plafonné à 4 (ajustement max 0.2)
+        features[:, column["context_boost"]] = [
+            min(4, self._count_context_hints(entity.label, entity.context.lower()))
+            if entity.context else 0
+            for entity in entities
+        ]
+
+        # Longueurs optimales par type
+        min_lengths = np.array([OPTIMAL_RANGES.get(label, (0, 0))[0] for label in labels])
+        max_lengths = np.array([OPTIMAL_RANGES.get(label, (0, 0))[1] for label in labels])
+        has_range = np.array([label in OPTIMAL_RANGES for label in labels])
+        features[:, column["length_optimal"]] = has_range & (lengths >= min_lengths) & (lengths <= max_lengths)
+        features[:, column["length_short"]] = has_range & (lengths < min_lengths)
+        features[:, column["length_long"]] = has_range & (lengths > max_lengths * 1.5)
+
+        return features
+
+    def _count_context_hints(self, label: str, context_lower: str) -> int:
+        """Nombre d'indices de contexte distincts pour un type d'entité"""
+        hints = 0
+        booster_regex = self._booster_regexes.get(label)
+        if booster_regex:
+            hints += len(set(booster_regex.findall(context_lower)))
+        keyword_regex = self._keyword_regexes.get(label)
+        if keyword_regex and keyword_regex.search(context_lower):
+            hints += 1
+        return hints
+
+
+def fit_calibrated_model(
+    calculator: ConfidenceCalculator,
+    entities: List[Entity],
+    labels: Sequence[int],
+    output_path: str,
+    holdout: float = 0.25
+) -> Dict[str, object]:
+    """
+    Entraîner une régression logistique calibrée (Platt) sur des entités annotées
+
+    `labels` vaut 1 pour une entité correcte, 0 pour un faux positif. Le modèle
+    est exporté en coefficients simples: le scoring n'a pas besoin de sklearn.
+    """
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import train_test_split
+
+    features = calculator.compute_features(entities)
+    X_train, X_calib, y_train, y_calib = train_test_split(
+        features, np.asarray(labels), test_size=holdout, stratify=labels, random_state=0
+    )
+
+    classifier = LogisticRegression(max_iter=1000).fit(X_train, y_train)
+    calibration = CalibratedClassifierCV(classifier, method="sigmoid", cv="prefit").fit(X_calib, y_calib)
+    sigmoid = calibration.calibrated_classifiers_[0].calibrators[0]
+
+    # p = 1 / (1 + exp(a * f(x) + b)) avec f(x) = coef . x + intercept
+    model = {
+        "features": FEATURE_NAMES,
+        "coef": (-sigmoid.a_ * classifier.coef_[0]).tolist(),
+        "intercept": float(-(sigmoid.a_ * classifier.intercept_[0] + sigmoid.b_)),
+        "train_size": len(y_train),
+        "calibration_size": len(y_calib),
+    }
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(model, f, indent=2)
+
+    logger.info(f"Calibrated confidence model saved to {output_path}")
+    return model
@@ -0,0 +1,239 @@
+# ai-service/src/processors/doc_cache.py
+import time
+import zlib
+import asyncio
+import bisect
+import hashlib
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from spacy.tokens import Doc, DocBin
+
+from ..config.settings import settings
+from ..utils.logger import logger
+from ..utils.text_processing import NormalizedText
+
+
+# Attributs conservés: tokens (texte et espaces), phrases et entités
+DOCBIN_ATTRS = ["ORTH", "SPACY", "SENT_START", "ENT_IOB", "ENT_TYPE"]
+
+
+@dataclass
+class CachedDocument:
+    """Document analysé, sous forme sérialisée compacte"""
+    docs: bytes              # DocBin des morceaux du texte normalisé
+    original: bytes          # Texte d'origine (zlib)
+    norm_starts: bytes       # Correspondance des offsets (NormalizedText)
+    orig_starts: bytes
+    language: str
+    model_id: str            # ModelManager.instance_id du modèle qui a produit les Doc
+    size: int
+    expires_at: float
+
+
+class ParsedDocument:
+    """Document désérialisé: tokens, phrases et entités du modèle, offsets du texte normalisé"""
+
+    def __init__(self, handle: str, docs: List[Doc], normalized: NormalizedText, language: str):
+        self.handle = handle
+        self.docs = docs
+        self.normalized = normalized
+        self.language = language
+        self.offsets = []
+        position = 0
+        for doc in docs:
+            self.offsets.append(position)
+            position += len(doc.text)
+
+    @property
+    def text(self) -> str:
+        return self.normalized.text
+
+    @property
+    def original(self) -> str:
+        return self.normalized.original
+
+    def entity_spans(self) -> Iterator[Tuple[int, int, str, str]]:
+        """Entités du modèle: (start, end, texte, label spaCy), offsets du texte normalisé"""
+        for offset, doc in zip(self.offsets, self.docs):
+            for ent in doc.ents:
+                yield offset + ent.start_char, offset + ent.end_char, ent.text, ent.label_
+
+    def sentence(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """Phrase contenant un intervalle du texte normalisé (None sans segmentation en phrases)"""
+        index = bisect.bisect_right(self.offsets, start) - 1
+        doc, offset = self.docs[index], self.offsets[index]
+        if not doc.has_annotation("SENT_START"):
+            return None
+        span = doc.char_span(start - offset, min(end - offset, len(doc.text)), alignment_mode="expand")
+        if span is None or not len(span):
+            return None
+        sentence = span.sent
+        return offset + sentence.start_char, offset + sentence.end_char
+
+
+class DocCache:
+    """
+    Documents analysés récemment, pour les routes de suivi (/search, /validate, /suggest-groups)
+
+    Après /analyze, les Doc spaCy sont sérialisés (DocBin: tokens, phrases,
+    entités) avec le texte d'origine compressé, sous un identifiant
+    (`document_handle`) renvoyé au client. Les routes suivantes reçoivent
+    l'identifiant au lieu du texte et réutilisent l'analyse sans repasser
+    par le modèle. Taille totale bornée (LRU) et expiration après
+    `doc_cache_ttl` secondes sans accès.
+
+    La sérialisation se fait en arrière-plan: la réponse de /analyze ne
+    l'attend pas, une lecture de l'identifiant entre-temps l'attend.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl: Optional[int] = None):
+        self.max_bytes = max_bytes or settings.doc_cache_max_bytes
+        self.ttl = ttl or settings.doc_cache_ttl
+        self._entries: "OrderedDict[str, CachedDocument]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        # Incrémentée à chaque vidage: une sérialisation en cours est alors ignorée
+        self._generation = 0
+
+    @staticmethod
+    def key(text: str, language: str, model_id: str) -> str:
+        digest = hashlib.sha256(
+            model_id.encode("utf-8") + b"\0" + language.encode("utf-8") + b"\0" + text.encode("utf-8", "surrogatepass")
+        )
+        return digest.hexdigest()[:32]
+
+    def store(
+        self,
+        text: str,
+        normalized: Optional[NormalizedText],
+        docs: List[Tuple[int, Doc]],
+        language: str,
+        model_id: str
+    ) -> Optional[str]:
+        """Mettre en cache les Doc d'un texte analysé (par l'instance `model_id`) et retourner son identifiant"""
+        if normalized is None:
+            normalized = NormalizedText(text=text, original=text, norm_starts=array("L"), orig_starts=array("L"))
+
+        # Les morceaux doivent couvrir tout le texte (pas de texte tronqué)
+        offset, last_doc = docs[-1]
+        if offset + len(last_doc.text) != len(normalized.text):
+            return None
+
+        handle = self.key(text, language, model_id)
+        if handle in self._entries or handle in self._pending:
+            return handle
+
+        task = asyncio.create_task(self._serialize(handle, normalized, [doc for _, doc in docs], language, model_id))
+        self._pending[handle] = task
+        return handle
+
+    async def _serialize(self, handle: str, normalized: NormalizedText, docs: List[Doc], language: str, model_id: str):
+        generation = self._generation
+        try:
+            entry = await asyncio.to_thread(_encode, normalized, docs, language, model_id)
+        except Exception as e:
+            logger.warning(f"Document cache serialization failed: {e}")
+            return None
+        finally:
+            self._pending.pop(handle, None)
+        if generation == self._generation:
+            self._put(handle, entry)
+        return entry
+
+    def _put(self, handle: str, entry: CachedDocument):
+        if entry.size > self.max_bytes:
+            return
+        entry.expires_at = time.monotonic() + self.ttl
+        self._entries[handle] = entry
+        self.size += entry.size
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+
+    async def _get_entry(self, handle: str) -> Optional[CachedDocument]:
+        pending = self._pending.get(handle)
+        if pending is not None:
+            await asyncio.shield(pending)
+
+        entry = self._entries.get(handle)
+        if entry is not None and entry.expires_at < time.monotonic():
+            del self._entries[handle]
+            self.size -= entry.size
+            self.expired += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+
+        # Expiration glissante: le document reste disponible tant qu'il est utilisé
+        self.hits += 1
+        entry.expires_at = time.monotonic() + self.ttl
+        self._entries.move_to_end(handle)
+        return entry
+
+    async def get_text(self, handle: str) -> Optional[str]:
+        """Texte d'origine d'un document (sans désérialiser les Doc)"""
+        entry = await self._get_entry(handle)
+        if entry is None:
+            return None
+        return await asyncio.to_thread(lambda: zlib.decompress(entry.original).decode("utf-8", "surrogatepass"))
+
+    async def load(self, handle: str, model_manager) -> Optional[ParsedDocument]:
+        """Document désérialisé avec le vocabulaire du modèle de sa langue"""
+        entry = await self._get_entry(handle)
+        # Document produit par un modèle qui n'est plus en service (requête engagée avant un changement)
+        if entry is None or entry.model_id != model_manager.instance_id:
+            return None
+        async with model_manager.acquire_spacy_model(entry.language) as nlp:
+            return await asyncio.to_thread(_decode, handle, entry, nlp.vocab)
+
+    def clear(self):
+        """Vider le cache (changement de modèle)"""
+        self._generation += 1
+        self._entries.clear()
+        self.size = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "pending": len(self._pending),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+        }
+
+
+def _encode(normalized: NormalizedText, docs: List[Doc], language: str, model_id: str) -> CachedDocument:
+    doc_bin = DocBin(attrs=DOCBIN_ATTRS, store_user_data=False, docs=docs)
+    data = doc_bin.to_bytes()
+    original = zlib.compress(normalized.original.encode("utf-8", "surrogatepass"), 1)
+    norm_starts = normalized.norm_starts.tobytes()
+    orig_starts = normalized.orig_starts.tobytes()
+    return CachedDocument(
+        docs=data,
+        original=original,
+        norm_starts=norm_starts,
+        orig_starts=orig_starts,
+        language=language,
+        model_id=model_id,
+        size=len(data) + len(original) + len(norm_starts) + len(orig_starts),
+        expires_at=0.0
+    )
+
+
+def _decode(handle: str, entry: CachedDocument, vocab) -> ParsedDocument:
+    docs = list(DocBin().from_bytes(entry.docs).get_docs(vocab))
+    original = zlib.decompress(entry.original).decode("utf-8", "surrogatepass")
+    norm_starts, orig_starts = array("L"), array("L")
+    norm_starts.frombytes(entry.norm_starts)
+    orig_starts.frombytes(entry.orig_starts)
+    text = "".join(doc.text for doc in docs) if norm_starts else original
+    normalized = NormalizedText(text=text, original=original, norm_starts=norm_starts, orig_starts=orig_starts)
+    return ParsedDocument(handle, docs, normalized, entry.language)
@@ -0,0 +1,130 @@
+# ai-service/src/processors/document_extractor.py
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
+
+from ..config.settings import settings
+from ..utils.logger import logger
+
+
+SUPPORTED_DOCUMENT_TYPES = {
+    ".pdf": "pdf",
+    ".docx": "docx",
+    ".txt": "text",
+}
+
+CONTENT_TYPES = {
+    "application/pdf": "pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "text/plain": "text",
+}
+
+
+# Fonctions exécutées dans les processus du pool (doivent rester picklables)
+
+def count_pdf_pages(path: str) -> int:
+    """Compter les pages d'un PDF"""
+    from pypdf import PdfReader
+
+    return len(PdfReader(path).pages)
+
+
+def extract_pdf_pages(path: str, start: int, end: int) -> List[str]:
+    """Extraire le texte des pages [start, end) d'un PDF"""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, min(end, len(reader.pages)))]
+
+
+def extract_docx_pages(path: str) -> List[str]:
+    """Extraire le texte d'un DOCX, découpé sur les sauts de page explicites ou rendus"""
+    from docx import Document
+    from docx.oxml.ns import qn
+
+    pages: List[List[str]] = [[]]
+    for paragraph in Document(path).paragraphs:
+        for element in paragraph._p.iter():
+            is_page_break = (
+                (element.tag == qn("w:br") and element.get(qn("w:type")) == "page")
+                or element.tag == qn("w:lastRenderedPageBreak")
+            )
+            if is_page_break and pages[-1]:
+                pages.append([])
+                break
+        pages[-1].append(paragraph.text)
+
+    return ["\n".join(paragraphs) for paragraphs in pages]
+
+
+def extract_text_pages(path: str) -> List[str]:
+    """Extraire les pages d'un fichier texte (séparées par des sauts de page \\f)"""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read().split("\f")
+
+
+def detect_document_type(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """Déterminer le type de document à partir du nom de fichier ou du type MIME"""
+    if filename:
+        extension = os.path.splitext(filename)[1].lower()
+        if extension in SUPPORTED_DOCUMENT_TYPES:
+            return SUPPORTED_DOCUMENT_TYPES[extension]
+    if content_type:
+        return CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+    return None
+
+
+class DocumentExtractor:
+    """Extraction page par page des documents dans un pool de processus"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        # 'spawn' évite de dupliquer le processus principal et ses modèles chargés
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers or settings.document_extraction_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def iter_pages(self, path: str, document_type: str) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Produire (numéro de page, texte) dans l'ordre, au fil de l'extraction
+
+        Pour les PDF, les pages sont extraites par tranches en parallèle:
+        les premières pages peuvent être analysées pendant que les suivantes
+        sont encore en cours d'extraction.
+        """
+        loop = asyncio.get_running_loop()
+
+        if document_type == "pdf":
+            page_count = await loop.run_in_executor(self._executor, count_pdf_pages, path)
+            step = settings.document_pages_per_task
+            futures = [
+                loop.run_in_executor(self._executor, extract_pdf_pages, path, start, start + step)
+                for start in range(0, page_count, step)
+            ]
+            page_number = 1
+            try:
+                for future in futures:
+                    for page_text in await future:
+                        yield page_number, page_text
+                        page_number += 1
+            finally:
+                for future in futures:
+                    future.cancel()
+            return
+
+        if document_type == "docx":
+            pages = await loop.run_in_executor(self._executor, extract_docx_pages, path)
+        elif document_type == "text":
+            pages = await loop.run_in_executor(self._executor, extract_text_pages, path)
+        else:
+            raise ValueError(f"Unsupported document type: {document_type}")
+
+        for page_number, page_text in enumerate(pages, start=1):
+            yield page_number, page_text
+
+    def shutdown(self):
+        """Arrêter le pool de processus"""
+        logger.info("Shutting down document extraction pool")
+        self._executor.shutdown(wait=False, cancel_futures=True)
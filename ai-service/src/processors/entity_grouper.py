@@ -0,0 +1,157 @@
+# ai-service/src/processors/entity_grouper.py
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+from .search_index import fold
+
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Civilités et titres ignorés pour comparer les mentions ("M. Dupont" = "Dupont")
+TITLES = {
+    "m", "mr", "mme", "mlle", "monsieur", "madame", "mademoiselle",
+    "me", "maitre", "dr", "docteur", "pr", "professeur",
+}
+
+# Types pour lesquels une forme courte désigne la forme longue ("Dupont" -> "Jean Dupont")
+PARTIAL_NAME_TYPES = {"PERSON", "ORG"}
+
+# Score d'un rapprochement par forme courte
+PARTIAL_NAME_SCORE = 0.85
+
+
+@dataclass
+class Mention:
+    """Entité à regrouper (identifiant côté client)"""
+    id: str
+    text: str
+    type: str
+
+
+@dataclass
+class EntityGroup:
+    """Groupe de mentions d'une même entité"""
+    name: str
+    type: str
+    ids: List[str]
+    confidence: float
+    mentions: int = 0
+    scores: List[float] = field(default_factory=list, repr=False)
+
+
+def mention_key(text: str) -> Tuple[str, ...]:
+    """Mots significatifs d'une mention (minuscules, sans accents ni civilité)"""
+    words = WORD_PATTERN.findall(fold(text))
+    significant = tuple(word for word in words if word not in TITLES)
+    return significant or tuple(words)
+
+
+class EntityGrouper:
+    """
+    Suggestions de groupes: mentions d'une même entité à remplacer de la même façon
+
+    Les mentions d'un même type sont rapprochées si leurs mots significatifs
+    sont identiques, très proches (SequenceMatcher), ou si l'une est une forme
+    courte non ambiguë de l'autre (noms de personnes et d'organisations).
+    """
+
+    def __init__(self, similarity_threshold: float = 0.8):
+        self.similarity_threshold = similarity_threshold
+
+    def suggest_groups(
+        self,
+        mentions: List[Mention],
+        mention_counts: Optional[Counter] = None
+    ) -> List[EntityGroup]:
+        """
+        Regrouper les mentions
+
+        `mention_counts` (occurrences de chaque forme repliée dans le document,
+        d'après le modèle) sert à choisir le nom du groupe et à les ordonner.
+        """
+        mention_counts = mention_counts or Counter()
+        by_type: Dict[str, Dict[Tuple[str, ...], List[Mention]]] = defaultdict(lambda: defaultdict(list))
+        for mention in mentions:
+            key = mention_key(mention.text)
+            if key:
+                by_type[mention.type][key].append(mention)
+
+        groups = []
+        for entity_type, by_key in by_type.items():
+            keys = list(by_key)
+            parent = list(range(len(keys)))
+            link_scores: Dict[int, List[float]] = defaultdict(list)
+
+            def find(i: int) -> int:
+                while parent[i] != i:
+                    parent[i] = parent[parent[i]]
+                    i = parent[i]
+                return i
+
+            for i, j, score in self._links(entity_type, keys):
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[root_j] = root_i
+                    link_scores[root_i] += link_scores.pop(root_j, [])
+                link_scores[root_i].append(score)
+
+            components: Dict[int, List[int]] = defaultdict(list)
+            for i in range(len(keys)):
+                components[find(i)].append(i)
+
+            for root, members in components.items():
+                group_mentions = [mention for i in members for mention in by_key[keys[i]]]
+                ids = list(dict.fromkeys(mention.id for mention in group_mentions))
+                if len(ids) < 2:
+                    continue
+                # Mentions identiques sans autre rapprochement: groupe certain
+                scores = link_scores.get(root) or [1.0]
+                groups.append(EntityGroup(
+                    name=self._group_name(group_mentions, mention_counts),
+                    type=entity_type,
+                    ids=ids,
+                    confidence=round(sum(scores) / len(scores), 3),
+                    mentions=sum(mention_counts.get(" ".join(keys[i]), 0) for i in members)
+                ))
+
+        groups.sort(key=lambda group: (-group.mentions, -len(group.ids), group.name))
+        return groups
+
+    def _links(self, entity_type: str, keys: List[Tuple[str, ...]]) -> List[Tuple[int, int, float]]:
+        """Rapprochements entre mots significatifs distincts d'un même type"""
+        links = []
+        joined = [" ".join(key) for key in keys]
+        supersets: Dict[int, List[int]] = defaultdict(list)
+
+        for i in range(len(keys)):
+            for j in range(i + 1, len(keys)):
+                ratio = SequenceMatcher(None, joined[i], joined[j]).ratio()
+                if ratio >= self.similarity_threshold:
+                    links.append((i, j, round(ratio, 3)))
+                elif entity_type in PARTIAL_NAME_TYPES:
+                    words_i, words_j = set(keys[i]), set(keys[j])
+                    if words_i < words_j:
+                        supersets[i].append(j)
+                    elif words_j < words_i:
+                        supersets[j].append(i)
+
+        # Forme courte rattachée seulement si elle ne désigne qu'une forme longue
+        for short, longer in supersets.items():
+            if len(longer) == 1 and max(len(word) for word in keys[short]) >= 3:
+                links.append((short, longer[0], PARTIAL_NAME_SCORE))
+        return links
+
+    @staticmethod
+    def _group_name(mentions: List[Mention], mention_counts: Counter) -> str:
+        """Forme la plus fréquente dans le document, sinon la plus complète"""
+        return max(
+            mentions,
+            key=lambda mention: (
+                mention_counts.get(" ".join(mention_key(mention.text)), 0),
+                len(mention_key(mention.text)),
+                len(mention.text),
+            )
+        ).text.strip()
@@ -1,11 +1,20 @@
 # ai-service/src/processors/ner_processor.py
 import re
+import time
+import bisect
+import itertools
+import asyncio
+import threading
 import spacy
-from typing import List, Optional, Dict, Any
+from collections import Counter, defaultdict
+from typing import List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass
+from spacy.matcher import PhraseMatcher
+from spacy.util import filter_spans
 
 from ..config.settings import settings
 from ..utils.logger import logger
+from ..utils.text_processing import merge_ranges, split_into_chunks
 
 @dataclass
 class Entity:
@@ -18,12 +27,21 @@ class Entity:
     source: str  # 'ner' ou 'regex'
     context: Optional[str] = None
 
+def cpu_timed(func, *args):
+    """Exécuter `func` et mesurer le temps CPU du thread (indépendant de l'attente et de la priorité)"""
+    start = time.thread_time()
+    result = func(*args)
+    return result, time.thread_time() - start
+
 class NERProcessor:
     """Processeur pour l'extraction d'entités nommées"""
     
-    def __init__(self, model_manager):
+    def __init__(self, model_manager, micro_batcher=None):
         self.model_manager = model_manager
+        self.micro_batcher = micro_batcher
         self.regex_patterns = self._compile_regex_patterns()
+        # Temps CPU du dernier NER (None en micro-batch: le lot est partagé)
+        self.compute_seconds: Optional[float] = None
         
     def _compile_regex_patterns(self) -> Dict[str, re.Pattern]:
         """Compiler les patterns regex"""
@@ -38,47 +56,52 @@ class NERProcessor:
     async def extract_entities(
         self, 
         text: str, 
-        entity_types: Optional[List[str]] = None
+        entity_types: Optional[List[str]] = None,
+        language: Optional[str] = None,
+        parsed_docs: Optional[list] = None,
+        cancel_event: Optional[threading.Event] = None
     ) -> List[Entity]:
         """
         Extraire les entités avec spaCy NER
+        
+        Si `parsed_docs` est fourni, les Doc produits y sont ajoutés avec
+        leur offset (cache des documents analysés). `cancel_event` arrête le
+        traitement d'un texte long au morceau suivant (job annulé): le thread
+        se termine avant le retour de la méthode.
         """
         try:
-            nlp = self.model_manager.get_spacy_model()
-            
             # Limiter la taille du texte pour éviter les problèmes de mémoire
             if len(text) > settings.max_text_length:
                 logger.warning(f"Text too long ({len(text)} chars), truncating to {settings.max_text_length}")
                 text = text[:settings.max_text_length]
             
-            # Traitement spaCy
-            doc = nlp(text)
-            entities = []
+            # Modèle de la langue du texte (chargé à la demande)
+            self.compute_seconds = None
+            async with self.model_manager.acquire_spacy_model(language) as nlp:
+                if len(text) > settings.ner_chunk_size:
+                    # Textes longs: morceaux aux frontières de paragraphes/phrases, traités en lot
+                    chunks = split_into_chunks(text, settings.ner_chunk_size)
+                    
+                    def parse_chunks():
+                        # Morceau par morceau (nlp.pipe lirait tous les morceaux d'avance):
+                        # un job annulé s'arrête au morceau suivant
+                        chunk_docs = []
+                        for start, end in chunks:
+                            if cancel_event is not None and cancel_event.is_set():
+                                break
+                            chunk_docs.append((start, nlp(text[start:end])))
+                        return chunk_docs
+                    
+                    docs, self.compute_seconds = await asyncio.to_thread(cpu_timed, parse_chunks)
+                else:
+                    doc, self.compute_seconds = await self._parse(nlp, text)
+                    docs = [(0, doc)]
             
-            for ent in doc.ents:
-                # Filtrer par types si spécifié
-                if entity_types and ent.label_ not in entity_types:
-                    continue
-                
-                # Mapper les labels spaCy vers nos types
-                mapped_label = self._map_spacy_label(ent.label_)
-                if not mapped_label:
-                    continue
-                
-                # Calculer le contexte
-                context = self._extract_context(text, ent.start_char, ent.end_char)
-                
-                entity = Entity(
-                    text=ent.text.strip(),
-                    label=mapped_label,
-                    start=ent.start_char,
-                    end=ent.end_char,
-                    confidence=0.8,  # Score de base pour spaCy, sera recalculé
-                    source="ner",
-                    context=context
-                )
-                
-                entities.append(entity)
+            entities = []
+            for offset, doc in docs:
+                entities.extend(self.doc_to_entities(doc, text, entity_types, offset))
+            if parsed_docs is not None:
+                parsed_docs.extend(docs)
             
             logger.info(f"spaCy NER extracted {len(entities)} entities")
             return entities
@@ -87,6 +110,120 @@ class NERProcessor:
             logger.error(f"NER extraction error: {e}")
             return []
     
+    async def extract_entities_until(
+        self,
+        text: str,
+        deadline: float,
+        entity_types: Optional[List[str]] = None,
+        language: Optional[str] = None,
+        ranges: Optional[List[Tuple[int, int]]] = None,
+        parsed_docs: Optional[list] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Tuple[List[Entity], List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """
+        Extraire les entités morceau par morceau, dans l'ordre du texte, jusqu'à l'échéance
+        
+        `deadline` est une échéance time.monotonic(). Un morceau n'est commencé
+        que si le débit observé sur les précédents permet de le finir à temps.
+        Retourne les entités, les intervalles analysés et ceux qui restent;
+        les Doc des morceaux analysés sont ajoutés à `parsed_docs` avec leur offset.
+        """
+        chunks = [
+            (range_start + start, range_start + end)
+            for range_start, range_end in (ranges if ranges is not None else [(0, len(text))])
+            for start, end in split_into_chunks(text[range_start:range_end], settings.deadline_chunk_size)
+        ]
+        entities = []
+        covered = []
+        chars_per_second = None
+        compute_seconds = 0.0
+        
+        try:
+            async with self.model_manager.acquire_spacy_model(language) as nlp:
+                for start, end in chunks:
+                    time_left = deadline - time.monotonic()
+                    if time_left <= 0 or (chars_per_second and (end - start) / chars_per_second > time_left):
+                        break
+                    if cancel_event is not None and cancel_event.is_set():
+                        break
+                    
+                    chunk_start = time.monotonic()
+                    doc, seconds = await self._parse(nlp, text[start:end])
+                    compute_seconds = None if seconds is None or compute_seconds is None else compute_seconds + seconds
+                    rate = (end - start) / max(time.monotonic() - chunk_start, 1e-6)
+                    # Moyenne mobile: le débit dépend de la densité du texte
+                    chars_per_second = rate if chars_per_second is None else 0.7 * chars_per_second + 0.3 * rate
+                    
+                    entities.extend(self.doc_to_entities(doc, text, entity_types, start))
+                    covered.append((start, end))
+                    if parsed_docs is not None:
+                        parsed_docs.append((start, doc))
+        
+        except Exception as e:
+            logger.error(f"NER extraction error: {e}")
+        
+        self.compute_seconds = compute_seconds
+        remaining = chunks[len(covered):]
+        logger.info(
+            f"spaCy NER extracted {len(entities)} entities "
+            f"({len(covered)}/{len(chunks)} chunks before deadline)"
+        )
+        return entities, merge_ranges(covered), merge_ranges(remaining)
+    
+    async def _parse(self, nlp, text: str):
+        """
+        Analyser un texte avec spaCy, retourne le Doc et son temps CPU
+        
+        Les petits textes du modèle principal sont regroupés avec les
+        requêtes concurrentes (micro-batch, temps CPU None); les autres sont
+        traités dans un thread pour ne pas bloquer la boucle d'événements.
+        """
+        if (
+            self.micro_batcher and nlp is self.model_manager.get_spacy_model()
+            and len(text) <= settings.micro_batch_max_chars
+        ):
+            return await self.micro_batcher.process(text), None
+        return await asyncio.to_thread(cpu_timed, nlp, text)
+    
+    def doc_to_entities(
+        self,
+        doc,
+        text: str,
+        entity_types: Optional[List[str]] = None,
+        offset: int = 0
+    ) -> List[Entity]:
+        """
+        Convertir les entités d'un Doc spaCy (offsets décalés de `offset` dans `text`)
+        """
+        entities = []
+        
+        for ent in doc.ents:
+            # Filtrer par types si spécifié
+            if entity_types and ent.label_ not in entity_types:
+                continue
+            
+            # Mapper les labels spaCy vers nos types
+            mapped_label = self._map_spacy_label(ent.label_)
+            if not mapped_label:
+                continue
+            
+            start = offset + ent.start_char
+            end = offset + ent.end_char
+            
+            entity = Entity(
+                text=ent.text.strip(),
+                label=mapped_label,
+                start=start,
+                end=end,
+                confidence=0.8,  # Score de base pour spaCy, sera recalculé
+                source="ner",
+                context=self._extract_context(text, start, end)
+            )
+            
+            entities.append(entity)
+        
+        return entities
+    
     async def extract_regex_entities(self, text: str) -> List[Entity]:
         """
         Extraire les entités avec patterns regex
@@ -125,6 +262,97 @@ class NERProcessor:
             logger.error(f"Regex extraction error: {e}")
             return []
     
+    async def propagate_entities(
+        self,
+        text: str,
+        entities: List[Entity],
+        confidence_calculator,
+        language: Optional[str] = None
+    ) -> List[Entity]:
+        """
+        Propager les entités NER fiables à toutes leurs occurrences
+        
+        Une forme de surface est fiable si l'une de ses détections atteint
+        PROPAGATION_MIN_CONFIDENCE avec le score calculé (le score de base de
+        spaCy est constant), ou si le modèle l'a détectée indépendamment au
+        moins PROPAGATION_MIN_DETECTIONS fois. Les formes fiables sont compilées
+        dans un seul PhraseMatcher, puis le document est parcouru une seule
+        fois (tokenisation uniquement, sans passer par le modèle neuronal),
+        avec le tokenizer de la langue du texte et dans un thread.
+        """
+        try:
+            candidates = [
+                entity for entity in entities
+                if entity.source == "ner" and len(entity.text) >= settings.propagation_min_length
+            ]
+            if not candidates:
+                return []
+            scores = confidence_calculator.score_batch(candidates).tolist()
+            
+            # Votes par label, nombre de détections et meilleur score de chaque forme
+            label_votes: Dict[str, Counter] = defaultdict(Counter)
+            best_scores: Dict[str, float] = defaultdict(float)
+            for entity, score in zip(candidates, scores):
+                label_votes[entity.text][entity.label] += 1
+                best_scores[entity.text] = max(best_scores[entity.text], score)
+            
+            label_votes = {
+                surface: votes for surface, votes in label_votes.items()
+                if best_scores[surface] >= settings.propagation_min_confidence
+                or sum(votes.values()) >= settings.propagation_min_detections
+            }
+            if not label_votes:
+                return []
+            
+            async with self.model_manager.acquire_spacy_model(language) as nlp:
+                spans = await asyncio.to_thread(self._match_surfaces, nlp, text, label_votes)
+            
+            # Ignorer les occurrences déjà couvertes par une entité existante
+            covered = sorted((e.start, e.end) for e in entities)
+            covered_starts = [start for start, _ in covered]
+            # Fin maximale des entités commençant avant chaque position (entités longues ou imbriquées)
+            covered_ends = list(itertools.accumulate((end for _, end in covered), max))
+            
+            propagated = []
+            for start, end, label in spans:
+                index = bisect.bisect_left(covered_starts, start)
+                if index > 0 and covered_ends[index - 1] > start:
+                    continue
+                if index < len(covered) and covered[index][0] < end:
+                    continue
+                
+                propagated.append(Entity(
+                    text=text[start:end],
+                    label=label,
+                    start=start,
+                    end=end,
+                    confidence=best_scores[text[start:end]],  # Recalculé avec les autres entités
+                    source="ner",
+                    context=self._extract_context(text, start, end)
+                ))
+            
+            logger.info(f"Mention propagation added {len(propagated)} entities from {len(label_votes)} surface forms")
+            return propagated
+            
+        except Exception as e:
+            logger.error(f"Mention propagation error: {e}")
+            return []
+    
+    @staticmethod
+    def _match_surfaces(nlp, text: str, label_votes: Dict[str, Counter]) -> List[Tuple[int, int, str]]:
+        """Occurrences des formes fiables dans le texte (start, end, label), sans chevauchement"""
+        matcher = PhraseMatcher(nlp.vocab, attr="ORTH")
+        for surface, votes in label_votes.items():
+            label = votes.most_common(1)[0][0]
+            matcher.add(label, [nlp.make_doc(surface)])
+        
+        # Un seul parcours linéaire du texte
+        doc = nlp.make_doc(text)
+        return [
+            (span.start_char, span.end_char, span.label_)
+            for span in filter_spans(matcher(doc, as_spans=True))
+        ]
+    
     def _map_spacy_label(self, spacy_label: str) -> Optional[str]:
         """
         Mapper les labels spaCy vers nos types d'entités
@@ -353,194 +581,3 @@ class EntityClassifier:
             return "low"
         else:
             return "very_low"
-
-# ai-service/src/processors/confidence_calculator.py
-import re
-from typing import List, Dict
-from ..utils.logger import logger
-from .ner_processor import Entity
-
-class ConfidenceCalculator:
-    """Calculateur de scores de confiance pour les entités"""
-    
-    def __init__(self):
-        # Patterns pour ajuster la confiance
-        self.quality_patterns = {
-            "PERSON": {
-                "high": [
-                    r'^[A-Z][a-z]+ [A-Z][a-z]+,  # Prénom Nom
-                    r'^[A-Z][a-z]+-[A-Z][a-z]+ [A-Z][a-z]+,  # Jean-Pierre Martin
-                ],
-                "low": [
-                    r'^[A-Z]+,  # Tout en majuscules
-                    r'^\d',  # Commence par un chiffre
-                ]
-            },
-            "ORG": {
-                "high": [
-                    r'(SARL|SAS|SA|EURL|SCI|SASU)',  # Types de sociétés
-                    r'(Société|Entreprise|Compagnie)',
-                ],
-                "low": [
-                    r'^[a-z]+,  # Tout en minuscules
-                ]
-            },
-            "EMAIL": {
-                "high": [r'@.*\.(com|fr|org|net|edu)],
-                "low": [r'@.*\.(test|example|localhost)]
-            }
-        }
-        
-        # Mots de contexte qui renforcent la confiance
-        self.context_boosters = {
-            "PERSON": ["monsieur", "madame", "docteur", "professeur", "maître"],
-            "ORG": ["société", "entreprise", "compagnie", "association", "fondation"],
-            "LOC": ["ville", "commune", "département", "région", "pays"],
-        }
-    
-    def calculate_confidence(self, entities: List[Entity], full_text: str) -> List[Entity]:
-        """
-        Calculer les scores de confiance pour toutes les entités
-        """
-        updated_entities = []
-        
-        for entity in entities:
-            # Score de base selon la source
-            base_confidence = self._get_base_confidence(entity)
-            
-            # Ajustements selon la qualité du texte
-            quality_adjustment = self._calculate_quality_adjustment(entity)
-            
-            # Ajustements selon le contexte
-            context_adjustment = self._calculate_context_adjustment(entity, full_text)
-            
-            # Ajustements selon la longueur
-            length_adjustment = self._calculate_length_adjustment(entity)
-            
-            # Score final
-            final_confidence = min(1.0, max(0.1, 
-                base_confidence + quality_adjustment + context_adjustment + length_adjustment
-            ))
-            
-            # Créer une nouvelle entité avec le score mis à jour
-            updated_entity = Entity(
-                text=entity.text,
-                label=entity.label,
-                start=entity.start,
-                end=entity.end,
-                confidence=round(final_confidence, 3),
-                source=entity.source,
-                context=entity.context
-            )
-            
-            updated_entities.append(updated_entity)
-        
-        logger.info(f"Confidence calculated for {len(updated_entities)} entities")
-        return updated_entities
-    
-    def _get_base_confidence(self, entity: Entity) -> float:
-        """
-        Score de confiance de base selon la source
-        """
-        base_scores = {
-            "regex": 0.85,  # Regex très fiables pour les patterns structurés
-            "ner": 0.75,    # spaCy généralement bon mais parfois des faux positifs
-            "manual": 0.95  # Ajouts manuels très fiables
-        }
-        
-        return base_scores.get(entity.source, 0.5)
-    
-    def _calculate_quality_adjustment(self, entity: Entity) -> float:
-        """
-        Ajustement basé sur la qualité du texte de l'entité
-        """
-        adjustment = 0.0
-        entity_type = entity.label
-        
-        if entity_type in self.quality_patterns:
-            patterns = self.quality_patterns[entity_type]
-            
-            # Vérifier les patterns de haute qualité
-            for pattern in patterns.get("high", []):
-                if re.search(pattern, entity.text, re.IGNORECASE):
-                    adjustment += 0.1
-                    break
-            
-            # Vérifier les patterns de basse qualité
-            for pattern in patterns.get("low", []):
-                if re.search(pattern, entity.text, re.IGNORECASE):
-                    adjustment -= 0.2
-                    break
-        
-        # Ajustements génériques
-        # Pénaliser les entités trop courtes (sauf pour les codes)
-        if len(entity.text) < 3 and entity_type not in ["IBAN", "SIREN", "SIRET"]:
-            adjustment -= 0.1
-        
-        # Pénaliser les entités avec beaucoup de caractères spéciaux
-        special_char_ratio = len(re.findall(r'[^\w\s]', entity.text)) / len(entity.text)
-        if special_char_ratio > 0.3:
-            adjustment -= 0.1
-        
-        return adjustment
-    
-    def _calculate_context_adjustment(self, entity: Entity, full_text: str) -> float:
-        """
-        Ajustement basé sur le contexte autour de l'entité
-        """
-        adjustment = 0.0
-        
-        if not entity.context:
-            return adjustment
-        
-        entity_type = entity.label
-        context_lower = entity.context.lower()
-        
-        # Vérifier les mots de contexte qui renforcent
-        if entity_type in self.context_boosters:
-            for booster in self.context_boosters[entity_type]:
-                if booster in context_lower:
-                    adjustment += 0.05
-        
-        # Contexte spécifique pour les emails
-        if entity_type == "EMAIL":
-            if any(word in context_lower for word in ["contact", "mail", "courriel", "@"]):
-                adjustment += 0.05
-        
-        # Contexte pour les numéros de téléphone
-        if entity_type == "PHONE":
-            if any(word in context_lower for word in ["téléphone", "tel", "mobile", "portable"]):
-                adjustment += 0.05
-        
-        return min(0.2, adjustment)  # Limiter l'ajustement contextuel
-    
-    def _calculate_length_adjustment(self, entity: Entity) -> float:
-        """
-        Ajustement basé sur la longueur de l'entité
-        """
-        length = len(entity.text)
-        entity_type = entity.label
-        
-        # Longueurs optimales par type d'entité
-        optimal_ranges = {
-            "PERSON": (5, 30),
-            "ORG": (3, 50),
-            "LOC": (3, 25),
-            "EMAIL": (5, 50),
-            "PHONE": (10, 15),
-            "IBAN": (15, 34),
-            "SIREN": (9, 11),  # Avec espaces
-            "SIRET": (14, 17), # Avec espaces
-        }
-        
-        if entity_type in optimal_ranges:
-            min_len, max_len = optimal_ranges[entity_type]
-            
-            if min_len <= length <= max_len:
-                return 0.05  # Bonus pour longueur optimale
-            elif length < min_len:
-                return -0.1   # Pénalité pour trop court
-            elif length > max_len * 1.5:
-                return -0.1   # Pénalité pour trop long
-        
-        return 0.0
@@ -0,0 +1,302 @@
+# ai-service/src/processors/search_index.py
+import re
+import bisect
+import heapq
+import hashlib
+from array import array
+from collections import OrderedDict, defaultdict
+from itertools import chain
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from unidecode import unidecode
+
+from ..config.settings import settings
+
+
+TOKEN_PATTERN = re.compile(r'\w+')
+WHITESPACE = re.compile(r'\s+')
+
+SEARCH_MODES = ["exact", "prefix", "accent_insensitive", "fuzzy"]
+
+
+@dataclass
+class SearchMatch:
+    """Occurrence trouvée dans le document"""
+    start: int
+    end: int
+    similarity: float
+
+
+def fold(token: str) -> str:
+    """Forme de recherche d'un mot: minuscules, sans accents"""
+    return unidecode(token).lower()
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Distance d'édition, abandonnée (max_distance + 1) dès que le seuil est dépassé"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def trigrams(term: str) -> set:
+    """Trigrammes de caractères d'un mot (bornes incluses)"""
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class DocumentIndex:
+    """
+    Index de recherche d'un document
+
+    Construit une seule fois par texte: les mots sont indexés par leur forme
+    repliée (minuscules, sans accents) dans un index inversé, positions et
+    offsets dans des tableaux d'entiers. Les index secondaires (vocabulaire
+    trié pour les préfixes, trigrammes pour la recherche approchée) sont
+    construits à la première requête qui en a besoin.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.terms: List[str] = []
+        self.token_terms = array("L")
+        self.token_starts = array("L")
+        self.token_ends = array("L")
+
+        term_ids: Dict[str, int] = {}
+        folded_cache: Dict[str, str] = {}
+        postings = defaultdict(lambda: array("L"))
+
+        for position, match in enumerate(TOKEN_PATTERN.finditer(text)):
+            raw = match.group()
+            folded = folded_cache.get(raw)
+            if folded is None:
+                folded = folded_cache[raw] = fold(raw)
+            term_id = term_ids.get(folded)
+            if term_id is None:
+                term_id = term_ids[folded] = len(self.terms)
+                self.terms.append(folded)
+            self.token_terms.append(term_id)
+            self.token_starts.append(match.start())
+            self.token_ends.append(match.end())
+            postings[term_id].append(position)
+
+        self.term_ids = term_ids
+        self.postings = dict(postings)
+        self._sorted_terms: Optional[List[str]] = None
+        self._trigram_index: Optional[Dict[str, array]] = None
+
+    @property
+    def token_count(self) -> int:
+        return len(self.token_terms)
+
+    def search(
+        self,
+        query: str,
+        mode: str = "exact",
+        case_sensitive: bool = False,
+        max_results: int = 20,
+        max_edits: Optional[int] = None
+    ) -> List[SearchMatch]:
+        """
+        Rechercher une expression (un ou plusieurs mots consécutifs)
+
+        - exact: mots identiques, casse ignorée sauf `case_sensitive`
+        - prefix: comme exact, le dernier mot peut être un début de mot
+        - accent_insensitive: casse et accents ignorés
+        - fuzzy: chaque mot à au plus `max_edits` modifications (casse et accents ignorés)
+        """
+        query_matches = list(TOKEN_PATTERN.finditer(query))
+        if not query_matches:
+            return []
+        query_tokens = [match.group() for match in query_matches]
+        # Ponctuation en bordure de requête ignorée
+        query = query[query_matches[0].start():query_matches[-1].end()]
+
+        # Mots du vocabulaire candidats pour chaque mot de la requête, avec leur score
+        candidates = [
+            self._candidate_terms(token, mode, is_last=(i == len(query_tokens) - 1), max_edits=max_edits)
+            for i, token in enumerate(query_tokens)
+        ]
+        if not all(candidates):
+            return []
+
+        length = len(query_tokens)
+        # Parcours dans l'ordre du résultat final quand c'est possible, pour s'arrêter
+        # dès max_results atteint (recherche approchée d'un seul mot: par score décroissant)
+        ranked = mode == "fuzzy" and length == 1
+        early_stop = mode != "fuzzy" or ranked
+
+        matches = []
+        for position in self._first_positions(candidates[0], ranked):
+            if position + length > self.token_count:
+                continue
+            scores = []
+            for offset, term_scores in enumerate(candidates):
+                score = term_scores.get(self.token_terms[position + offset])
+                if score is None:
+                    break
+                scores.append(score)
+            else:
+                start = self.token_starts[position]
+                end = self.token_ends[position + length - 1]
+                if self._verify(self.text[start:end], query, query_tokens, mode, case_sensitive):
+                    matches.append(SearchMatch(start=start, end=end, similarity=round(sum(scores) / length, 3)))
+                    if early_stop and len(matches) >= max_results:
+                        break
+
+        if mode == "fuzzy":
+            matches.sort(key=lambda match: (-match.similarity, match.start))
+        return matches[:max_results]
+
+    def _first_positions(self, term_scores: Dict[int, float], ranked: bool) -> Iterator[int]:
+        """Positions des mots candidats, par position (et par score décroissant si `ranked`)"""
+        if not ranked:
+            return heapq.merge(*(self.postings[term_id] for term_id in term_scores))
+
+        by_score = defaultdict(list)
+        for term_id, score in term_scores.items():
+            by_score[score].append(term_id)
+        return chain.from_iterable(
+            heapq.merge(*(self.postings[term_id] for term_id in by_score[score]))
+            for score in sorted(by_score, reverse=True)
+        )
+
+    def _candidate_terms(
+        self,
+        token: str,
+        mode: str,
+        is_last: bool,
+        max_edits: Optional[int]
+    ) -> Dict[int, float]:
+        """Identifiants des mots du vocabulaire compatibles avec un mot de la requête"""
+        folded = fold(token)
+
+        if mode == "prefix" and is_last:
+            sorted_terms = self._get_sorted_terms()
+            index = bisect.bisect_left(sorted_terms, folded)
+            result = {}
+            while index < len(sorted_terms) and sorted_terms[index].startswith(folded):
+                result[self.term_ids[sorted_terms[index]]] = 1.0
+                index += 1
+            return result
+
+        if mode == "fuzzy":
+            return self._fuzzy_terms(folded, max_edits)
+
+        term_id = self.term_ids.get(folded)
+        return {term_id: 1.0} if term_id is not None else {}
+
+    def _fuzzy_terms(self, folded: str, max_edits: Optional[int]) -> Dict[int, float]:
+        """Mots du vocabulaire à distance d'édition bornée (filtrés par trigrammes communs)"""
+        if max_edits is None:
+            max_edits = settings.search_fuzzy_max_edits
+        # Mots courts: peu de tolérance, sinon tout correspond
+        max_edits = min(max_edits, 0 if len(folded) <= 3 else 1 if len(folded) <= 6 else 2)
+
+        query_trigrams = trigrams(folded)
+        if max_edits == 0:
+            term_id = self.term_ids.get(folded)
+            return {term_id: 1.0} if term_id is not None else {}
+
+        # Une modification change au plus 3 trigrammes
+        min_shared = max(1, len(query_trigrams) - 3 * max_edits)
+        shared = defaultdict(int)
+        trigram_index = self._get_trigram_index()
+        for trigram in query_trigrams:
+            for term_id in trigram_index.get(trigram, ()):
+                shared[term_id] += 1
+
+        result = {}
+        for term_id, count in shared.items():
+            if count < min_shared:
+                continue
+            term = self.terms[term_id]
+            distance = bounded_levenshtein(folded, term, max_edits)
+            if distance <= max_edits:
+                result[term_id] = 1.0 - distance / max(len(folded), len(term))
+        return result
+
+    def _verify(self, found: str, query: str, query_tokens: List[str], mode: str, case_sensitive: bool) -> bool:
+        """Contrôler une occurrence candidate avec les règles du mode (casse, accents, séparateurs)"""
+        if mode == "exact":
+            found, query = WHITESPACE.sub(" ", found), WHITESPACE.sub(" ", query)
+            return found == query if case_sensitive else found.lower() == query.lower()
+
+        if mode == "prefix":
+            found_tokens = TOKEN_PATTERN.findall(found)
+            if not case_sensitive:
+                found_tokens = [token.lower() for token in found_tokens]
+                query_tokens = [token.lower() for token in query_tokens]
+            return (
+                found_tokens[:-1] == query_tokens[:-1]
+                and found_tokens[-1].startswith(query_tokens[-1])
+            )
+
+        # accent_insensitive, fuzzy: la forme repliée suffit
+        return True
+
+    def _get_sorted_terms(self) -> List[str]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.terms)
+        return self._sorted_terms
+
+    def _get_trigram_index(self) -> Dict[str, array]:
+        if self._trigram_index is None:
+            index = defaultdict(lambda: array("L"))
+            for term_id, term in enumerate(self.terms):
+                for trigram in trigrams(term):
+                    index[trigram].append(term_id)
+            self._trigram_index = dict(index)
+        return self._trigram_index
+
+
+class SearchIndexCache:
+    """Index des documents récemment interrogés (LRU, clé: empreinte du contenu)"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.search_index_cache_size
+        self._entries: "OrderedDict[str, DocumentIndex]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def get(self, key: str) -> Optional[DocumentIndex]:
+        index = self._entries.get(key)
+        if index is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return index
+
+    def put(self, key: str, index: DocumentIndex):
+        self._entries[key] = index
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def extract_context(text: str, start: int, end: int, window: int) -> str:
+    """Contexte autour d'une occurrence"""
+    return text[max(0, start - window):min(len(text), end + window)]
+
@@ -0,0 +1,202 @@
+# ai-service/src/services/admission_controller.py
+import math
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from ..config.settings import settings
+from ..utils.logger import logger
+
+
+# Métriques d'admission
+ADMITTED_REQUESTS = Counter(
+    "ai_admission_admitted_total", "Requêtes admises", ["queued"]
+)
+SHED_REQUESTS = Counter(
+    "ai_admission_shed_total", "Requêtes rejetées pour surcharge", ["reason"]
+)
+QUEUED_REQUESTS = Gauge(
+    "ai_admission_queued_requests", "Requêtes en attente d'admission"
+)
+INFLIGHT_COST = Gauge(
+    "ai_admission_inflight_cost", "Coût (caractères) des requêtes en cours"
+)
+WAIT_SECONDS = Histogram(
+    "ai_admission_wait_seconds", "Temps d'attente avant admission",
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10)
+)
+
+
+class OverloadedError(Exception):
+    """Requête rejetée par le contrôle d'admission"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Contrôle d'admission par budget de coût (nombre de caractères)
+
+    Les requêtes qui dépassent le budget attendent dans une file FIFO bornée,
+    au plus `max_wait` secondes. Au-delà, elles sont rejetées immédiatement
+    (429 si la file est pleine, 503 si l'attente expire) avec un Retry-After.
+    """
+
+    def __init__(
+        self,
+        max_inflight_cost: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        max_wait: Optional[float] = None
+    ):
+        self.max_inflight_cost = max_inflight_cost or settings.admission_max_inflight_chars
+        self.max_queue_size = max_queue_size if max_queue_size is not None else settings.admission_max_queue_size
+        self.max_wait = max_wait if max_wait is not None else settings.admission_max_wait
+        self._inflight_cost = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+        # Débit servi (caractères/seconde), pour estimer le Retry-After
+        self._throughput: Optional[float] = None
+        # Fenêtre de mesure: coût terminé et temps d'activité (au moins une requête en cours)
+        self._window_cost = 0
+        self._window_busy = 0.0
+        self._busy_since: Optional[float] = None
+
+    @asynccontextmanager
+    async def admit(self, cost: int) -> AsyncIterator[None]:
+        """Réserver `cost` unités du budget le temps du traitement"""
+        # Un document plus gros que le budget total passe seul
+        cost = min(max(cost, 1), self.max_inflight_cost)
+        wait_start = time.monotonic()
+        queued = False
+
+        if not self._waiters and self._inflight_cost + cost <= self.max_inflight_cost:
+            self._acquire(cost)
+        else:
+            queued = True
+            await self._wait(cost)
+
+        WAIT_SECONDS.observe(time.monotonic() - wait_start)
+        ADMITTED_REQUESTS.labels(queued=str(queued).lower()).inc()
+
+        try:
+            yield
+        finally:
+            self._record_throughput(cost)
+            self._release(cost)
+
+    def get_stats(self) -> dict:
+        """Obtenir l'état courant du contrôleur"""
+        return {
+            "inflight_cost": self._inflight_cost,
+            "max_inflight_cost": self.max_inflight_cost,
+            "queued": len(self._waiters),
+            "max_queue_size": self.max_queue_size,
+            "max_wait": self.max_wait,
+            "throughput_chars_per_second": self._throughput,
+        }
+
+    async def _wait(self, cost: int):
+        """Attendre une place dans le budget ou rejeter la requête"""
+        if len(self._waiters) >= self.max_queue_size:
+            self._shed("queue_full", 429, "Too many requests queued, retry later")
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (cost, future)
+        self._waiters.append(waiter)
+        QUEUED_REQUESTS.set(len(self._waiters))
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            # La place a pu être accordée au moment même de l'expiration
+            if not future.done():
+                self._remove_waiter(waiter)
+                self._shed("wait_timeout", 503, "Service overloaded, retry later")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(cost)
+            else:
+                self._remove_waiter(waiter)
+            raise
+
+    def _acquire(self, cost: int):
+        if self._inflight_cost == 0:
+            self._busy_since = time.monotonic()
+        self._inflight_cost += cost
+        INFLIGHT_COST.set(self._inflight_cost)
+
+    def _release(self, cost: int):
+        self._inflight_cost -= cost
+        INFLIGHT_COST.set(self._inflight_cost)
+        if self._inflight_cost == 0 and self._busy_since is not None:
+            self._window_busy += time.monotonic() - self._busy_since
+            self._busy_since = None
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        """Admettre les requêtes en tête de file tant que le budget le permet"""
+        while self._waiters:
+            cost, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if self._inflight_cost + cost > self.max_inflight_cost:
+                break
+            self._waiters.popleft()
+            self._acquire(cost)
+            future.set_result(None)
+        QUEUED_REQUESTS.set(len(self._waiters))
+
+    def _remove_waiter(self, waiter: Tuple[int, asyncio.Future]):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        waiter[1].cancel()
+        QUEUED_REQUESTS.set(len(self._waiters))
+        # Les requêtes suivantes peuvent maintenant tenir dans le budget
+        self._wake_waiters()
+
+    def _record_throughput(self, cost: int):
+        """
+        Moyenne mobile exponentielle du débit servi en caractères/seconde
+
+        Le coût des requêtes terminées est rapporté au temps d'activité du
+        service sur la fenêtre (et non à la durée de chaque requête): sous
+        concurrence, c'est la capacité totale qui vide le backlog.
+        """
+        now = time.monotonic()
+        self._window_cost += cost
+        busy = self._window_busy + (now - self._busy_since if self._busy_since is not None else 0.0)
+        if busy < settings.admission_throughput_window:
+            return
+
+        observed = self._window_cost / busy
+        self._window_cost = 0
+        self._window_busy = 0.0
+        if self._busy_since is not None:
+            self._busy_since = now
+        if self._throughput is None:
+            self._throughput = observed
+        else:
+            self._throughput = 0.8 * self._throughput + 0.2 * observed
+
+    def _retry_after(self) -> int:
+        """Estimer le délai avant qu'une nouvelle requête puisse passer"""
+        if not self._throughput:
+            return settings.admission_default_retry_after
+        backlog = self._inflight_cost + sum(cost for cost, _ in self._waiters)
+        return max(1, min(60, math.ceil(backlog / self._throughput)))
+
+    def _shed(self, reason: str, status_code: int, detail: str):
+        SHED_REQUESTS.labels(reason=reason).inc()
+        retry_after = self._retry_after()
+        logger.warning(f"Request shed ({reason}): inflight={self._inflight_cost}, queued={len(self._waiters)}, retry_after={retry_after}s")
+        raise OverloadedError(status_code, detail, retry_after)
@@ -0,0 +1,193 @@
+# ai-service/src/services/coordinator.py
+"""
+Mode coordinateur: répartition d'un très gros texte sur des instances pairs
+
+Le texte est découpé aux frontières de paragraphes/phrases, chaque morceau
+(élargi de COORDINATOR_CHUNK_OVERLAP caractères sur le précédent, pour les
+entités coupées à la frontière) est envoyé à /api/v1/analyze/ d'un pair. Chaque pair tire les morceaux d'une file
+commune (vol de travail): un pair rapide en traite davantage. Un morceau en
+échec est remis en file pour un autre pair; après `max_attempts` échecs il est
+rendu à l'appelant pour un traitement local. Un pair qui échoue plusieurs fois
+de suite est écarté pour la requête.
+
+Test local avec plusieurs instances:
+
+    PORT=8001 python main.py
+    PORT=8002 python main.py
+    COORDINATOR_PEERS='["http://localhost:8001", "http://localhost:8002"]' python main.py
+
+L'en-tête X-Coordinator-Hop empêche un pair de répartir à nouveau le morceau reçu.
+"""
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import httpx
+from prometheus_client import Counter, Histogram
+
+from ..config.settings import settings
+from ..utils.logger import logger
+from ..utils.text_processing import overlap_chunks, split_into_chunks
+
+
+HOP_HEADER = "X-Coordinator-Hop"
+
+# Échecs consécutifs avant d'écarter un pair pour la requête en cours
+MAX_PEER_FAILURES = 2
+
+# Métriques de répartition
+CHUNKS_TOTAL = Counter(
+    "ai_coordinator_chunks_total", "Morceaux traités par pair", ["peer", "outcome"]
+)
+CHUNK_SECONDS = Histogram(
+    "ai_coordinator_chunk_seconds", "Durée d'analyse d'un morceau par un pair", ["peer"]
+)
+
+
+@dataclass
+class ChunkResult:
+    """Résultat d'un morceau analysé par un pair"""
+    start: int
+    end: int
+    peer: str
+    response: Dict[str, Any]
+
+
+@dataclass
+class FanOutResult:
+    """Résultat de la répartition d'un texte"""
+    results: List[ChunkResult] = field(default_factory=list)
+    failed: List[Tuple[int, int]] = field(default_factory=list)  # À traiter localement
+    chunks: int = 0
+    peers_used: int = 0
+
+
+class ChunkCoordinator:
+    """Répartiteur des morceaux d'un texte sur les instances pairs"""
+
+    def __init__(
+        self,
+        peers: Optional[List[str]] = None,
+        chunk_size: Optional[int] = None,
+        max_inflight_per_peer: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        self.peers = [peer.rstrip("/") for peer in (peers or settings.coordinator_peers)]
+        self.chunk_size = chunk_size or settings.ner_chunk_size
+        self.max_inflight_per_peer = max_inflight_per_peer or settings.coordinator_max_inflight_per_peer
+        self.max_attempts = max_attempts or settings.coordinator_max_attempts
+        self.timeout = timeout or settings.coordinator_timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        """Créer le client HTTP (connexions réutilisées entre les requêtes)"""
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=len(self.peers) * self.max_inflight_per_peer,
+                max_keepalive_connections=len(self.peers) * self.max_inflight_per_peer
+            )
+        )
+        logger.info(f"Coordinator started: {len(self.peers)} peers")
+
+    async def stop(self):
+        """Fermer le client HTTP"""
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    def should_fan_out(self, text: str, headers: Mapping[str, str]) -> bool:
+        """Répartir uniquement les gros textes reçus directement (pas d'un autre coordinateur)"""
+        return (
+            self._client is not None
+            and bool(self.peers)
+            and len(text) > settings.coordinator_min_chars
+            and HOP_HEADER not in headers
+        )
+
+    async def fan_out(self, text: str, payload: Dict[str, Any]) -> FanOutResult:
+        """
+        Analyser les morceaux du texte sur les pairs
+
+        `payload` contient les options de la requête d'origine (sans le texte).
+        """
+        chunks = overlap_chunks(text, split_into_chunks(text, self.chunk_size), settings.coordinator_chunk_overlap)
+        queue: asyncio.Queue = asyncio.Queue()
+        for start, end in chunks:
+            queue.put_nowait((start, end, 0))
+
+        outcome = FanOutResult(chunks=len(chunks))
+        pending = [len(chunks)]
+        done = asyncio.Event()
+        peer_failures = {peer: 0 for peer in self.peers}
+        used_peers = set()
+
+        def finish_chunk():
+            pending[0] -= 1
+            if pending[0] == 0:
+                done.set()
+
+        async def worker(peer: str):
+            while not done.is_set():
+                if peer_failures[peer] >= MAX_PEER_FAILURES:
+                    return
+                try:
+                    start, end, attempts = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    # Un morceau en cours chez un autre pair peut encore revenir en file
+                    await asyncio.sleep(0.05)
+                    continue
+
+                try:
+                    response = await self._analyze_chunk(peer, text[start:end], payload)
+                except Exception as e:
+                    peer_failures[peer] += 1
+                    CHUNKS_TOTAL.labels(peer=peer, outcome="error").inc()
+                    logger.warning(f"Chunk {start}-{end} failed on {peer} (attempt {attempts + 1}): {e}")
+                    if attempts + 1 >= self.max_attempts:
+                        outcome.failed.append((start, end))
+                        finish_chunk()
+                    else:
+                        queue.put_nowait((start, end, attempts + 1))
+                    continue
+
+                peer_failures[peer] = 0
+                used_peers.add(peer)
+                CHUNKS_TOTAL.labels(peer=peer, outcome="success").inc()
+                outcome.results.append(ChunkResult(start=start, end=end, peer=peer, response=response))
+                finish_chunk()
+
+        workers = [
+            asyncio.create_task(worker(peer))
+            for peer in self.peers
+            for _ in range(self.max_inflight_per_peer)
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+        # Tous les pairs écartés: les morceaux restants sont traités localement
+        while not queue.empty():
+            start, end, _ = queue.get_nowait()
+            outcome.failed.append((start, end))
+
+        outcome.results.sort(key=lambda result: result.start)
+        outcome.failed.sort()
+        outcome.peers_used = len(used_peers)
+        return outcome
+
+    async def _analyze_chunk(self, peer: str, chunk: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Envoyer un morceau à un pair"""
+        start_time = time.monotonic()
+        response = await self._client.post(
+            f"{peer}/api/v1/analyze/",
+            json={**payload, "text": chunk},
+            headers={HOP_HEADER: "1"}
+        )
+        response.raise_for_status()
+        CHUNK_SECONDS.labels(peer=peer).observe(time.monotonic() - start_time)
+        return response.json()
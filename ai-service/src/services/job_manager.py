@@ -0,0 +1,305 @@
+# ai-service/src/services/job_manager.py
+import json
+import time
+import uuid
+import asyncio
+import itertools
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from ..config.settings import settings
+from ..utils.logger import logger
+
+
+# Classes de priorité (plus petit = traité en premier)
+JOB_PRIORITIES = {
+    "interactive": 0,
+    "bulk": 1,
+}
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+# Signature d'un traitement: reçoit une fonction de rapport partiel et l'événement
+# d'annulation (vérifié par les traitements dans les threads), retourne le résultat final
+PartialReporter = Callable[[str, List[Any]], Awaitable[None]]
+JobRunner = Callable[[PartialReporter, threading.Event], Awaitable[Dict[str, Any]]]
+
+
+class JobQueueFullError(Exception):
+    """File d'attente des jobs pleine"""
+
+
+class JobStore(ABC):
+    """Interface de stockage des jobs"""
+
+    @abstractmethod
+    async def save(self, job: Dict[str, Any], ttl: Optional[int] = None):
+        """Enregistrer un job (expiration après `ttl` secondes si fourni)"""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Obtenir un job, None s'il est inconnu ou expiré"""
+
+    @abstractmethod
+    async def delete(self, job_id: str):
+        """Supprimer un job"""
+
+    async def close(self):
+        pass
+
+
+class InMemoryJobStore(JobStore):
+    """Stockage des jobs en mémoire (mono-instance)"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._expires_at: Dict[str, float] = {}
+
+    async def save(self, job: Dict[str, Any], ttl: Optional[int] = None):
+        self._jobs[job["id"]] = job
+        if ttl:
+            self._expires_at[job["id"]] = time.monotonic() + ttl
+        else:
+            self._expires_at.pop(job["id"], None)
+        self._purge_expired()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        expires_at = self._expires_at.get(job_id)
+        if expires_at is not None and expires_at <= time.monotonic():
+            await self.delete(job_id)
+            return None
+        return self._jobs.get(job_id)
+
+    async def delete(self, job_id: str):
+        self._jobs.pop(job_id, None)
+        self._expires_at.pop(job_id, None)
+
+    def _purge_expired(self):
+        """Supprimer les résultats expirés"""
+        now = time.monotonic()
+        expired = [job_id for job_id, expires_at in self._expires_at.items() if expires_at <= now]
+        for job_id in expired:
+            self._jobs.pop(job_id, None)
+            self._expires_at.pop(job_id, None)
+
+
+class RedisJobStore(JobStore):
+    """Stockage des jobs dans Redis (TTL géré par Redis)"""
+
+    def __init__(self, redis_url: str, prefix: str = "ai-service:job:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(redis_url, decode_responses=True)
+        self._prefix = prefix
+
+    async def save(self, job: Dict[str, Any], ttl: Optional[int] = None):
+        await self._redis.set(self._prefix + job["id"], json.dumps(job), ex=ttl)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        payload = await self._redis.get(self._prefix + job_id)
+        return json.loads(payload) if payload else None
+
+    async def delete(self, job_id: str):
+        await self._redis.delete(self._prefix + job_id)
+
+    async def close(self):
+        await self._redis.close()
+
+
+def create_job_store() -> JobStore:
+    """Créer le stockage configuré (memory ou redis)"""
+    if settings.job_store == "redis":
+        return RedisJobStore(settings.redis_url)
+    return InMemoryJobStore()
+
+
+class JobManager:
+    """File de jobs d'analyse avec pool de workers local"""
+
+    def __init__(self, store: Optional[JobStore] = None, workers: Optional[int] = None):
+        self.store = store or create_job_store()
+        self.workers = workers or settings.job_workers
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=settings.job_queue_max_size)
+        self._sequence = itertools.count()
+        self._runners: Dict[str, JobRunner] = {}
+        # Job en cours: tâche du traitement, événement d'annulation, fin enregistrée
+        self._running: Dict[str, Tuple[asyncio.Task, threading.Event, asyncio.Event]] = {}
+        self._listeners: Dict[str, Set[asyncio.Queue]] = {}
+        self._worker_tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    async def start(self):
+        """Démarrer le pool de workers"""
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        logger.info(f"Job manager started: {self.workers} workers, queue size {settings.job_queue_max_size}")
+
+    async def stop(self):
+        """Arrêter les workers et annuler les jobs en cours"""
+        self._stopping = True
+        for task, cancel_event, _ in list(self._running.values()):
+            cancel_event.set()
+            task.cancel()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        await self.store.close()
+
+    async def submit(self, runner: JobRunner, priority: str = "interactive", metadata: Optional[dict] = None) -> Dict[str, Any]:
+        """Soumettre un job, retourne son enregistrement initial"""
+        if priority not in JOB_PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "priority": priority,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "stage": None,
+            "partial_entities": [],
+            "result": None,
+            "error": None,
+            "metadata": metadata or {},
+        }
+
+        try:
+            self._queue.put_nowait((JOB_PRIORITIES[priority], next(self._sequence), job["id"]))
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f"Job queue full ({settings.job_queue_max_size} jobs)")
+
+        self._runners[job["id"]] = runner
+        await self.store.save(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Obtenir l'état d'un job"""
+        return await self.store.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Annuler un job en attente ou en cours"""
+        job = await self.store.get(job_id)
+        if not job or job["status"] in TERMINAL_STATUSES:
+            return job
+
+        running = self._running.get(job_id)
+        if running:
+            # Le traitement spaCy en cours s'arrête au prochain morceau. La tâche
+            # n'est pas annulée: elle attend la fin du thread (modèle réservé
+            # jusque-là) et l'état final est enregistré avant de répondre
+            _, cancel_event, finished = running
+            cancel_event.set()
+            await finished.wait()
+            return await self.store.get(job_id)
+
+        # Job encore en file: le worker l'ignorera
+        self._runners.pop(job_id, None)
+        job["status"] = "cancelled"
+        job["finished_at"] = time.time()
+        await self._update(job)
+        return job
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Suivre les changements d'état d'un job jusqu'à sa fin
+
+        Le premier état contient toutes les entités partielles déjà trouvées,
+        les suivants uniquement celles ajoutées depuis l'état précédent.
+        """
+        job = await self.store.get(job_id)
+        if not job:
+            return
+
+        updates: asyncio.Queue = asyncio.Queue()
+        self._listeners.setdefault(job_id, set()).add(updates)
+        try:
+            yield job
+            while job["status"] not in TERMINAL_STATUSES:
+                job = await updates.get()
+                yield job
+        finally:
+            listeners = self._listeners.get(job_id)
+            if listeners is not None:
+                listeners.discard(updates)
+                if not listeners:
+                    self._listeners.pop(job_id, None)
+
+    def queue_depth(self) -> int:
+        """Nombre de jobs en attente"""
+        return self._queue.qsize()
+
+    async def _worker(self, worker_id: int):
+        """Boucle d'un worker: traite les jobs par ordre de priorité"""
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                runner = self._runners.pop(job_id, None)
+                job = await self.store.get(job_id)
+                if runner is None or not job or job["status"] != "queued":
+                    continue
+                await self._run_job(job, runner)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} error: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job: Dict[str, Any], runner: JobRunner):
+        """Exécuter un job et enregistrer son résultat"""
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        await self._update(job)
+
+        async def report_partial(stage: str, entities: List[Any]):
+            new_entities = [
+                entity.model_dump() if hasattr(entity, "model_dump") else entity
+                for entity in entities
+            ]
+            job["stage"] = stage
+            job["partial_entities"].extend(new_entities)
+            await self._update(job, new_entities)
+
+        cancel_event = threading.Event()
+        finished = asyncio.Event()
+        task = asyncio.create_task(runner(report_partial, cancel_event))
+        self._running[job["id"]] = (task, cancel_event, finished)
+        try:
+            result = await task
+            if cancel_event.is_set():
+                # Annulé pendant le traitement: résultat incomplet ignoré
+                job["status"] = "cancelled"
+            else:
+                job["result"] = result
+                job["status"] = "completed"
+        except asyncio.CancelledError:
+            cancel_event.set()
+            job["status"] = "cancelled"
+            # Propager l'annulation si c'est le pool lui-même qui est arrêté
+            if self._stopping:
+                raise
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {e}")
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            self._running.pop(job["id"], None)
+            job["finished_at"] = time.time()
+            await self._update(job)
+            finished.set()
+
+        logger.info(f"Job {job['id']} {job['status']} in {job['finished_at'] - job['started_at']:.2f}s")
+
+    async def _update(self, job: Dict[str, Any], new_entities: Optional[List[Any]] = None):
+        """Persister un job et notifier les abonnés (entités partielles ajoutées uniquement)"""
+        ttl = settings.job_result_ttl if job["status"] in TERMINAL_STATUSES else None
+        await self.store.save(job, ttl=ttl)
+        listeners = self._listeners.get(job["id"])
+        if listeners:
+            update = dict(job, partial_entities=new_entities or [])
+            for updates in listeners:
+                updates.put_nowait(update)
@@ -0,0 +1,155 @@
+# ai-service/src/services/memory_guard.py
+import time
+import asyncio
+from typing import Optional
+
+from prometheus_client import Counter, Gauge
+
+from ..config.settings import settings
+from ..utils.gc_tuning import run_pending_refreeze
+from ..utils.logger import logger
+from ..utils.memory import get_rss_bytes
+
+
+# Métriques mémoire
+PROCESS_RSS_BYTES = Gauge(
+    "ai_process_rss_bytes", "Mémoire résidente du processus"
+)
+VOCAB_STRINGS = Gauge(
+    "ai_spacy_vocab_strings", "Nombre de chaînes du StringStore du modèle principal"
+)
+VOCAB_LEXEMES = Gauge(
+    "ai_spacy_vocab_lexemes", "Nombre de lexèmes du vocabulaire du modèle principal"
+)
+VOCAB_GROWTH = Gauge(
+    "ai_spacy_vocab_growth", "Chaînes ajoutées depuis le dernier chargement du modèle"
+)
+MODEL_RELOADS = Counter(
+    "ai_model_reloads_total", "Rechargements du modèle pour borner la mémoire", ["reason"]
+)
+SKIPPED_RELOADS = Counter(
+    "ai_model_reloads_skipped_total", "Rechargements abandonnés faute de mémoire pour deux pipelines", ["reason"]
+)
+
+
+class MemoryGuard:
+    """
+    Surveillance périodique de la mémoire du service
+
+    Le vocabulaire spaCy est partagé entre les requêtes et ne fait que
+    grossir. Au-delà des seuils configurés, le modèle principal est rechargé
+    sans interruption (ModelManager.reload_spacy_model) et les modèles
+    secondaires inactifs sont libérés du pool.
+
+    Le rechargement garde deux pipelines en mémoire le temps de la bascule:
+    il n'a lieu que si la RSS projetée reste sous MEMORY_LIMIT_MB, et le seuil
+    RSS effectif est plafonné à MEMORY_LIMIT_MB moins la taille du modèle. Le
+    déclencheur RSS n'est réarmé qu'une fois la RSS redescendue sous son
+    seuil, la mémoire n'étant pas toujours rendue au système.
+
+    C'est aussi ici que la collection complète demandée après la libération
+    d'un modèle (gc_tuning.schedule_refreeze) est exécutée, hors trafic.
+    """
+
+    def __init__(self, model_manager, interval: Optional[int] = None):
+        self.model_manager = model_manager
+        self.interval = interval or settings.memory_check_interval
+        self._task: Optional[asyncio.Task] = None
+        self._last_reload = time.monotonic()
+        self._rss_armed = True
+
+    async def start(self):
+        """Démarrer la surveillance"""
+        configured = settings.rss_reload_threshold_mb * 1024 * 1024
+        effective = self._rss_threshold()
+        if effective < configured:
+            logger.warning(
+                f"RSS_RELOAD_THRESHOLD_MB ({settings.rss_reload_threshold_mb}MB) leaves no room for a reload "
+                f"under MEMORY_LIMIT_MB ({settings.memory_limit_mb}MB): using {effective / 1024 / 1024:.0f}MB"
+            )
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Memory guard started: check every {self.interval}s")
+
+    async def stop(self):
+        """Arrêter la surveillance"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Memory check error: {e}")
+
+    async def check(self):
+        """Mettre à jour les métriques et recharger le modèle si nécessaire"""
+        run_pending_refreeze(idle=self.model_manager.is_idle())
+
+        rss = get_rss_bytes()
+        vocab = self.model_manager.get_vocab_stats()
+
+        PROCESS_RSS_BYTES.set(rss)
+        VOCAB_STRINGS.set(vocab["strings"])
+        VOCAB_LEXEMES.set(vocab["lexemes"])
+        VOCAB_GROWTH.set(vocab["growth"])
+
+        # Modèles secondaires: libérés, ils seront rechargés neufs au prochain usage
+        model_pool = self.model_manager.model_pool
+        evicted = model_pool.evict_grown(settings.vocab_growth_threshold)
+        if evicted:
+            MODEL_RELOADS.labels(reason="pool_vocab_growth").inc(evicted)
+
+        # Modèles inutilisés: libérés même sans nouvelle requête pour le pool
+        model_pool.evict_idle()
+
+        rss_threshold = self._rss_threshold()
+        if rss < rss_threshold:
+            self._rss_armed = True
+
+        reason = None
+        if vocab["growth"] > settings.vocab_growth_threshold:
+            reason = "vocab_growth"
+        elif rss > rss_threshold and self._rss_armed:
+            reason = "rss"
+
+        if reason is None:
+            return
+
+        # Éviter les rechargements en boucle si la mémoire ne vient pas du vocabulaire
+        if time.monotonic() - self._last_reload < settings.memory_reload_cooldown:
+            logger.warning(f"Memory threshold reached ({reason}) but reload is in cooldown")
+            return
+
+        logger.warning(
+            f"Memory threshold reached ({reason}): rss={rss / 1024 / 1024:.0f}MB, "
+            f"vocab growth={vocab['growth']} strings"
+        )
+
+        # Nouvelle instance chargée avant la libération de l'ancienne
+        limit = settings.memory_limit_mb * 1024 * 1024
+        projected = rss + model_pool.get_model_size(settings.default_language)
+        if projected > limit:
+            projected -= model_pool.evict_inactive()
+        if projected > limit:
+            logger.warning(
+                f"Model reload skipped ({reason}): projected rss {projected / 1024 / 1024:.0f}MB "
+                f"over the {settings.memory_limit_mb}MB limit"
+            )
+            SKIPPED_RELOADS.labels(reason=reason).inc()
+            return
+
+        await self.model_manager.reload_spacy_model(reason=reason)
+        self._last_reload = time.monotonic()
+        MODEL_RELOADS.labels(reason=reason).inc()
+        if reason == "rss":
+            self._rss_armed = False
+
+    def _rss_threshold(self) -> int:
+        """Seuil RSS de rechargement, plafonné pour laisser la place d'un second modèle sous la limite"""
+        limit = settings.memory_limit_mb * 1024 * 1024
+        model_size = self.model_manager.model_pool.get_model_size(settings.default_language)
+        return min(settings.rss_reload_threshold_mb * 1024 * 1024, limit - model_size)
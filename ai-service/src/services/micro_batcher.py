@@ -0,0 +1,115 @@
+# ai-service/src/services/micro_batcher.py
+import time
+import asyncio
+from typing import List, Optional, Tuple
+
+from prometheus_client import Histogram
+
+from ..config.settings import settings
+from ..utils.logger import logger
+
+
+# Métriques de micro-batching
+BATCH_SIZE = Histogram(
+    "ai_microbatch_size", "Nombre de textes par lot nlp.pipe",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+BATCH_WINDOW_SECONDS = Histogram(
+    "ai_microbatch_window_seconds", "Durée de collecte d'un lot (premier texte -> envoi)",
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05)
+)
+BATCH_PROCESSING_SECONDS = Histogram(
+    "ai_microbatch_processing_seconds", "Durée de traitement d'un lot par spaCy",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+
+class MicroBatcher:
+    """
+    Regroupe les petits textes arrivant simultanément en un seul appel nlp.pipe
+
+    Un lot part dès que `max_batch_size` textes sont collectés ou que la
+    fenêtre de `window_ms` millisecondes depuis le premier texte est écoulée.
+    """
+
+    def __init__(self, model_manager, window_ms: Optional[float] = None, max_batch_size: Optional[int] = None):
+        self.model_manager = model_manager
+        self.window = (window_ms if window_ms is not None else settings.micro_batch_window_ms) / 1000
+        self.max_batch_size = max_batch_size or settings.batch_size
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Démarrer la boucle de collecte"""
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Micro-batcher started: window {self.window * 1000:.1f}ms, max batch {self.max_batch_size}")
+
+    async def stop(self):
+        """Arrêter la boucle de collecte"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def process(self, text: str):
+        """Traiter un texte via le prochain lot, retourne le Doc spaCy"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self):
+        """Boucle principale: collecter puis traiter les lots"""
+        while True:
+            batch = await self._collect()
+            await self._process_batch(batch)
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        """Collecter un lot pendant la fenêtre configurée"""
+        batch = [await self._queue.get()]
+        started = time.monotonic()
+        deadline = started + self.window
+
+        while len(batch) < self.max_batch_size:
+            # Vider d'abord ce qui est déjà en attente
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        BATCH_WINDOW_SECONDS.observe(time.monotonic() - started)
+        return batch
+
+    async def _process_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Traiter un lot avec nlp.pipe et distribuer les résultats"""
+        # Ignorer les requêtes abandonnées entre-temps
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+
+        BATCH_SIZE.observe(len(batch))
+        texts = [text for text, _ in batch]
+        start = time.monotonic()
+
+        try:
+            nlp = self.model_manager.get_spacy_model()
+            docs = await asyncio.to_thread(
+                lambda: list(nlp.pipe(texts, batch_size=len(texts)))
+            )
+        except Exception as e:
+            logger.error(f"Micro-batch processing error: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            BATCH_PROCESSING_SECONDS.observe(time.monotonic() - start)
+
+        for (_, future), doc in zip(batch, docs):
+            if not future.done():
+                future.set_result(doc)
@@ -0,0 +1,167 @@
+# ai-service/src/services/model_swapper.py
+import os
+import time
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+import spacy
+from prometheus_client import Counter
+
+from ..config.settings import settings
+from ..config.models import ModelManager
+from ..config.model_snapshot import DEFAULT_EVAL_TEXTS, get_snapshot_path
+from ..utils.gc_tuning import schedule_refreeze
+from ..utils.logger import logger
+
+
+MODEL_SWAPS = Counter(
+    "ai_model_swaps_total", "Changements de modèle à chaud", ["outcome"]
+)
+
+
+class SwapInProgressError(Exception):
+    """Un changement de modèle est déjà en cours"""
+
+
+class UnknownModelError(Exception):
+    """Modèle absent de la liste autorisée, ni installé ni disponible en snapshot"""
+
+
+def is_swappable_model(name: str) -> bool:
+    """Modèle accepté pour un changement à chaud (liste MODEL_SWAP_ALLOWED_MODELS, sinon installé ou snapshot)"""
+    if settings.model_swap_allowed_models:
+        return name in settings.model_swap_allowed_models
+    if settings.use_model_snapshot and os.path.isdir(get_snapshot_path(name)):
+        return True
+    return name in spacy.util.get_installed_models()
+
+
+class ModelSwapper:
+    """
+    Changement de modèle à chaud, sans interruption de service
+
+    Un nouveau ModelManager est chargé en arrière-plan (modèles secondaires
+    repris de l'instance en service) puis préchauffé pendant que l'ancien
+    continue de répondre. La bascule est une suite d'affectations sans
+    `await`: aucune requête ne voit un état intermédiaire. Les requêtes déjà
+    engagées sur l'ancienne instance (ModelManager.lease) sont attendues
+    avant de la libérer (en arrière-plan au-delà du délai de drainage); les
+    caches liés au modèle sont vidés.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._task: Optional[asyncio.Task] = None
+        # Anciennes instances libérées à la fin de leurs dernières requêtes
+        self._release_tasks: Set[asyncio.Task] = set()
+        self.status: Dict[str, Any] = {"state": "idle"}
+
+    def start(self, spacy_model: Optional[str] = None) -> Dict[str, Any]:
+        """Lancer un changement de modèle (SPACY_MODEL rechargé depuis le disque par défaut)"""
+        if self._task is not None and not self._task.done():
+            raise SwapInProgressError("A model swap is already in progress")
+
+        current = self.app.state.model_manager
+        if spacy_model and spacy_model != current.spacy_model_name and not is_swappable_model(spacy_model):
+            raise UnknownModelError(f"Model not available for swap: {spacy_model}")
+
+        self.status = {
+            "state": "loading",
+            "from": current.spacy_model_name,
+            "to": spacy_model or current.spacy_model_name,
+            "started_at": time.time(),
+        }
+        self._task = asyncio.create_task(self._swap(self.status["to"]))
+        return self.status
+
+    async def stop(self):
+        """Interrompre un changement en cours (arrêt du service)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        for task in self._release_tasks:
+            task.cancel()
+        await asyncio.gather(*self._release_tasks, return_exceptions=True)
+
+    def get_status(self) -> Dict[str, Any]:
+        return self.status
+
+    async def _swap(self, spacy_model: str):
+        start = time.monotonic()
+        old = self.app.state.model_manager
+        # Jamais de téléchargement ni de modèle de repli: le swap échoue et l'ancien modèle reste
+        new = ModelManager(spacy_model=spacy_model, allow_fallback=False)
+        logger.info(f"🔄 Model swap started: {old.spacy_model_name} -> {spacy_model}")
+
+        try:
+            await new.initialize(shared=old)
+            if new.spacy_model_name != spacy_model:
+                raise RuntimeError(f"Model {spacy_model} could not be loaded")
+
+            self.status["state"] = "warming"
+            await asyncio.to_thread(self._warm_up, new)
+        except asyncio.CancelledError:
+            await new.cleanup()
+            self.status.update(state="cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"❌ Model swap failed, keeping {old.spacy_model_name}: {e}")
+            await new.cleanup()
+            self.status.update(state="failed", error=str(e), duration=round(time.monotonic() - start, 2))
+            MODEL_SWAPS.labels(outcome="failed").inc()
+            return
+
+        self._switch(old, new)
+
+        # Requêtes engagées sur l'ancienne instance
+        self.status["state"] = "draining"
+        drained = await old.drain(settings.model_swap_drain_timeout)
+        if drained:
+            await self._release(old)
+        else:
+            # Libération à la fin des requêtes restantes, sans retarder la fin du changement
+            logger.warning(f"Model swap drain timed out with {old.get_model_info()['active_requests']} requests in flight")
+            task = asyncio.create_task(self._release(old))
+            self._release_tasks.add(task)
+            task.add_done_callback(self._release_tasks.discard)
+        del old
+
+        self.status.update(state="completed", drained=drained, duration=round(time.monotonic() - start, 2))
+        MODEL_SWAPS.labels(outcome="completed").inc()
+        logger.info(f"✅ Model swap completed in {self.status['duration']:.1f}s: {new.spacy_model_name}")
+
+    @staticmethod
+    async def _release(model_manager: ModelManager):
+        """Libérer une ancienne instance une fois sa dernière requête terminée"""
+        await model_manager.drain(None)
+        await model_manager.cleanup()
+        # Ancienne instance gelée: collectée hors trafic, plus rien ne la référence
+        schedule_refreeze()
+        logger.info(f"🧹 Previous model instance released: {model_manager.spacy_model_name}")
+
+    @staticmethod
+    def _warm_up(model_manager: ModelManager):
+        """Premières inférences hors trafic (allocations, caches internes du pipeline)"""
+        nlp = model_manager.get_spacy_model()
+        for text in DEFAULT_EVAL_TEXTS:
+            nlp(text)
+        list(nlp.pipe(DEFAULT_EVAL_TEXTS))
+
+    def _switch(self, old: ModelManager, new: ModelManager):
+        """Basculer toutes les références vers la nouvelle instance (sans point de suspension)"""
+        state = self.app.state
+        state.model_manager = new
+        for name in ("micro_batcher", "memory_guard"):
+            service = getattr(state, name, None)
+            if service is not None:
+                service.model_manager = new
+
+        # Documents analysés par l'ancien modèle
+        doc_cache = getattr(state, "doc_cache", None)
+        if doc_cache is not None:
+            doc_cache.clear()
+
+        # Comparaisons repartant de zéro: le modèle de référence a changé
+        shadow_evaluator = getattr(state, "shadow_evaluator", None)
+        if shadow_evaluator is not None:
+            shadow_evaluator.reset(new)
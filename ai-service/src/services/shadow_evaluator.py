@@ -0,0 +1,326 @@
+# ai-service/src/services/shadow_evaluator.py
+import os
+import random
+import asyncio
+import multiprocessing
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import spacy
+from prometheus_client import Counter as MetricCounter, Histogram
+
+from ..config.settings import settings
+from ..config.model_snapshot import SNAPSHOT_VECTORS_FILE, load_snapshot
+from ..processors.ner_processor import NERProcessor, cpu_timed
+from ..utils.logger import logger
+from ..utils.text_processing import split_into_chunks
+
+
+# Priorité du processus du candidat (nice Linux, 19 = plus basse)
+SHADOW_NICENESS = 10
+
+# Échantillons conservés pour les percentiles de latence
+LATENCY_WINDOW = 1000
+
+# Métriques de l'évaluation en parallèle
+SHADOW_REQUESTS = MetricCounter(
+    "ai_shadow_requests_total", "Requêtes échantillonnées pour le modèle candidat", ["outcome"]
+)
+SHADOW_LATENCY = Histogram(
+    "ai_shadow_ner_seconds", "Temps CPU du NER, modèle principal et candidat", ["model"]
+)
+
+Span = Tuple[int, int, str]
+
+
+@dataclass
+class ShadowSample:
+    """Requête échantillonnée: texte et entités NER du modèle principal"""
+    text: str
+    entity_types: Optional[List[str]]
+    primary_spans: Set[Span]
+    # Temps CPU du NER principal, None s'il n'est pas mesurable seul (micro-batch)
+    primary_latency: Optional[float]
+    # Découpage utilisé par le modèle principal
+    chunk_size: int
+    generation: int
+
+
+# Fonctions exécutées dans les processus du pool (doivent rester picklables)
+
+# Modèle candidat du processus (chargé une fois par l'initialiseur)
+_candidate_nlp: Optional[spacy.Language] = None
+
+
+def load_candidate_model(model: str, exclude: Iterable[str] = ()) -> spacy.Language:
+    """Charger le candidat (snapshot de prepare_model.py ou modèle spaCy) sans les composants exclus"""
+    if os.path.exists(os.path.join(model, SNAPSHOT_VECTORS_FILE)):
+        return load_snapshot(model, exclude=exclude)
+    return spacy.load(model, exclude=list(exclude))
+
+
+def init_candidate_process(model: str, exclude: List[str]):
+    """Baisser la priorité du processus (GIL et cœurs distincts du service) puis charger le candidat"""
+    global _candidate_nlp
+    try:
+        os.nice(SHADOW_NICENESS)
+    except (AttributeError, OSError):
+        pass
+    _candidate_nlp = load_candidate_model(model, exclude)
+
+
+def get_candidate_pipe_names() -> List[str]:
+    """Composants du candidat chargé (vérifie que le processus est prêt)"""
+    return list(_candidate_nlp.pipe_names)
+
+
+def run_candidate(text: str, chunk_size: int) -> Tuple[List[Span], float]:
+    """
+    Exécuter le candidat avec le même découpage que le modèle principal
+
+    Retourne les entités (offsets, label spaCy) et le temps CPU du NER,
+    indépendant de la priorité basse du processus.
+    """
+    def process():
+        if len(text) > chunk_size:
+            chunks = split_into_chunks(text, chunk_size)
+            return list(zip((s for s, _ in chunks), _candidate_nlp.pipe(text[s:e] for s, e in chunks)))
+        return [(0, _candidate_nlp(text))]
+
+    docs, seconds = cpu_timed(process)
+    spans = [
+        (offset + ent.start_char, offset + ent.end_char, ent.label_)
+        for offset, doc in docs
+        for ent in doc.ents
+    ]
+    return spans, seconds
+
+
+class ShadowEvaluator:
+    """
+    Évaluation d'un modèle candidat sur un échantillon du trafic réel
+
+    Une fraction des requêtes (`shadow_sample_rate`) est rejouée en arrière-plan
+    sur le modèle candidat, chargé dans un pool de processus de basse priorité
+    (le candidat ne dispute ni le GIL ni la mémoire du service). La réponse au
+    client n'attend jamais le candidat: si la file est pleine, l'échantillon
+    est abandonné. Les entités des deux modèles sont comparées (même
+    intervalle et même label) et les temps CPU du NER enregistrés.
+    """
+
+    def __init__(self, model_manager, sample_rate: Optional[float] = None):
+        self.model_manager = model_manager
+        # Conversion des labels spaCy, identique pour les deux modèles
+        self.ner_processor = NERProcessor(model_manager)
+        self.candidate_model = settings.shadow_model
+        self.sample_rate = sample_rate if sample_rate is not None else settings.shadow_sample_rate
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.shadow_max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._workers: List[asyncio.Task] = []
+        self._rng = random.Random()
+        # Incrémentée à chaque changement du modèle principal
+        self._generation = 0
+        self._reset_aggregates()
+
+    def _reset_aggregates(self):
+        """Remettre à zéro les comparaisons"""
+        self.sampled = 0
+        self.dropped = 0
+        self.failed = 0
+        self.evaluated = 0
+        self.primary_entities = 0
+        self.candidate_entities = 0
+        self.matched_entities = 0
+        self.matched_spans = 0
+        self.label_counts: Dict[str, Counter] = {}
+        self.primary_latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.candidate_latencies: deque = deque(maxlen=LATENCY_WINDOW)
+
+    async def start(self) -> bool:
+        """Démarrer le pool de basse priorité et les workers (False si le candidat ne se charge pas)"""
+        # 'spawn' évite de dupliquer le processus principal et ses modèles chargés
+        self._executor = ProcessPoolExecutor(
+            max_workers=settings.shadow_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_candidate_process,
+            initargs=(self.candidate_model, settings.shadow_exclude)
+        )
+        try:
+            pipe_names = await asyncio.get_running_loop().run_in_executor(
+                self._executor, get_candidate_pipe_names
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load shadow model {self.candidate_model}: {e}")
+            await self.stop()
+            return False
+
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(settings.shadow_workers)]
+        logger.info(
+            f"Shadow evaluation started: {self.candidate_model} {pipe_names} "
+            f"on {self.sample_rate:.1%} of requests"
+        )
+        return True
+
+    def reset(self, model_manager):
+        """Repartir de zéro après un changement du modèle principal (le candidat reste chargé)"""
+        self.model_manager = model_manager
+        self.ner_processor = NERProcessor(model_manager)
+        self._generation += 1
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._reset_aggregates()
+
+    async def stop(self):
+        """Arrêter les workers (les échantillons en attente sont abandonnés)"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def maybe_submit(
+        self,
+        text: str,
+        entities: list,
+        latency: Optional[float],
+        entity_types: Optional[List[str]] = None,
+        chunk_size: Optional[int] = None
+    ) -> bool:
+        """
+        Échantillonner une requête traitée par le modèle principal (sans jamais attendre)
+
+        `latency`: temps CPU du NER principal (NERProcessor.compute_seconds);
+        `chunk_size`: taille des morceaux du principal (NER_CHUNK_SIZE par défaut).
+        """
+        if not self._workers or self._rng.random() >= self.sample_rate:
+            return False
+
+        self.sampled += 1
+        sample = ShadowSample(
+            # Même troncature que le NER principal
+            text=text[:settings.max_text_length],
+            entity_types=entity_types,
+            primary_spans={(e.start, e.end, e.label) for e in entities},
+            primary_latency=latency,
+            chunk_size=chunk_size or settings.ner_chunk_size,
+            generation=self._generation
+        )
+        try:
+            self._queue.put_nowait(sample)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            SHADOW_REQUESTS.labels(outcome="dropped").inc()
+            return False
+        return True
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            sample = await self._queue.get()
+            try:
+                raw_spans, latency = await loop.run_in_executor(
+                    self._executor, run_candidate, sample.text, sample.chunk_size
+                )
+                if sample.generation != self._generation:
+                    continue
+                self._record(sample, self._to_spans(raw_spans, sample.entity_types), latency)
+                SHADOW_REQUESTS.labels(outcome="evaluated").inc()
+            except Exception as e:
+                self.failed += 1
+                SHADOW_REQUESTS.labels(outcome="error").inc()
+                logger.warning(f"Shadow evaluation failed: {e}")
+
+    def _to_spans(self, raw_spans: List[Span], entity_types: Optional[List[str]]) -> Set[Span]:
+        """Filtrer et mapper les labels du candidat comme NERProcessor.doc_to_entities"""
+        spans = set()
+        for start, end, spacy_label in raw_spans:
+            if entity_types and spacy_label not in entity_types:
+                continue
+            label = self.ner_processor._map_spacy_label(spacy_label)
+            if label:
+                spans.add((start, end, label))
+        return spans
+
+    def _record(self, sample: ShadowSample, candidate_spans: Set[Span], latency: float):
+        """Comparer les entités des deux modèles et cumuler les résultats"""
+        primary = sample.primary_spans
+        self.evaluated += 1
+        self.primary_entities += len(primary)
+        self.candidate_entities += len(candidate_spans)
+        self.matched_entities += len(primary & candidate_spans)
+        self.matched_spans += len({(s, e) for s, e, _ in primary} & {(s, e) for s, e, _ in candidate_spans})
+
+        for span in primary | candidate_spans:
+            counts = self.label_counts.setdefault(span[2], Counter())
+            counts["primary"] += span in primary
+            counts["candidate"] += span in candidate_spans
+            counts["matched"] += span in primary and span in candidate_spans
+
+        # Latences comparées par paires, sur le même texte et le même découpage
+        if sample.primary_latency is not None:
+            self.primary_latencies.append(sample.primary_latency)
+            self.candidate_latencies.append(latency)
+            SHADOW_LATENCY.labels(model="primary").observe(sample.primary_latency)
+            SHADOW_LATENCY.labels(model="candidate").observe(latency)
+
+    def get_summary(self) -> Dict[str, object]:
+        """Accord entité par entité et latences, modèle candidat contre modèle principal"""
+        return {
+            "primary_model": self.model_manager.spacy_model_name,
+            "candidate_model": self.candidate_model,
+            "sample_rate": self.sample_rate,
+            "sampled": self.sampled,
+            "evaluated": self.evaluated,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "pending": self._queue.qsize(),
+            "agreement": {
+                **_agreement(self.primary_entities, self.candidate_entities, self.matched_entities),
+                "span_only_f1": _f1(self.primary_entities, self.candidate_entities, self.matched_spans),
+                "primary_entities": self.primary_entities,
+                "candidate_entities": self.candidate_entities,
+            },
+            "by_label": {
+                label: _agreement(counts["primary"], counts["candidate"], counts["matched"])
+                for label, counts in sorted(self.label_counts.items())
+            },
+            "latency_ms": {
+                "primary": _latency_summary(self.primary_latencies),
+                "candidate": _latency_summary(self.candidate_latencies),
+            },
+        }
+
+
+def _f1(primary: int, candidate: int, matched: int) -> Optional[float]:
+    if not primary + candidate:
+        return None
+    return round(2 * matched / (primary + candidate), 4)
+
+
+def _agreement(primary: int, candidate: int, matched: int) -> Dict[str, Optional[float]]:
+    """Précision et rappel du candidat en prenant le modèle principal comme référence"""
+    return {
+        "precision": round(matched / candidate, 4) if candidate else None,
+        "recall": round(matched / primary, 4) if primary else None,
+        "f1": _f1(primary, candidate, matched),
+    }
+
+
+def _latency_summary(latencies: deque) -> Dict[str, float]:
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+
+    def percentile(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+    }
@@ -0,0 +1,133 @@
+# ai-service/src/utils/compression.py
+import zlib
+from typing import AsyncIterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # Optionnel: seuls les corps zstd sont refusés
+    zstandard = None
+
+
+# Taille des blocs produits par la décompression (contrôle de taille entre chaque bloc)
+DECODE_CHUNK_SIZE = 64 * 1024
+
+# Entrée zstd décodée par tranches: un bloc RLE de 4 octets peut produire 128 Ko,
+# la sortie entre deux contrôles de taille reste ainsi bornée (~8 Mo)
+ZSTD_INPUT_SLICE = 256
+
+SUPPORTED_ENCODINGS = ["identity", "gzip", "x-gzip", "deflate", "zstd"]
+
+
+class BodyTooLargeError(ValueError):
+    """Corps de requête (décompressé) au-delà de la taille autorisée"""
+
+
+class UnsupportedEncodingError(ValueError):
+    """Content-Encoding non pris en charge"""
+
+
+class CorruptBodyError(ValueError):
+    """Corps compressé invalide ou tronqué"""
+
+
+class _LimitedBuffer:
+    """Destination des données décodées, qui refuse de dépasser `limit` octets"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.size = 0
+        self.parts: List[bytes] = []
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        if self.size > self.limit:
+            raise BodyTooLargeError(f"Request body too large (max {self.limit} bytes)")
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.parts)
+
+
+class BodyDecoder:
+    """
+    Décodage incrémental d'un corps de requête compressé
+
+    Les données sont décompressées par blocs bornés à mesure qu'elles arrivent:
+    la limite de taille est contrôlée pendant le décodage, une bombe de
+    décompression est rejetée sans être entièrement décompressée en mémoire.
+    """
+
+    def __init__(self, encoding: Optional[str], limit: int):
+        self.encoding = (encoding or "identity").strip().lower()
+        self.output = _LimitedBuffer(limit)
+        self._zlib = None
+        self._zstd = None
+        self._zstd_decompressor = None
+
+        if self.encoding in ("gzip", "x-gzip"):
+            self._zlib = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        elif self.encoding == "deflate":
+            self._zlib = zlib.decompressobj()
+        elif self.encoding == "zstd":
+            if zstandard is None:
+                raise UnsupportedEncodingError("zstd encoding requires the zstandard package")
+            self._zstd_decompressor = zstandard.ZstdDecompressor()
+            self._zstd = self._zstd_decompressor.decompressobj(write_size=DECODE_CHUNK_SIZE)
+        elif self.encoding != "identity":
+            raise UnsupportedEncodingError(f"Unsupported Content-Encoding: {encoding}")
+
+    def feed(self, data: bytes):
+        """Décoder un bloc reçu"""
+        try:
+            if self._zlib is not None:
+                while data:
+                    self.output.write(self._zlib.decompress(data, DECODE_CHUNK_SIZE))
+                    data = self._zlib.unconsumed_tail
+            elif self._zstd is not None:
+                self._feed_zstd(data)
+            else:
+                self.output.write(data)
+        except zlib.error as e:
+            raise CorruptBodyError(f"Invalid {self.encoding} body: {e}")
+        except Exception as e:
+            if zstandard is not None and isinstance(e, zstandard.ZstdError):
+                raise CorruptBodyError(f"Invalid {self.encoding} body: {e}")
+            raise
+
+    def finish(self) -> bytes:
+        """Terminer le décodage et retourner le corps complet"""
+        if self._zlib is not None:
+            self.output.write(self._zlib.flush())
+            if not self._zlib.eof:
+                raise CorruptBodyError(f"Truncated {self.encoding} body")
+        elif self._zstd is not None and not self._zstd.eof:
+            raise CorruptBodyError(f"Truncated {self.encoding} body")
+        return self.output.getvalue()
+
+    def _feed_zstd(self, data: bytes):
+        """Décoder des données zstd par tranches (trames concaténées acceptées)"""
+        for index in range(0, len(data), ZSTD_INPUT_SLICE):
+            piece = data[index:index + ZSTD_INPUT_SLICE]
+            while piece:
+                if self._zstd.eof:
+                    # Trame suivante
+                    self._zstd = self._zstd_decompressor.decompressobj(write_size=DECODE_CHUNK_SIZE)
+                self.output.write(self._zstd.decompress(piece))
+                piece = self._zstd.unused_data if self._zstd.eof else b""
+
+
+async def read_body(stream: AsyncIterator[bytes], encoding: Optional[str], limit: int) -> bytes:
+    """Lire et décoder un corps de requête en flux, dans la limite de `limit` octets décodés"""
+    decoder = BodyDecoder(encoding, limit)
+    received = 0
+    async for chunk in stream:
+        # Le corps compressé lui-même reste borné
+        received += len(chunk)
+        if received > limit:
+            raise BodyTooLargeError(f"Request body too large (max {limit} bytes)")
+        decoder.feed(chunk)
+    return decoder.finish()
@@ -0,0 +1,144 @@
+# ai-service/src/utils/gc_tuning.py
+import gc
+import time
+from typing import Dict, List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from ..config.settings import settings
+from .logger import logger
+
+
+# Pauses du ramasse-miettes cyclique, par génération
+GC_PAUSE_SECONDS = Histogram(
+    "ai_gc_pause_seconds", "Durée des collections du ramasse-miettes", ["generation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+GC_COLLECTIONS = Counter(
+    "ai_gc_collections_total", "Collections du ramasse-miettes", ["generation"]
+)
+GC_COLLECTED = Counter(
+    "ai_gc_collected_objects_total", "Objets libérés par le ramasse-miettes", ["generation"]
+)
+GC_FROZEN_OBJECTS = Gauge(
+    "ai_gc_frozen_objects", "Objets gelés (exclus des collections) après le chargement des modèles"
+)
+
+_pause_start: Optional[float] = None
+_max_pause: Dict[int, float] = {}
+# Collection complète demandée après la libération d'un modèle (time.monotonic())
+_refreeze_requested_at: Optional[float] = None
+
+
+def _on_gc(phase: str, info: dict):
+    """Callback gc.callbacks: durée et résultat de chaque collection"""
+    global _pause_start
+    if phase == "start":
+        _pause_start = time.perf_counter()
+        return
+    if _pause_start is None:
+        return
+
+    duration = time.perf_counter() - _pause_start
+    _pause_start = None
+    generation = info["generation"]
+    GC_PAUSE_SECONDS.labels(generation=generation).observe(duration)
+    GC_COLLECTIONS.labels(generation=generation).inc()
+    GC_COLLECTED.labels(generation=generation).inc(info["collected"])
+    _max_pause[generation] = max(_max_pause.get(generation, 0.0), duration)
+
+    if duration * 1000 > settings.gc_slow_pause_ms:
+        logger.warning(
+            f"Slow GC pause: generation {generation}, {duration * 1000:.0f}ms, "
+            f"{info['collected']} objects collected"
+        )
+
+
+def configure_gc(thresholds: Optional[List[int]] = None):
+    """Installer l'instrumentation et les seuils de collection"""
+    if _on_gc not in gc.callbacks:
+        gc.callbacks.append(_on_gc)
+
+    thresholds = thresholds or settings.gc_thresholds
+    if thresholds:
+        gc.set_threshold(*thresholds)
+    logger.info(f"GC thresholds: {gc.get_threshold()}")
+
+
+def freeze_heap():
+    """
+    Geler le tas après le chargement des modèles
+
+    Les millions d'objets des modèles (vocabulaire, poids, pipeline) vivent
+    aussi longtemps que le processus: une fois gelés, les collections de
+    génération 2 ne les parcourent plus et leur durée ne dépend plus que des
+    objets créés par les requêtes.
+    """
+    if not settings.enable_gc_freeze:
+        return
+    start = time.perf_counter()
+    gc.collect()
+    gc.freeze()
+    GC_FROZEN_OBJECTS.set(gc.get_freeze_count())
+    logger.info(f"Heap frozen: {gc.get_freeze_count()} objects in {time.perf_counter() - start:.2f}s")
+
+
+def freeze_new_objects():
+    """
+    Geler les objets créés depuis le dernier gel, sans collection
+
+    Pour un modèle chargé en cours de service: gc.freeze() seul ne parcourt
+    pas le tas et ne provoque donc pas de pause.
+    """
+    if not settings.enable_gc_freeze:
+        return
+    gc.freeze()
+    GC_FROZEN_OBJECTS.set(gc.get_freeze_count())
+
+
+def refreeze_heap():
+    """Dégeler, collecter (ancien modèle libéré) puis geler à nouveau"""
+    if not settings.enable_gc_freeze:
+        gc.collect()
+        return
+    gc.unfreeze()
+    freeze_heap()
+
+
+def schedule_refreeze():
+    """
+    Demander une collection complète après la libération d'un modèle
+
+    Un modèle libéré l'est par comptage de références; seuls ses cycles
+    restent dans la génération gelée. Dégel et collection complète (plusieurs
+    centaines de ms) sont différés à un moment sans requête en cours
+    (run_pending_refreeze).
+    """
+    global _refreeze_requested_at
+    if settings.enable_gc_freeze and _refreeze_requested_at is None:
+        _refreeze_requested_at = time.monotonic()
+
+
+def run_pending_refreeze(idle: bool) -> bool:
+    """Exécuter la collection demandée si le service est inactif, ou après GC_REFREEZE_MAX_DELAY secondes"""
+    global _refreeze_requested_at
+    if _refreeze_requested_at is None:
+        return False
+    if not idle and time.monotonic() - _refreeze_requested_at < settings.gc_refreeze_max_delay:
+        return False
+    _refreeze_requested_at = None
+    refreeze_heap()
+    return True
+
+
+def get_gc_stats() -> Dict[str, object]:
+    """État du ramasse-miettes pour les informations du service"""
+    return {
+        "thresholds": list(gc.get_threshold()),
+        "counts": list(gc.get_count()),
+        "frozen_objects": gc.get_freeze_count(),
+        "collections": [stats["collections"] for stats in gc.get_stats()],
+        "max_pause_ms": {
+            generation: round(pause * 1000, 2) for generation, pause in sorted(_max_pause.items())
+        },
+    }
@@ -0,0 +1,15 @@
+# ai-service/src/utils/memory.py
+import resource
+
+
+def get_rss_bytes() -> int:
+    """Mémoire résidente actuelle du processus (octets)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # Hors Linux: pic de mémoire résidente, à défaut de la valeur courante
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
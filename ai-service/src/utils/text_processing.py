@@ -0,0 +1,251 @@
+# ai-service/src/utils/text_processing.py
+import re
+import bisect
+from array import array
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from langdetect import DetectorFactory, LangDetectException, detect
+
+from ..config.settings import settings
+
+# Résultats de détection déterministes
+DetectorFactory.seed = 0
+
+
+def detect_language(text: str, sample_size: int = 2000) -> Optional[str]:
+    """
+    Détecter la langue d'un texte à partir d'un échantillon
+
+    Seul le début du texte est analysé: la détection reste rapide même
+    pour de très gros documents.
+    """
+    sample = text[:sample_size]
+    if not sample.strip():
+        return None
+    try:
+        return detect(sample)
+    except LangDetectException:
+        return None
+
+
+def resolve_language(requested: str, text: str) -> str:
+    """Résoudre la langue demandée ('auto' = détection automatique)"""
+    if requested != "auto":
+        return requested
+    if not settings.enable_language_detection:
+        return settings.default_language
+    return detect_language(text) or settings.default_language
+
+
+# Frontières de découpage, de la plus à la moins souhaitable
+CHUNK_BOUNDARIES = [
+    re.compile(r'\n\s*\n'),      # Paragraphe
+    re.compile(r'[.!?»]\s+'),     # Fin de phrase
+    re.compile(r'\s+'),           # Espace
+]
+
+
+def split_into_chunks(text: str, max_chars: int) -> List[Tuple[int, int]]:
+    """
+    Découper un texte en morceaux d'au plus `max_chars` caractères
+
+    Les coupures se font de préférence entre paragraphes, sinon entre
+    phrases, sinon sur un espace, dans la seconde moitié de la fenêtre.
+    Retourne les intervalles (start, end) qui couvrent tout le texte.
+    """
+    chunks = []
+    start = 0
+    length = len(text)
+
+    while start < length:
+        end = min(start + max_chars, length)
+        if end < length:
+            end = _find_boundary(text, start + max_chars // 2, end)
+        chunks.append((start, end))
+        start = end
+
+    return chunks
+
+
+def overlap_chunks(text: str, chunks: List[Tuple[int, int]], overlap: int) -> List[Tuple[int, int]]:
+    """
+    Élargir chaque morceau de `overlap` caractères vers la gauche
+
+    Le début élargi est avancé jusqu'à un espace pour ne pas couper un mot.
+    Une entité coupée à la fin d'un morceau est ainsi entière dans le suivant.
+    """
+    widened = []
+    for start, end in chunks:
+        window_start = max(0, start - overlap)
+        while window_start < start and not text[window_start].isspace():
+            window_start += 1
+        widened.append((window_start, end))
+    return widened
+
+
+def _find_boundary(text: str, window_start: int, window_end: int) -> int:
+    """Position de coupure la plus tardive dans la fenêtre, selon la priorité des frontières"""
+    for boundary in CHUNK_BOUNDARIES:
+        last_match = None
+        for last_match in boundary.finditer(text, window_start, window_end):
+            pass
+        if last_match:
+            return last_match.end()
+    return window_end
+
+
+# Ligatures typographiques (extraction PDF)
+LIGATURES = {
+    "\ufb00": "ff",
+    "\ufb01": "fi",
+    "\ufb02": "fl",
+    "\ufb03": "ffi",
+    "\ufb04": "ffl",
+    "\ufb05": "st",
+    "\ufb06": "st",
+}
+
+# Un seul motif: le texte est parcouru une seule fois. Le lookahead initial
+# permet au moteur d'écarter rapidement les positions sans candidat.
+NORMALIZATION_PATTERN = re.compile(
+    r'(?=[-\s\u00ad\u200b-\u200d\ufeff\ufb00-\ufb06])(?:'
+    # Mot coupé en fin de ligne ("exem-\nple"): seulement devant une minuscule
+    r'(?P<hyphen>(?<=\w)-[ \t]*\r?\n[ \t]*(?=[a-zà-öø-ÿœ]))'
+    # Caractères invisibles (trait d'union conditionnel, espaces de largeur nulle)
+    r'|(?P<invisible>[\u00ad\u200b-\u200d\ufeff]+)'
+    r'|(?P<ligature>[\ufb00-\ufb06])'
+    # Espaces répétés, ou espaces autres que ' ' et '\n' (insécables, tabulations...)
+    r'|(?P<space>\s{2,}|[^\S \n])'
+    r')'
+)
+
+
+@dataclass
+class NormalizedText:
+    """
+    Texte normalisé et correspondance de ses offsets avec le texte d'origine
+
+    La correspondance est stockée par segments contigus, dans deux tableaux
+    d'entiers compacts: le segment `k` commence à `norm_starts[k]` dans le
+    texte normalisé et à `orig_starts[k]` dans le texte d'origine (dernier
+    élément sentinelle). Un segment de même longueur des deux côtés est une
+    copie caractère par caractère; sinon c'est un remplacement, indivisible.
+    Tableaux vides: texte inchangé.
+    """
+    text: str
+    original: str
+    norm_starts: array
+    orig_starts: array
+
+    @property
+    def changed(self) -> bool:
+        return len(self.norm_starts) > 0
+
+    def to_original(self, start: int, end: int) -> Tuple[int, int]:
+        """Convertir un intervalle du texte normalisé en intervalle du texte d'origine"""
+        if not self.changed:
+            return start, end
+        if end <= start:
+            position = self._map(start, False) if start < len(self.text) else len(self.original)
+            return position, position
+        return self._map(start, False), self._map(end - 1, True)
+
+    def _map(self, index: int, is_end: bool) -> int:
+        """Position d'origine du début (ou de la fin) du caractère normalisé `index`"""
+        k = bisect.bisect_right(self.norm_starts, index) - 1
+        norm_start, orig_start = self.norm_starts[k], self.orig_starts[k]
+        norm_end, orig_end = self.norm_starts[k + 1], self.orig_starts[k + 1]
+
+        if norm_end - norm_start == orig_end - orig_start:
+            return orig_start + (index - norm_start) + is_end
+        return orig_end if is_end else orig_start
+
+    def from_original(self, start: int, end: int) -> Tuple[int, int]:
+        """Convertir un intervalle du texte d'origine en intervalle du texte normalisé"""
+        if not self.changed:
+            return start, end
+        return self._map_original(start, False), self._map_original(end, True)
+
+    def _map_original(self, index: int, is_end: bool) -> int:
+        """Position normalisée d'une frontière du texte d'origine (un remplacement n'est jamais coupé)"""
+        k = bisect.bisect_right(self.orig_starts, index) - 1
+        if k >= len(self.orig_starts) - 1:
+            return self.norm_starts[-1]
+        norm_start, orig_start = self.norm_starts[k], self.orig_starts[k]
+        norm_end, orig_end = self.norm_starts[k + 1], self.orig_starts[k + 1]
+
+        if index == orig_start or norm_end - norm_start == orig_end - orig_start:
+            return norm_start + (index - orig_start)
+        return norm_end if is_end else norm_start
+
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Fusionner des intervalles contigus ou qui se chevauchent"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def normalize_text(text: str) -> NormalizedText:
+    """
+    Normaliser un texte extrait (PDF, DOCX) en conservant les offsets d'origine
+
+    Recolle les mots coupés en fin de ligne, remplace les ligatures, supprime
+    les caractères invisibles et réduit les suites d'espaces (un saut de ligne
+    ou de paragraphe est conservé). Passage unique sur le texte; la table
+    d'offsets ne contient qu'une entrée par segment modifié.
+    """
+    pieces = []
+    norm_starts = array("L")
+    orig_starts = array("L")
+    length = 0
+    position = 0
+
+    for match in NORMALIZATION_PATTERN.finditer(text):
+        match_start, match_end = match.span()
+
+        kind = match.lastgroup
+        if kind == "ligature":
+            replacement = LIGATURES[match.group()]
+        elif kind == "space":
+            newlines = match.group().count("\n")
+            replacement = "\n\n" if newlines > 1 else "\n" if newlines else " "
+        else:
+            replacement = ""
+
+        if replacement == match.group():
+            continue
+
+        # Fragment inchangé avant le remplacement
+        if match_start > position:
+            pieces.append(text[position:match_start])
+            norm_starts.append(length)
+            orig_starts.append(position)
+            length += match_start - position
+
+        pieces.append(replacement)
+        norm_starts.append(length)
+        orig_starts.append(match_start)
+        length += len(replacement)
+        position = match_end
+
+    if not norm_starts:
+        # Aucune modification: pas de table d'offsets
+        return NormalizedText(text=text, original=text, norm_starts=array("L"), orig_starts=array("L"))
+
+    if position < len(text):
+        pieces.append(text[position:])
+        norm_starts.append(length)
+        orig_starts.append(position)
+        length += len(text) - position
+
+    # Sentinelle: fin des deux textes
+    norm_starts.append(length)
+    orig_starts.append(len(text))
+
+    return NormalizedText(text="".join(pieces), original=text, norm_starts=norm_starts, orig_starts=orig_starts)
@@ -82,6 +82,28 @@ export class SearchController {
     const results: any[] = [];
     let searchRegex: RegExp;
 
+    // Recherche textuelle: index du service IA (construit une fois par document)
+    if (mode !== 'regex') {
+      try {
+        // Recherche au fil de la frappe: le dernier mot peut être incomplet ("Dup" -> "Dupont")
+        const indexMode = mode === 'text' ? 'prefix' : mode;
+        const response = await this.aiService.searchIndexed(text, query, indexMode, caseSensitive, maxResults);
+        return response.results.map((result, index) => ({
+          id: `search_${index + 1}`,
+          text: result.text,
+          start: result.start,
+          end: result.end,
+          page: Math.ceil(result.start / 3000),
+          context: result.context,
+          similarity: result.similarity,
+          beforeContext: text.substring(Math.max(0, result.start - 100), result.start),
+          afterContext: text.substring(result.end, Math.min(text.length, result.end + 100)),
+        }));
+      } catch (error) {
+        logger.warn('Indexed search unavailable, falling back to regex search:', error);
+      }
+    }
+
     try {
       if (mode === 'regex') {
         searchRegex = new RegExp(query, caseSensitive ? 'g' : 'gi');
@@ -3,6 +3,17 @@ import axios, { AxiosInstance } from 'axios';
 import { config } from '../config';
 import { logger } from '../utils/logger';
 import { DetectedEntity, EntityType } from './documentService';
+import { gzipSync } from 'zlib';
+import { createHash } from 'crypto';
+
+// Taille (caractères) au-delà de laquelle le texte est envoyé compressé
+const COMPRESSION_THRESHOLD = 64 * 1024;
+
+// Identifiants de documents analysés conservés (les plus récents)
+const MAX_DOCUMENT_HANDLES = 100;
+
+// Reprises d'une analyse partielle (échéance atteinte) avant abandon
+const MAX_ANALYZE_RESUMES = 10;
 
 export interface AIEntityResponse {
   entities: Array<{
@@ -17,6 +28,9 @@ export interface AIEntityResponse {
     name: string;
     version: string;
   };
+  partial?: boolean;
+  remaining?: Array<{ start: number; end: number }>;
+  document_handle?: string;
 }
 
 export interface AISearchResponse {
@@ -31,6 +45,8 @@ export interface AISearchResponse {
 
 export class AIService {
   private client: AxiosInstance;
+  // Empreinte du texte -> identifiant du document analysé par le service IA
+  private documentHandles = new Map<string, string>();
 
   constructor() {
     this.client = axios.create({
@@ -72,18 +88,51 @@ export class AIService {
     try {
       logger.info(`Extracting entities with AI (mode: ${mode})`);
 
-      const response = await this.client.post<AIEntityResponse>('/analyze', {
-        text,
+      const options = {
         mode,
         language: 'fr',
         confidence_threshold: 0.5,
         include_regex: true, // Inclure aussi les patterns regex
+        // Réponse partielle plutôt qu'un timeout qui perd tout le travail
+        deadline_ms: Math.floor(config.aiService.timeout * 0.8),
+      };
+
+      let response = await this.postAnalyze(text, options);
+      const aiEntities = [...response.data.entities];
+
+      // Échéance atteinte: intervalles restants soumis à nouveau jusqu'à couverture complète
+      // (les patterns regex ont déjà été appliqués à tout le texte)
+      let resumes = 0;
+      while (response.data.partial) {
+        const remaining = response.data.remaining ?? [];
+        const remainingChars = remaining.reduce((total, range) => total + range.end - range.start, 0);
+        if (remaining.length === 0 || resumes >= MAX_ANALYZE_RESUMES) {
+          throw new Error(`AI analysis incomplete, ${remainingChars} characters not analyzed`);
+        }
+        resumes += 1;
+        logger.warn(`AI analysis partial (deadline reached), resuming ${remainingChars} characters (attempt ${resumes})`);
+
+        response = await this.postAnalyze(text, { ...options, include_regex: false, ranges: remaining });
+        const leftChars = (response.data.remaining ?? []).reduce((total, range) => total + range.end - range.start, 0);
+        if (response.data.partial && leftChars >= remainingChars) {
+          throw new Error(`AI analysis made no progress, ${leftChars} characters not analyzed`);
+        }
+        aiEntities.push(...response.data.entities);
+      }
+
+      // Mentions propagées renvoyées par plusieurs passes
+      const seen = new Set<string>();
+      const uniqueEntities = aiEntities.filter((entity) => {
+        const key = `${entity.start}:${entity.end}:${entity.label}`;
+        if (seen.has(key)) {
+          return false;
+        }
+        seen.add(key);
+        return true;
       });
 
-      const aiEntities = response.data.entities;
-      
       // Convertir au format interne
-      const entities: DetectedEntity[] = aiEntities.map((entity, index) => ({
+      const entities: DetectedEntity[] = uniqueEntities.map((entity, index) => ({
         id: `ai_${entity.label.toLowerCase()}_${Date.now()}_${index}`,
         type: this.mapAILabelToEntityType(entity.label),
         value: entity.text,
@@ -96,7 +145,11 @@ export class AIService {
         isModified: false,
       }));
 
-      logger.info(`AI extracted ${entities.length} entities in ${response.data.processing_time}ms`);
+      if (response.data.document_handle) {
+        this.rememberDocumentHandle(text, response.data.document_handle);
+      }
+
+      logger.info(`AI extracted ${entities.length} entities in ${response.data.processing_time}ms (${resumes} resumes)`);
       
       return entities;
 
@@ -109,6 +162,26 @@ export class AIService {
     }
   }
 
+  /**
+   * Recherche indexée dans le texte (exacte, préfixe, sans accents ou approchée)
+   */
+  async searchIndexed(
+    text: string,
+    query: string,
+    mode: string,
+    caseSensitive: boolean,
+    maxResults: number
+  ): Promise<AISearchResponse> {
+    const response = await this.postWithDocument<AISearchResponse>('/search', {
+      query,
+      mode,
+      case_sensitive: caseSensitive,
+      max_results: maxResults,
+    }, text);
+
+    return response.data;
+  }
+
   /**
    * Recherche sémantique dans le texte
    */
@@ -132,15 +205,15 @@ export class AIService {
   /**
    * Validation et amélioration d'entités
    */
-  async validateEntities(entities: DetectedEntity[]): Promise<DetectedEntity[]> {
+  async validateEntities(entities: DetectedEntity[], documentText?: string): Promise<DetectedEntity[]> {
     try {
-      const response = await this.client.post('/validate', {
+      const response = await this.postWithDocument<any>('/validate', {
         entities: entities.map(entity => ({
           text: entity.value,
           type: entity.type,
           confidence: entity.confidence,
         })),
-      });
+      }, documentText);
 
       // Mettre à jour les scores de confiance
       const validatedEntities = entities.map((entity, index) => ({
@@ -160,19 +233,19 @@ export class AIService {
   /**
    * Suggestions de groupement automatique
    */
-  async suggestGroups(entities: DetectedEntity[]): Promise<Array<{
+  async suggestGroups(entities: DetectedEntity[], documentText?: string): Promise<Array<{
     name: string;
     entities: string[];
     confidence: number;
   }>> {
     try {
-      const response = await this.client.post('/suggest-groups', {
+      const response = await this.postWithDocument<any>('/suggest-groups', {
         entities: entities.map(entity => ({
           id: entity.id,
           text: entity.value,
           type: entity.type,
         })),
-      });
+      }, documentText, false);
 
       return response.data.groups;
 
@@ -182,6 +255,72 @@ export class AIService {
     }
   }
 
+  /**
+   * POST /analyze, gros documents compressés: texte brut (options en paramètres
+   * d'URL), ou JSON pour une reprise (les intervalles ne passent pas dans l'URL)
+   */
+  private postAnalyze(text: string, options: Record<string, unknown>) {
+    if (text.length <= COMPRESSION_THRESHOLD) {
+      return this.client.post<AIEntityResponse>('/analyze', { text, ...options });
+    }
+
+    if (options.ranges) {
+      return this.client.post<AIEntityResponse>('/analyze', gzipSync(Buffer.from(JSON.stringify({ text, ...options }), 'utf-8')), {
+        headers: {
+          'Content-Type': 'application/json',
+          'Content-Encoding': 'gzip',
+        },
+      });
+    }
+
+    return this.client.post<AIEntityResponse>('/analyze', gzipSync(Buffer.from(text, 'utf-8')), {
+      params: options,
+      headers: {
+        'Content-Type': 'text/plain; charset=utf-8',
+        'Content-Encoding': 'gzip',
+      },
+    });
+  }
+
+  /**
+   * Requête sur un document: identifiant du document déjà analysé si connu
+   * (le texte ne transite pas), sinon texte complet (`sendText`)
+   */
+  private async postWithDocument<T>(path: string, body: object, text?: string, sendText: boolean = true) {
+    const key = text !== undefined ? this.documentKey(text) : undefined;
+    const handle = key !== undefined ? this.documentHandles.get(key) : undefined;
+
+    if (key !== undefined && handle) {
+      try {
+        return await this.client.post<T>(path, { ...body, document_handle: handle });
+      } catch (error) {
+        // Document expiré côté IA: nouvel envoi avec le texte
+        if (error.response?.status !== 404) {
+          throw error;
+        }
+        this.documentHandles.delete(key);
+      }
+    }
+
+    return this.client.post<T>(path, sendText && text !== undefined ? { ...body, text } : body);
+  }
+
+  private documentKey(text: string): string {
+    return createHash('sha256').update(text).digest('hex');
+  }
+
+  private rememberDocumentHandle(text: string, handle: string): void {
+    const key = this.documentKey(text);
+    this.documentHandles.delete(key);
+    this.documentHandles.set(key, handle);
+    if (this.documentHandles.size > MAX_DOCUMENT_HANDLES) {
+      const oldest = this.documentHandles.keys().next().value;
+      if (oldest !== undefined) {
+        this.documentHandles.delete(oldest);
+      }
+    }
+  }
+
   /**
    * Test de connectivité avec le service IA
    */